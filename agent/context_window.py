@@ -0,0 +1,151 @@
+# agent/context_window.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.metrics import increment, timed
+from utils.tokens import count_tokens, truncate_to_tokens
+
+SUMMARY_PROMPT = """
+You keep a running summary of a conversation between a user and NeuroMentor, a mental wellness assistant.
+Update the summary with the new messages below. Keep what matters for continuing the conversation:
+the user's feelings, situation, names, goals and anything NeuroMentor suggested.
+Write at most {max_words} words, in the third person, no preamble.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:
+"""
+
+
+# Summary updates run here, off the chat script thread
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="context-summary")
+
+
+def _format_turn(turn: dict) -> str:
+    speaker = "User" if turn["role"] == "user" else "NeuroMentor"
+    return f"{speaker}: {turn['content']}"
+
+
+class ConversationContext:
+    """
+    Bounded multi-turn context for the agent.
+
+    The most recent turns are kept verbatim in a sliding window of at most
+    `recent_tokens` + `summary_batch_tokens` tokens. When the window overflows, the
+    oldest turns are evicted down to `recent_tokens` and folded into a rolling summary
+    (capped at `summary_tokens`) with one summarizer call, so the summary is
+    updated incrementally instead of being recomputed from the whole conversation.
+    The rendered context therefore stays the same size however long the chat gets.
+
+    With `background` (the default) the summarizer call runs on a worker thread, so
+    the chat never waits on it: evicted turns stay in the rendered context until their
+    summary is ready, and the new summary is picked up on the next turn.
+    """
+
+    def __init__(self, summarize_fn, recent_tokens: int = 600, summary_tokens: int = 250,
+                 summary_batch_tokens: int = 400, max_turn_tokens: int = 300, background: bool = True):
+        self.summarize_fn = summarize_fn  # prompt -> text
+        self.recent_tokens = recent_tokens
+        self.summary_tokens = summary_tokens
+        self.summary_batch_tokens = summary_batch_tokens
+        self.max_turn_tokens = max_turn_tokens
+        self.background = background
+        self.summary = ""
+        self.turns = []    # [{"role", "content", "tokens"}], oldest first
+        self.evicted = []  # turns out of the window, waiting to be folded into the summary
+        self.window_tokens = 0
+        self._job = None   # (future, number of evicted turns it summarizes)
+        self._lock = threading.Lock()
+
+    def add_turn(self, role: str, content: str):
+        """
+        Adds a finished turn; may fold the oldest turns into the summary.
+        """
+        content = truncate_to_tokens(content.strip(), self.max_turn_tokens)
+        tokens = count_tokens(content)
+        with self._lock:
+            self._apply_summary()
+            self.turns.append({"role": role, "content": content, "tokens": tokens})
+            self.window_tokens += tokens
+            if self.window_tokens > self.recent_tokens + self.summary_batch_tokens:
+                self._compact()
+
+    def add_exchange(self, user_message: str, reply: str):
+        self.add_turn("user", user_message)
+        self.add_turn("assistant", reply)
+
+    def _compact(self):
+        while self.turns and self.window_tokens > self.recent_tokens:
+            turn = self.turns.pop(0)
+            self.window_tokens -= turn["tokens"]
+            self.evicted.append(turn)
+        if self._job is not None and sum(t["tokens"] for t in self.evicted) > 2 * self.summary_batch_tokens:
+            # The summarizer is falling behind by more than a batch: wait so the context stays bounded
+            self._apply_summary(wait=True)
+        self._start_summary()
+
+    def _start_summary(self):
+        # One update at a time: turns evicted meanwhile go into the next one
+        if self._job is not None or not self.evicted:
+            return
+        increment("context.summary_updates")
+        summary, evicted = self.summary, list(self.evicted)
+        if self.background:
+            self._job = (_summary_executor.submit(self._summarize, summary, evicted), len(evicted))
+        else:
+            self.summary = self._summarize(summary, evicted)
+            del self.evicted[:len(evicted)]
+
+    def _summarize(self, summary: str, evicted: list) -> str:
+        prompt = SUMMARY_PROMPT.format(
+            max_words=int(self.summary_tokens * 0.75),
+            summary=summary or "(empty)",
+            messages="\n".join(_format_turn(turn) for turn in evicted),
+        )
+        try:
+            with timed("context.summarize"):
+                updated = self.summarize_fn(prompt).strip()
+        except Exception as e:
+            # Keep the evicted turns (cut short) rather than losing them
+            print(f"Context summary failed: {e}")
+            updated = (summary + " " + " ".join(_format_turn(turn) for turn in evicted)).strip()
+        return truncate_to_tokens(updated, self.summary_tokens)
+
+    def _apply_summary(self, wait: bool = False):
+        if self._job is None:
+            return
+        future, count = self._job
+        if not wait and not future.done():
+            return
+        self.summary = future.result()  # _summarize never raises
+        del self.evicted[:count]
+        self._job = None
+        self._start_summary()
+
+    def wait(self):
+        """
+        Blocks until pending summary updates are applied (for scripts and benchmarks).
+        """
+        with self._lock:
+            while self._job is not None:
+                self._apply_summary(wait=True)
+
+    def render(self) -> str:
+        """
+        The conversation so far, formatted for the prompt ("" for a new conversation).
+        """
+        with self._lock:
+            self._apply_summary()
+            summary, turns = self.summary, self.evicted + self.turns
+        if not summary and not turns:
+            return ""
+        parts = []
+        if summary:
+            parts.append(f"Summary of the earlier conversation: {summary}")
+        if turns:
+            parts.append("Recent messages:\n" + "\n".join(_format_turn(turn) for turn in turns))
+        return "\n\n".join(parts) + "\n\n"
@@ -1,30 +1,245 @@
 # agent/neuromentor_agent.py
-from utils.llm import get_gemini_response
+import re
+
+from utils.llm import get_gemini_response, stream_gemini_response
 from agent.tools import default_mood_response
-from utils.guardrails import is_within_scope
+from utils.guardrails import is_within_scope, local_scope_check
+from utils.memory_index import retrieve_memories
+from utils.metrics import increment, timed, record_value
+from utils.tokens import count_tokens
+from agent.context_window import ConversationContext
+from config.settings import settings
+
+WHATSAPP_STYLE_INSTRUCTIONS = (
+    "Please answer like you're chatting on WhatsApp—casual, friendly, "
+    "and supportive with a natural tone. "
+    "Include any relevant emojis to add warmth when appropriate. "
+)
+
+# One call that returns both the scope verdict and the reply
+COMBINED_PROMPT = """
+You are NeuroMentor, a mental wellness assistant.
+First decide if the user's message is related to feelings, stress, or personal challenges,
+or if it's off-topic (like coding questions or sports news).
+
+Reply in exactly this format:
+SCOPE: relevant or irrelevant
+REPLY: your reply (leave empty if irrelevant)
+
+{instructions}
+{memory}{history}User's message: "{query}"
+"""
+
+FALLBACK_REPLY = "I'm here for you, but I'm having a little trouble understanding. Could you try asking that in another way?"
+
+MEMORY_INSTRUCTIONS = (
+    "Earlier conversations with this user that may be relevant "
+    "(use them only if they help, and don't quote them back verbatim):\n"
+)
+
+
+def _memory_context(query: str, username: str = None) -> str:
+    """
+    Relevant past exchanges of the user, formatted for the prompt ("" when there are none).
+    """
+    if not username or not settings.MEMORY_RETRIEVAL:
+        return ""
+    try:
+        memories = retrieve_memories(
+            username, query,
+            top_k=settings.MEMORY_TOP_K,
+            token_budget=settings.MEMORY_TOKEN_BUDGET,
+            min_similarity=settings.MEMORY_MIN_SIMILARITY,
+        )
+    except Exception as e:
+        print(f"Memory retrieval failed: {e}")
+        return ""
+    if not memories:
+        return ""
+    return MEMORY_INSTRUCTIONS + "\n\n".join(memories) + "\n\n"
+
+
+# SCOPE: / REPLY: labels at the start of a line, also when Gemini dresses them up in
+# markdown ("**SCOPE:** relevant", "## Reply:", "_REPLY_: ...")
+LABEL_LINE = re.compile(r"^[\s*_#>]*(SCOPE|REPLY)[\s*_]*:[ \t*_]*(.*)$", re.IGNORECASE)
+REPLY_LABEL = re.compile(r"^[ \t*_#>]*REPLY[ \t*_]*:[ \t*_]*", re.IGNORECASE | re.MULTILINE)
+
+def new_conversation_context() -> ConversationContext:
+    """
+    A bounded multi-turn context for one chat, sized from settings.
+    """
+    return ConversationContext(
+        get_gemini_response,
+        recent_tokens=settings.CONTEXT_RECENT_TOKENS,
+        summary_tokens=settings.CONTEXT_SUMMARY_TOKENS,
+        summary_batch_tokens=settings.CONTEXT_SUMMARY_BATCH_TOKENS,
+    )
+
+
+def _reply_prompt(prompt: str) -> str:
+    record_value("agent.prompt_tokens", count_tokens(prompt))
+    return prompt
+
+
+def _whatsapp_prompt(query: str, memory: str = "", history: str = "") -> str:
+    return _reply_prompt(
+        WHATSAPP_STYLE_INSTRUCTIONS +
+        memory +
+        history +
+        f"User's message: {query}\n\n"
+        "Response:"
+    )
+
+
+def _combined_prompt(query: str, memory: str = "", history: str = "") -> str:
+    return _reply_prompt(COMBINED_PROMPT.format(
+        instructions=WHATSAPP_STYLE_INSTRUCTIONS, memory=memory, history=history, query=query.strip()
+    ))
+
+
+def parse_combined_response(text: str):
+    """
+    Parses a COMBINED_PROMPT answer into (in_scope, reply).
+    in_scope is None when the SCOPE line is missing.
+    """
+    in_scope, reply_lines, in_reply = None, [], False
+    for line in text.strip().splitlines():
+        label = None if in_reply else LABEL_LINE.match(line)
+        if label and label.group(1).upper() == "SCOPE":
+            verdict = label.group(2).strip(" *_").lower()
+            in_scope = verdict.startswith("relevant")
+        elif label:
+            in_reply = True
+            reply_lines.append(label.group(2).strip())
+        elif in_reply:
+            reply_lines.append(line)
+    return in_scope, "\n".join(reply_lines).strip()
+
+
+def _local_verdict(query: str):
+    verdict = local_scope_check(query) if settings.LOCAL_GUARDRAIL else None
+    if verdict is not None:
+        increment("guardrail.local_skipped_remote")
+    return verdict
 
-def generate_response(query: str) -> str:
+
+def generate_response(query: str, username: str = None, context: ConversationContext = None) -> str:
     """
     Generates a supportive response using Gemini Pro.
     
     If the user's message is within the mental wellness scope, this function 
     instructs the Gemini model to respond in a WhatsApp chatting style—casual, supportive,
     and friendly. If the query is off-topic, it returns a default caring message.
+
+    The scope check is answered locally when the keyword pre-classifier is confident;
+    otherwise, in combined mode, a single Gemini call returns both verdict and reply.
+
+    With a `username`, relevant past exchanges from the user's history are added to the reply prompt;
+    with a `context`, so is the (bounded) conversation so far.
     """
     try:
-        if not is_within_scope(query):
-            return default_mood_response()
-        
-        # Add a prompt instruction for a WhatsApp chatting style response.
-        whatsapp_prompt = (
-            "Please answer like you're chatting on WhatsApp—casual, friendly, "
-            "and supportive with a natural tone. "
-            "Include any relevant emojis to add warmth when appropriate. "
-            f"User's message: {query}\n\n"
-            "Response:"
-        )
-        
-        response = get_gemini_response(whatsapp_prompt)
-        return response
+        increment("agent.turns")
+        with timed("agent.generate_response"):
+            local_verdict = _local_verdict(query)
+            history = context.render() if context else ""
+
+            if local_verdict is not None:
+                if not local_verdict:
+                    return default_mood_response()
+                return get_gemini_response(_whatsapp_prompt(query, _memory_context(query, username), history))
+
+            memory = _memory_context(query, username)
+            if settings.COMBINED_INTENT_REPLY:
+                increment("guardrail.combined_call")
+                in_scope, reply = parse_combined_response(get_gemini_response(_combined_prompt(query, memory, history)))
+                if in_scope is False:
+                    return default_mood_response()
+                if in_scope and reply:
+                    return reply
+                # Unparseable answer: fall back to the two-step flow below
+
+            increment("guardrail.remote_call")
+            if not is_within_scope(query):
+                return default_mood_response()
+
+            # Add a prompt instruction for a WhatsApp chatting style response.
+            response = get_gemini_response(_whatsapp_prompt(query, memory, history))
+            return response
     except Exception:
-        return "I'm here for you, but I'm having a little trouble understanding. Could you try asking that in another way?"
+        return FALLBACK_REPLY
+
+
+def stream_response(query: str, username: str = None, context: ConversationContext = None):
+    """
+    Streaming version of generate_response: yields the reply in chunks as Gemini produces them.
+    In combined mode the SCOPE line is consumed first and only the REPLY part is streamed.
+
+    If Gemini fails before anything was sent, the fallback reply is yielded instead. If it
+    fails mid-reply, the stream just ends at the last complete chunk, so the caller never
+    saves a partial reply with an apology glued onto it.
+    """
+    increment("agent.turns")
+    yielded = False
+    try:
+        for chunk in _stream_reply(query, username, context):
+            yielded = True
+            yield chunk
+    except Exception as e:
+        if yielded:
+            increment("agent.stream_interrupted")
+            print(f"Reply stream interrupted: {e}")
+            return
+        yield FALLBACK_REPLY
+
+
+def _stream_reply(query: str, username: str = None, context: ConversationContext = None):
+    local_verdict = _local_verdict(query)
+
+    if local_verdict is False:
+        yield default_mood_response()
+        return
+    memory = _memory_context(query, username)
+    history = context.render() if context else ""
+    if local_verdict:
+        yield from stream_gemini_response(_whatsapp_prompt(query, memory, history))
+        return
+
+    if settings.COMBINED_INTENT_REPLY:
+        increment("guardrail.combined_call")
+        buffer, streaming = "", False
+        for chunk in stream_gemini_response(_combined_prompt(query, memory, history)):
+            if streaming:
+                yield chunk
+                continue
+
+            buffer += chunk
+            label = REPLY_LABEL.search(buffer)
+            if label is None or label.end() == len(buffer):
+                continue  # no label yet, or the markup after it may still be arriving
+
+            in_scope, _ = parse_combined_response(buffer[:label.start()])
+            if in_scope is False:
+                yield default_mood_response()
+                return
+            if in_scope is None:
+                break  # Unparseable answer: fall back to the two-step flow below
+            streaming = True
+            rest = buffer[label.end():].lstrip()
+            if rest:
+                yield rest
+
+        if streaming:
+            return
+        in_scope, reply = parse_combined_response(buffer)
+        if in_scope is False:
+            yield default_mood_response()
+            return
+        if in_scope and reply:
+            yield reply
+            return
+
+    increment("guardrail.remote_call")
+    if not is_within_scope(query):
+        yield default_mood_response()
+        return
+    yield from stream_gemini_response(_whatsapp_prompt(query, memory, history))
@@ -1,21 +1,29 @@
 # agents/tools.py
 
+import re
+
+# Checked in order; matched as whole words so "download" isn't "down" and "enjoy" isn't "joy"
+MOOD_KEYWORDS = {
+    "happy": ["happy", "joy", "excited", "grateful"],
+    "sad": ["sad", "down", "depressed"],
+    "anxious": ["anxious", "nervous", "worried"],
+    "stressed": ["stressed", "overwhelmed", "tense"],
+}
+MOOD_PATTERNS = {
+    mood: re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")\b")
+    for mood, words in MOOD_KEYWORDS.items()
+}
+
 def analyze_mood(text: str) -> str:
     """
     Basic keyword-based mood analysis.
     Returns: 'happy', 'sad', 'anxious', 'stressed', or 'neutral'.
     """
     text_lower = text.lower()
-    if any(word in text_lower for word in ["happy", "joy", "excited", "grateful"]):
-        return "happy"
-    elif any(word in text_lower for word in ["sad", "down", "depressed"]):
-        return "sad"
-    elif any(word in text_lower for word in ["anxious", "nervous", "worried"]):
-        return "anxious"
-    elif any(word in text_lower for word in ["stressed", "overwhelmed", "tense"]):
-        return "stressed"
-    else:
-        return "neutral"
+    for mood, pattern in MOOD_PATTERNS.items():
+        if pattern.search(text_lower):
+            return mood
+    return "neutral"
 
 def default_mood_response() -> str:
     """
@@ -9,7 +9,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-from components import home, chat, voice, documents_images, websearch, history_insights
+# Only the home/login page is imported up front; the other pages (and the models
+# they pull in) are imported when first opened.
+from components import home
 from config.settings import settings  # Loads API keys from .env
 from services.auth import get_or_create_user  # Simple username-based authentication
 
@@ -83,14 +85,19 @@ with st.sidebar:
 if page == "🏠 Home":
     home.render_home()
 elif page == "💬 ChatterBox":
+    from components import chat
     chat.render_chat()
 elif page == "🎤 Voice Lounge":
+    from components import voice
     voice.render_voice()
 elif page == "📄 Documents & 🖼️ Images":
+    from components import documents_images
     documents_images.render()
 elif page == "🌐 Search Solutions":
+    from components import websearch
     websearch.render_web_search()
 elif page == "📊 History & Insights":
+    from components import history_insights
     history_insights.show_history_page()
 else:
     st.error("Section not found.")
@@ -0,0 +1,102 @@
+# benchmarks/bench_analytics_backends.py
+# Parity check and RSS / latency comparison of the analytics inference backends.
+# Run from the project root: python -m benchmarks.bench_analytics_backends [--backends torch quantized onnx]
+# The "onnx" backend needs `python -m utils.analytics_export` first.
+# Exits with status 1 if a backend's scores differ from "torch" by more than --tolerance.
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+TEXTS = [
+    "I felt really anxious before my presentation today.",
+    "Talking to my friend afterwards helped me calm down a lot.",
+    "Sleep has been difficult and I keep waking up at night.",
+    "I'm grateful that my family supported me this week.",
+    "Work pressure is building up and I feel overwhelmed.",
+    "Going for a walk in the evening made me feel lighter.",
+    "I don't know why, but I've been crying a lot lately.",
+    "Today was honestly a great day, I finally passed my exam!",
+]
+REPEATS = 20
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def worker():
+    """Runs inside a fresh interpreter with NEUROMENTOR_ANALYTICS_BACKEND set; prints JSON."""
+    from utils.analytics import analyze_sentiment, analyze_emotions
+
+    scores = [(analyze_sentiment(t)["score"], analyze_emotions(t)) for t in TEXTS]  # also warms up
+
+    latencies = []
+    for _ in range(REPEATS):
+        for text in TEXTS:
+            start = time.perf_counter()
+            analyze_sentiment(text)
+            analyze_emotions(text)
+            latencies.append(time.perf_counter() - start)
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    print(json.dumps({
+        "scores": scores,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "rss_mb": rss_kb / 1024,
+    }))
+
+
+def run_backend(backend):
+    env = dict(os.environ, NEUROMENTOR_ANALYTICS_BACKEND=backend)
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_analytics_backends", "--worker"],
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{backend} backend failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def max_score_diff(reference, other):
+    diff = 0.0
+    for (ref_sent, ref_emos), (sent, emos) in zip(reference, other):
+        diff = max(diff, abs(ref_sent - sent))
+        for label, score in ref_emos.items():
+            diff = max(diff, abs(score - emos.get(label, 0.0)))
+    return diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--backends", nargs="+", default=["torch", "quantized", "onnx"])
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Max allowed score difference vs torch.")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker()
+        sys.exit(0)
+
+    reference = run_backend("torch")
+    ok = True
+    print(f"{'backend':>10} | {'RSS MB':>8} | {'p50 ms':>7} | {'p95 ms':>7} | {'max diff':>8}")
+    for backend in args.backends:
+        try:
+            result = reference if backend == "torch" else run_backend(backend)
+        except RuntimeError as e:
+            print(f"{backend:>10} | skipped: {str(e).splitlines()[-1]}")
+            continue
+        diff = max_score_diff(reference["scores"], result["scores"])
+        ok = ok and diff <= args.tolerance
+        print(f"{backend:>10} | {result['rss_mb']:>8.1f} | {result['p50_ms']:>7.2f} | "
+              f"{result['p95_ms']:>7.2f} | {diff:>8.4f}")
+
+    print("Parity OK" if ok else f"Parity FAILED (tolerance {args.tolerance})")
+    sys.exit(0 if ok else 1)
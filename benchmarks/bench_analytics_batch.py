@@ -0,0 +1,60 @@
+# benchmarks/bench_analytics_batch.py
+# Run from the project root: python -m benchmarks.bench_analytics_batch [--sessions 30]
+# Compares the old per-call loop (first 512 characters of each session) with the batched
+# APIs that score every chunk of every session.
+
+import time
+import random
+import argparse
+
+from utils.analytics import (
+    _sentiment_pipeline, _emotion_pipeline, analyze_sentiment_batch, analyze_emotions_batch
+)
+
+SENTENCES = [
+    "I felt really anxious before my presentation today.",
+    "Talking to my friend afterwards helped me calm down a lot.",
+    "Sleep has been difficult and I keep waking up at night.",
+    "I'm grateful that my family supported me this week.",
+    "Work pressure is building up and I feel overwhelmed.",
+    "Going for a walk in the evening made me feel lighter.",
+]
+
+
+def make_sessions(count, sentences_per_session=120, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(SENTENCES) for _ in range(sentences_per_session)) for _ in range(count)]
+
+
+def per_call_loop(sessions):
+    """The previous behaviour: one pipeline call per session, truncated to 512 characters."""
+    sentiment, emotion = _sentiment_pipeline(), _emotion_pipeline()
+    for text in sessions:
+        sentiment(text[:512])
+        emotion(text[:512])
+
+
+def batched(sessions, batch_size):
+    analyze_sentiment_batch(sessions, batch_size=batch_size)
+    analyze_emotions_batch(sessions, batch_size=batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=30, help="Sessions to score (a month by default).")
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    sessions = make_sessions(args.sessions)
+    per_call_loop(sessions[:1])  # load models / warm up
+
+    start = time.perf_counter()
+    per_call_loop(sessions)
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched(sessions, args.batch_size)
+    batch_s = time.perf_counter() - start
+
+    print(f"Per-call loop (first 512 chars only): {args.sessions / loop_s:8.2f} sessions/sec")
+    print(f"Batched (full text, batch={args.batch_size}):    {args.sessions / batch_s:8.2f} sessions/sec")
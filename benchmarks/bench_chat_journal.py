@@ -0,0 +1,69 @@
+# benchmarks/bench_chat_journal.py
+# Run from the project root: python -m benchmarks.bench_chat_journal
+
+import os
+import json
+import time
+import tempfile
+
+from utils import chat_journal
+
+SIZES = [10, 1000, 10000]
+SAMPLE = chat_journal.COMPACT_EVERY  # messages timed at each size; the last append triggers a compaction
+
+
+def _message(i):
+    return {
+        "timestamp": "2025-01-01 12:00:00",
+        "role": "user" if i % 2 == 0 else "neuromentor",
+        "type": "text",
+        "source": "chat",
+        "content": f"Message number {i}: I've been feeling a bit stressed about exams lately.",
+    }
+
+
+def legacy_append(filename, message):
+    """The old read-modify-write behaviour of save_message_to_history."""
+    if os.path.exists(filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            chat_data = json.load(f)
+    else:
+        chat_data = []
+    chat_data.append(message)
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(chat_data, f, ensure_ascii=False, indent=2)
+
+
+def journal_append(filename, message):
+    chat_journal.append_message(filename, message)
+
+
+def per_message_latency(append, size):
+    """
+    Pre-populates a day with `size` messages, then times SAMPLE more appends.
+    Returns (mean ms, worst ms) per message; for the journal the worst case is the compaction.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "session_2025-01-01.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump([_message(i) for i in range(size)], f, ensure_ascii=False, indent=2)
+
+        latencies = []
+        for i in range(SAMPLE):
+            start = time.perf_counter()
+            append(filename, _message(size + i))
+            latencies.append(time.perf_counter() - start)
+
+        chat_journal.flush_journals()
+        assert len(chat_journal.read_session(filename)) == size + SAMPLE
+        chat_journal.discard_session(filename)
+    return sum(latencies) / SAMPLE * 1000, max(latencies) * 1000
+
+
+if __name__ == "__main__":
+    print(f"{SAMPLE} appends per size, including one journal compaction")
+    print(f"{'messages/day':>12} | {'legacy ms/msg (max)':>19} | {'journal ms/msg (max)':>20}")
+    for size in SIZES:
+        legacy = per_message_latency(legacy_append, size)
+        journal = per_message_latency(journal_append, size)
+        print(f"{size:>12} | {legacy[0]:>8.3f} ({legacy[1]:>8.3f}) | {journal[0]:>8.3f} ({journal[1]:>9.3f})")
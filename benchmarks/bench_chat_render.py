@@ -0,0 +1,80 @@
+# benchmarks/bench_chat_render.py
+# Per-rerun cost of the ChatterBox transcript with a long session: the old renderer
+# (one HTML block + <style> per message, every message) vs the paginated renderer
+# (latest page only, shared CSS once, cached fragments).
+# Run from the project root: python -m benchmarks.bench_chat_render [--messages 5000]
+
+import time
+import argparse
+
+import streamlit as st
+from components.chat import CHAT_CSS, PAGE_SIZE, render_message_html
+
+RERUNS = 20
+
+
+def legacy_message_html(message, username):
+    """The old per-message block, including its own <style> tag."""
+    alignment = "flex-end" if message["role"] == "user" else "flex-start"
+    bg_color = "#DCF8C6" if message["role"] == "user" else "#E6E6FA"
+    sender = f"🧑‍💻 {username}" if message["role"] == "user" else "🧠 NeuroMentor"
+    return f"""
+        <div style="display: flex; justify-content: {alignment}; margin-bottom: 12px; animation: fadeIn 0.5s;">
+            <div style="background-color: {bg_color}; padding: 14px 20px; border-radius: 18px; max-width: 75%; word-wrap: break-word; box-shadow: 0 2px 6px rgba(0, 0, 0, 0.1);">
+                <div style="font-size: 12px; color: gray;">{sender} · {message.get("timestamp", "")}</div>
+                <div style="margin-top: 6px; font-size: 16px;">{message["content"]}</div>
+            </div>
+        </div>
+
+        <style>
+            @keyframes fadeIn {{
+                from {{ opacity: 0; }}
+                to {{ opacity: 1; }}
+            }}
+        </style>
+        """
+
+
+def legacy_rerun(messages, username):
+    blocks = [legacy_message_html(message, username) for message in messages]
+    return len(blocks), sum(len(block) for block in blocks)
+
+
+def paginated_rerun(messages):
+    html = CHAT_CSS + "".join(render_message_html(message) for message in messages[-PAGE_SIZE:])
+    return 1, len(html)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    st.session_state.username = "bench"
+    print(f"{'messages':>9} {'legacy ms':>10} {'legacy KB':>10} {'blocks':>7} {'paged ms':>9} {'paged KB':>9}")
+    for count in sorted({100, 1000, args.messages}):
+        messages = [
+            {"role": "user" if i % 2 == 0 else "assistant",
+             "content": f"Message {i}: I've been thinking about how the week went and what to change.",
+             "timestamp": "10:15 AM"}
+            for i in range(count)
+        ]
+
+        start = time.perf_counter()
+        for _ in range(RERUNS):
+            blocks, legacy_bytes = legacy_rerun(messages, "bench")
+        legacy_ms = (time.perf_counter() - start) / RERUNS * 1000
+
+        paginated_rerun(messages)  # first rerun fills the fragment cache
+        start = time.perf_counter()
+        for _ in range(RERUNS):
+            _, paged_bytes = paginated_rerun(messages)
+        paged_ms = (time.perf_counter() - start) / RERUNS * 1000
+
+        print(f"{count:>9} {legacy_ms:>10.2f} {legacy_bytes / 1024:>10.0f} {blocks:>7} "
+              f"{paged_ms:>9.3f} {paged_bytes / 1024:>9.1f}")
+    print("(legacy also makes one st.markdown call per message; the paginated renderer makes one in total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_context_window.py
+# Prompt size per turn of the bounded ConversationContext vs passing the full transcript,
+# over a long synthetic chat, with a local stand-in for the Gemini summarizer.
+# Run from the project root: python -m benchmarks.bench_context_window [--turns 2000]
+
+import time
+import argparse
+
+from agent.context_window import ConversationContext
+from utils.tokens import count_tokens
+
+USER_LINES = [
+    "I've been feeling really anxious about my exams next week.",
+    "My roommate keeps playing loud music at night and I can't sleep.",
+    "Today was actually okay, I went for a walk in the park with my dog.",
+    "I don't know how to tell my parents that I want to change my major.",
+]
+REPLY = "That sounds like a lot to carry 💙 What do you think would help you most right now? " * 2
+
+
+class StubSummarizer:
+    """Returns a summary of bounded size and counts calls/tokens sent."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        self.prompt_tokens += count_tokens(prompt)
+        return "The user has talked about exam anxiety, poor sleep and family pressure. " * 3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    summarizer = StubSummarizer()
+    context = ConversationContext(summarizer)
+    full_tokens = 0
+    checkpoints = {10, 100, 1000, args.turns}
+
+    print(f"{'turn':>6} {'bounded tokens':>15} {'full-history tokens':>20}")
+    start = time.perf_counter()
+    bounded = []
+    for turn in range(1, args.turns + 1):
+        user_message = USER_LINES[turn % len(USER_LINES)]
+        prompt_tokens = count_tokens(context.render() + user_message)
+        bounded.append(prompt_tokens)
+        if turn in checkpoints:
+            print(f"{turn:>6} {prompt_tokens:>15} {full_tokens + count_tokens(user_message):>20}")
+        context.add_exchange(user_message, REPLY)
+        context.wait()  # in a real chat the summary is ready while the user reads and types
+        full_tokens += count_tokens(user_message) + count_tokens(REPLY)
+    elapsed = time.perf_counter() - start
+
+    print(f"Max bounded prompt: {max(bounded)} tokens over {args.turns} turns")
+    print(f"Summarizer calls: {summarizer.calls} ({summarizer.calls / args.turns:.2f} per turn, "
+          f"{summarizer.prompt_tokens / max(summarizer.calls, 1):.0f} tokens each)")
+    print(f"Context bookkeeping: {elapsed / args.turns * 1000:.3f} ms per turn")
+
+
+if __name__ == "__main__":
+    main()
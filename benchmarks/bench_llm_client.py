@@ -0,0 +1,110 @@
+# benchmarks/bench_llm_client.py
+# Runs N concurrent "sessions" against a local fake Gemini server through the shared
+# LLM client's chat adapter and shows they complete in parallel (not N x latency),
+# including retries. tests/test_llm_client.py covers the adapters with assertions.
+# Run from the project root: python -m benchmarks.bench_llm_client [--sessions 8]
+
+import json
+import time
+import asyncio
+import argparse
+import threading
+import urllib.request
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.llm_client import LLMClient
+from utils.metrics import get_metrics
+
+LATENCY = 0.5        # seconds the fake model "thinks" per request
+FAIL_EVERY = 4       # every Nth request answers 429 once
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    counter = 0
+    counter_lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.counter_lock:
+            FakeGeminiHandler.counter += 1
+            n = FakeGeminiHandler.counter
+        if n % FAIL_EVERY == 0:
+            self.send_response(429)
+            self.end_headers()
+            return
+        time.sleep(LATENCY)
+        payload = json.dumps({"text": f"echo: {body['prompt']}"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def _post(url, prompt):
+    request = urllib.request.Request(url, data=json.dumps({"prompt": prompt}).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())["text"]
+    except urllib.error.HTTPError as e:
+        raise HTTPStatusError(e.code)
+
+
+class FakeChatModel:
+    """Just enough of ChatGoogleGenerativeAI for LLMClient.invoke_chat."""
+    model = "fake-gemini"
+    max_retries = 0
+
+    def __init__(self, url):
+        self.url = url
+
+    async def ainvoke(self, prompt):
+        return await asyncio.to_thread(_post, self.url, prompt)
+
+
+def run_sessions(client, url, sessions):
+    """Each session is a separate thread using the sync facade, like Streamlit script threads."""
+    results = [None] * sessions
+    llm = FakeChatModel(url)
+
+    def session(i):
+        results[i] = client.invoke_chat(llm, f"hi {i}")
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/generate"
+
+    client = LLMClient(max_concurrency=args.concurrency, timeout=5, max_retries=3, base_delay=0.05)
+    elapsed, results = run_sessions(client, url, args.sessions)
+    server.shutdown()
+
+    assert all(r and r.startswith("echo:") for r in results), results
+    print(f"{args.sessions} sessions, concurrency {args.concurrency}: {elapsed:.2f} s "
+          f"(serial would be ~{args.sessions * LATENCY:.2f} s)")
+    print("Counters:", get_metrics()["counters"])
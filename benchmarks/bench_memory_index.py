@@ -0,0 +1,78 @@
+# benchmarks/bench_memory_index.py
+# Chat-turn cost of memory indexing (background queue vs embedding inline) and
+# retrieval latency over a synthetic history, using the real MiniLM model.
+# Run from the project root: python -m benchmarks.bench_memory_index [--exchanges 5000]
+
+import time
+import shutil
+import argparse
+import tempfile
+
+import utils.memory_index as memory_index
+from utils.embeddings import embed_texts
+
+TOPICS = [
+    "I couldn't sleep again because of exam stress",
+    "my manager criticised my presentation in front of everyone",
+    "I had a great run this morning and felt calm afterwards",
+    "I keep arguing with my sister about money",
+    "I feel lonely since moving to a new city",
+    "meditation before bed has been helping a little",
+]
+
+
+def synthetic_exchange(i):
+    topic = TOPICS[i % len(TOPICS)]
+    return {
+        "timestamp": f"2024-01-{i % 28 + 1:02d} 10:00:00",
+        "source": "chat",
+        "user": f"{topic} (day {i})",
+        "assistant": f"That sounds hard. What helped last time when {topic.split()[1]} happened?",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exchanges", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    memory_index.MEMORY_DIR = tempfile.mkdtemp(prefix="bench_memory_")
+    embed_texts(["warm up"])
+    try:
+        start = time.perf_counter()
+        exchanges = [synthetic_exchange(i) for i in range(args.exchanges)]
+        for i in range(0, len(exchanges), memory_index.QUEUE_BATCH_SIZE):
+            memory_index.add_exchanges("bench", exchanges[i:i + memory_index.QUEUE_BATCH_SIZE])
+        print(f"Indexed {args.exchanges} exchanges in {time.perf_counter() - start:.1f}s")
+
+        # Chat-turn cost: inline embedding vs handing the messages to the background queue
+        start = time.perf_counter()
+        for i in range(args.turns):
+            memory_index.add_exchanges("inline", [synthetic_exchange(i)])
+        inline_ms = (time.perf_counter() - start) / args.turns * 1000
+
+        start = time.perf_counter()
+        for i in range(args.turns):
+            exchange = synthetic_exchange(i)
+            memory_index.enqueue_message("queued", "user", exchange["user"])
+            memory_index.enqueue_message("queued", "assistant", exchange["assistant"])
+        queued_ms = (time.perf_counter() - start) / args.turns * 1000
+        memory_index.flush()
+        print(f"Per-turn indexing cost: inline {inline_ms:.2f} ms, queued {queued_ms:.3f} ms")
+
+        # Retrieval at reply time (query embedding + search + budget packing)
+        queries = ["I can't sleep before exams", "work feedback hurt", "feeling isolated lately"]
+        start = time.perf_counter()
+        for _ in range(args.turns):
+            for query in queries:
+                memories = memory_index.retrieve_memories("bench", query, top_k=3, token_budget=400)
+        retrieve_ms = (time.perf_counter() - start) / (args.turns * len(queries)) * 1000
+        print(f"Retrieval: {retrieve_ms:.2f} ms per query at {args.exchanges} exchanges")
+        print("Example:", memories[0] if memories else "(none)")
+    finally:
+        shutil.rmtree(memory_index.MEMORY_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
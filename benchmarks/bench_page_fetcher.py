@@ -0,0 +1,123 @@
+# benchmarks/bench_page_fetcher.py
+# Fetch-and-extract pipeline against a local fixture server: concurrent fetch time vs
+# serial, per-host concurrency limit, size cap on an oversized page, boilerplate removal,
+# and ETag revalidation (304) on the second pass.
+# tests/test_page_fetcher.py covers the same behaviour with assertions.
+# Run from the project root: python -m benchmarks.bench_page_fetcher
+
+import time
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import utils.page_fetcher as page_fetcher
+
+LATENCY = 0.3
+ARTICLE = (
+    "<html><head><title>Managing exam stress {n}</title><style>body{{color:red}}</style></head><body>"
+    "<nav><a href='/'>Home</a> <a href='/about'>About us and our whole team of writers</a></nav>"
+    "<header>Subscribe to our newsletter for weekly wellbeing tips and tricks!</header>"
+    "<article><h1>Managing exam stress</h1>"
+    "<p>Break revision into short sessions with planned breaks, and keep a regular sleep schedule.</p>"
+    "<p>Slow breathing &amp; a short walk lower physical tension before an exam (page {n}).</p>"
+    "<script>var tracking = 'this should never reach the prompt';</script>"
+    "</article><footer>© 2024 Example Health. All rights reserved. Cookie settings.</footer></body></html>"
+)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+    full_responses = 0
+    not_modified = 0
+
+    def do_GET(self):
+        with self.lock:
+            FixtureHandler.active += 1
+            FixtureHandler.max_active = max(FixtureHandler.max_active, FixtureHandler.active)
+        try:
+            time.sleep(LATENCY)
+            etag = f'"{self.path}-v1"'
+            if self.headers.get("If-None-Match") == etag:
+                with self.lock:
+                    FixtureHandler.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if self.path == "/huge":
+                body = ("<p>" + "Endless filler text about wellbeing. " * 50 + "</p>") * 2000
+            else:
+                body = ARTICLE.format(n=self.path.strip("/"))
+            payload = body.encode("utf-8")
+            with self.lock:
+                FixtureHandler.full_responses += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            try:
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client stopped reading at its size cap
+        finally:
+            with self.lock:
+                FixtureHandler.active -= 1
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # the capped download closed the connection
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/{n}" for n in range(1, 7)] + [f"{base}/huge"]
+    cache_dir = tempfile.mkdtemp(prefix="bench_pages_")
+
+    try:
+        start = time.perf_counter()
+        pages = page_fetcher.fetch_pages(urls, cache_dir=cache_dir, max_bytes=200_000)
+        elapsed = time.perf_counter() - start
+        print(f"Fetched {len(urls)} pages from one host in {elapsed:.2f}s "
+              f"(serial ~{len(urls) * LATENCY:.1f}s); max concurrent requests to the host: "
+              f"{FixtureHandler.max_active} (limit {page_fetcher.PER_HOST_LIMIT})")
+
+        page = pages[0]
+        print(f"Extracted title: {page['title']!r}")
+        print(f"Extracted text:\n  " + page["text"].replace("\n", "\n  "))
+        leaked = [word for word in ("tracking", "Subscribe", "Cookie", "About us") if word in page["text"]]
+        print(f"Boilerplate leaked into text: {leaked or 'none'}")
+        print(f"Oversized page capped to {len(pages[-1]['text']) / 1000:.0f}k chars of text")
+
+        # Past the TTL (ttl=0), cached pages are revalidated with their ETag
+        before = FixtureHandler.full_responses
+        revalidated = [page_fetcher.fetch_page(url, cache_dir, 200_000, ttl=0) for url in urls[:3]]
+        print(f"Revalidation: {FixtureHandler.not_modified} x 304, "
+              f"{FixtureHandler.full_responses - before} full downloads, "
+              f"text unchanged: {revalidated[0]['text'] == page['text']}")
+
+        start = time.perf_counter()
+        page_fetcher.fetch_pages(urls, cache_dir=cache_dir)
+        print(f"Within TTL: {len(urls)} pages from cache in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        print("\nPrompt passages:\n" + page_fetcher.build_passages(pages[:2], token_budget=200))
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
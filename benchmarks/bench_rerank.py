@@ -0,0 +1,62 @@
+# benchmarks/bench_rerank.py
+# Added latency of the snippet reranker (one MiniLM batch + vectorized scoring/dedup)
+# for 10 and 20 organic results, and what it selects vs the old results[:3].
+# Run from the project root: python -m benchmarks.bench_rerank [--repeats 50]
+
+import time
+import argparse
+
+from utils.embeddings import embed_texts
+from utils.metrics import get_metrics, reset_metrics
+from utils.snippet_rerank import rerank_results
+
+QUERY = "how to manage exam stress"
+SNIPPETS = [
+    ("Top 10 laptops for students in 2024", "Compare prices and battery life of the best student laptops."),
+    ("Exam stress - NHS", "Exam stress can affect sleep and appetite. Plan revision, take breaks and talk to someone."),
+    ("Exam stress - NHS (mirror)", "Exam stress can affect sleep and appetite. Plan revision, take breaks and talk to someone."),
+    ("University sports fixtures", "This weekend's football and rugby fixtures for university teams."),
+    ("Coping with exam anxiety", "Breathing exercises and realistic study timetables help reduce anxiety before exams."),
+    ("Exam timetable 2024", "Download the official exam timetable PDF for all subjects."),
+    ("Sleep and memory", "Getting enough sleep before an exam improves recall and concentration."),
+    ("Student discounts", "Save on food, travel and software with your student card."),
+    ("Mindfulness for students", "Short mindfulness practices can lower stress during revision periods."),
+    ("How to write a CV", "A guide to writing your first CV as a graduate."),
+]
+
+
+def make_results(count):
+    return [
+        {"title": title, "snippet": snippet, "link": f"https://example.org/{i}"}
+        for i, (title, snippet) in ((i, SNIPPETS[i % len(SNIPPETS)]) for i in range(count))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    embed_texts(["warm up"])  # model load is not part of the per-search cost
+    for count in (10, 20):
+        results = make_results(count)
+        reset_metrics()
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            chosen = rerank_results(QUERY, results)
+        total_ms = (time.perf_counter() - start) / args.repeats * 1000
+        timings = get_metrics()["timings"]
+        print(f"{count} results: {total_ms:.2f} ms per rerank "
+              f"(embed {timings['rerank.embed']['avg_ms']:.2f} ms, "
+              f"score+dedup+pack {timings['rerank.select']['avg_ms']:.3f} ms)")
+
+    print("\nOld context (results[:3]):")
+    for result in make_results(10)[:3]:
+        print(f"  - {result['title']}")
+    print("Reranked context:")
+    for result in rerank_results(QUERY, make_results(10)):
+        print(f"  - {result['title']} ({result['score']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
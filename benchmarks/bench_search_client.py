@@ -0,0 +1,103 @@
+# benchmarks/bench_search_client.py
+# Replays a wellness-search workload (repeated and concurrent identical queries) against a
+# local stub Serper server through SearchClient, and reports cache hit rate, request
+# coalescing and upstream latency. Also checks the disk cache survives a new client.
+# tests/test_search_client.py covers the client's behaviour with assertions.
+# Run from the project root: python -m benchmarks.bench_search_client [--requests 200]
+
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.search_client import SearchClient
+
+LATENCY = 0.3  # seconds the stub takes per search
+
+QUERIES = [
+    "how to manage exam stress",
+    "How to manage exam stress?",
+    "breathing exercises for anxiety",
+    "tips to sleep better",
+    "how to deal with burnout at work",
+    "mindfulness for beginners",
+    "what to do when feeling lonely",
+    "how to stop overthinking",
+]
+
+
+class StubSerperHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+    requests_seen = 0
+    connections = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            StubSerperHandler.requests_seen += 1
+            StubSerperHandler.connections.add(self.client_address)
+        time.sleep(LATENCY)
+        payload = json.dumps({"organic": [
+            {"title": f"Result {i} for {body['q']}", "link": f"https://example.org/{i}", "snippet": "..."}
+            for i in range(5)
+        ]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSerperHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    cache_dir = tempfile.mkdtemp(prefix="bench_search_")
+
+    try:
+        client = SearchClient(api_key="stub", url=url, cache_dir=cache_dir)
+        rng = random.Random(0)
+        workload = [rng.choice(QUERIES) for _ in range(args.requests)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(client.search, workload))
+        elapsed = time.perf_counter() - start
+
+        report = client.report()
+        print(f"{args.requests} searches on {args.threads} threads in {elapsed:.2f}s "
+              f"(uncached would be ~{args.requests * LATENCY / args.threads:.1f}s)")
+        print(f"Hit rate: {report['hit_rate']:.1%} (hits {report['hits']}, coalesced {report['coalesced']}, "
+              f"misses {report['misses']})")
+        print(f"Upstream: {report['upstream_calls']} calls, {report['upstream_avg_ms']:.0f} ms avg; "
+              f"stub saw {StubSerperHandler.requests_seen} requests on "
+              f"{len(StubSerperHandler.connections)} connections")
+
+        # A fresh client (e.g. after a restart) answers from the disk cache
+        restarted = SearchClient(api_key="stub", url=url, cache_dir=cache_dir)
+        start = time.perf_counter()
+        for query in QUERIES:
+            restarted.search(query)
+        print(f"After restart: {restarted.report()['hit_rate']:.0%} hit rate, "
+              f"{(time.perf_counter() - start) / len(QUERIES) * 1000:.2f} ms per search")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_session_index.py
+# Run from the project root: python -m benchmarks.bench_session_index
+
+import os
+import time
+import tempfile
+from datetime import datetime, date
+
+from utils import session_index
+from utils.file_ops import get_all_session_paths, get_user_session_paths
+
+USER_COUNTS = [10, 100, 1000, 10000]
+DAYS_PER_USER = 3
+REPEATS = 5
+
+
+def _populate(base_dir, users):
+    """Creates `users` users with DAYS_PER_USER sessions each, plus their manifests."""
+    for u in range(users):
+        username = f"user{u}"
+        for d in range(1, DAYS_PER_USER + 1):
+            day = f"2025-01-{d:02d}"
+            session_dir = os.path.join(base_dir, username, day)
+            os.makedirs(session_dir, exist_ok=True)
+            snapshot = os.path.join(session_dir, f"session_{day}.json")
+            with open(snapshot, "w", encoding="utf-8") as f:
+                f.write("[]")
+            session_index.record_message(username, day, snapshot, base_dir=base_dir)
+
+
+def legacy_lookup(base_dir, username, start, end):
+    """The old History & Insights path: walk every user's folder, filter by date."""
+    paths = []
+    for chat_path in get_all_session_paths(base_dir):
+        date_obj = datetime.strptime(os.path.basename(os.path.dirname(chat_path)), "%Y-%m-%d").date()
+        if start <= date_obj <= end:
+            paths.append(chat_path)
+    return paths
+
+
+def manifest_lookup(base_dir, username, start, end):
+    return get_user_session_paths(username, start, end, base_dir=base_dir)
+
+
+def _time(fn, *args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        session_index._manifests.clear()  # measure a cold page load
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    start, end = date(2025, 1, 1), date(2025, 1, 31)
+    print(f"{'users':>6} | {'os.walk ms':>10} | {'manifest ms':>11}")
+    for users in USER_COUNTS:
+        with tempfile.TemporaryDirectory() as base_dir:
+            _populate(base_dir, users)
+            legacy = _time(legacy_lookup, base_dir, "user0", start, end)
+            manifest = _time(manifest_lookup, base_dir, "user0", start, end)
+            print(f"{users:>6} | {legacy:>10.2f} | {manifest:>11.3f}")
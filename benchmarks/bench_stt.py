@@ -0,0 +1,111 @@
+# benchmarks/bench_stt.py
+# Word error rate and real-time factor of the STT backends on short sample clips and on
+# one long clip (the short clips joined with pauses, decoded in chunks). No recorded
+# audio ships with the repo, so the clips are synthesized with pyttsx3 from the
+# reference sentences below; pass --clips DIR to use recorded <name>.wav files with a
+# matching <name>.txt reference instead.
+# Run from the project root: python -m benchmarks.bench_stt [--backends whisper google] [--clips DIR]
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+from config.settings import settings
+from utils.stt import (
+    TARGET_RATE, WhisperSTT, get_stt_backend, get_whisper_model, load_wav, split_chunks,
+    to_mono_16k, transcribe, word_error_rate,
+)
+from utils.metrics import get_metrics, reset_metrics
+
+REFERENCES = {
+    "exams": "I'm so stressed about my exams next week.",
+    "sleep": "I haven't been sleeping well and I feel tired all the time.",
+    "friends": "My friends don't seem to understand what I'm going through.",
+    "breathing": "Can you walk me through a short breathing exercise?",
+    "plan": "Help me make a revision plan for maths and chemistry.",
+}
+PAUSE_SECONDS = 0.8
+LONG_CHUNK_SECONDS = 10.0  # shorter than Whisper's 30 s so the long clip crosses several chunk boundaries
+
+
+def synthesize_clips(work_dir):
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    for name, text in REFERENCES.items():
+        engine.save_to_file(text, os.path.join(work_dir, f"{name}.wav"))
+    engine.runAndWait()
+    return {name: (os.path.join(work_dir, f"{name}.wav"), text) for name, text in REFERENCES.items()}
+
+
+def recorded_clips(clip_dir):
+    clips = {}
+    for filename in sorted(os.listdir(clip_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext == ".wav" and os.path.exists(os.path.join(clip_dir, name + ".txt")):
+            with open(os.path.join(clip_dir, name + ".txt"), encoding="utf-8") as f:
+                clips[name] = (os.path.join(clip_dir, filename), f.read().strip())
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=[settings.STT_BACKEND])
+    parser.add_argument("--clips", help="directory of <name>.wav recordings with <name>.txt references")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_stt_")
+    try:
+        clips = recorded_clips(args.clips) if args.clips else synthesize_clips(work_dir)
+        # numpy audio as record_audio returns it: no WAV round trip inside transcribe()
+        audio = {name: to_mono_16k(*load_wav(path)) for name, (path, _) in clips.items()}
+        pause = np.zeros(int(PAUSE_SECONDS * TARGET_RATE), dtype=np.float32)
+        long_audio = np.concatenate([part for name in clips for part in (audio[name], pause)])
+        long_reference = " ".join(text for _, text in clips.values())
+        print(f"{len(clips)} clips, long clip {len(long_audio) / TARGET_RATE:.1f}s "
+              f"in {len(split_chunks(long_audio, LONG_CHUNK_SECONDS))} chunks")
+
+        for backend in args.backends:
+            print(f"\n== {backend} ==")
+            if backend == "whisper":
+                start = time.perf_counter()
+                get_whisper_model(settings.STT_MODEL)
+                first = time.perf_counter() - start
+                start = time.perf_counter()
+                get_whisper_model(settings.STT_MODEL)
+                print(f"Model '{settings.STT_MODEL}' load: {first:.2f}s first call, "
+                      f"{(time.perf_counter() - start) * 1000:.3f} ms cached")
+
+            reset_metrics()
+            errors = []
+            for name, (_, reference) in clips.items():
+                start = time.perf_counter()
+                hypothesis = transcribe(audio[name], TARGET_RATE, backend=backend)
+                elapsed = time.perf_counter() - start
+                errors.append(word_error_rate(reference, hypothesis))
+                print(f"  {name:<10} WER {errors[-1]:.2f}  RTF {elapsed / (len(audio[name]) / TARGET_RATE):.2f}  "
+                      f"'{hypothesis}'")
+            rtf = get_metrics()["values"]["stt.real_time_factor"]
+            print(f"Short clips: mean WER {np.mean(errors):.3f}, RTF avg {rtf['avg']:.2f} / p95 {rtf['p95']:.2f}")
+
+            stt = WhisperSTT(settings.STT_MODEL, chunk_seconds=LONG_CHUNK_SECONDS) \
+                if backend == "whisper" else get_stt_backend(backend)
+            start = time.perf_counter()
+            first_chunk, parts = None, []
+            for part in stt.transcribe_stream(long_audio, TARGET_RATE):
+                first_chunk = first_chunk or time.perf_counter() - start
+                parts.append(part)
+            elapsed = time.perf_counter() - start
+            print(f"Long clip: WER {word_error_rate(long_reference, ' '.join(parts)):.3f}, "
+                  f"RTF {elapsed / (len(long_audio) / TARGET_RATE):.2f}, "
+                  f"first chunk text after {first_chunk or 0:.2f}s of {elapsed:.2f}s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
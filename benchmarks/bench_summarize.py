@@ -0,0 +1,82 @@
+# benchmarks/bench_summarize.py
+# Map-reduce summarization of a synthetic 500-page document against a simulated Gemini
+# model (fixed latency per call, cost proportional to prompt size).
+# Run from the project root: python -m benchmarks.bench_summarize
+
+import time
+import shutil
+import random
+import asyncio
+import tempfile
+
+from utils import file_utils
+
+PAGES = 500
+WORDS_PER_PAGE = 450
+CALL_LATENCY = 0.3          # seconds per simulated call
+SECONDS_PER_1K_WORDS = 0.02  # simulated prompt-processing cost
+
+
+class SimulatedResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class SimulatedGemini:
+    model_name = "models/simulated-gemini"
+    calls = 0
+
+    async def generate_content_async(self, prompt):
+        SimulatedGemini.calls += 1
+        words = len(prompt.split())
+        await asyncio.sleep(CALL_LATENCY + SECONDS_PER_1K_WORDS * words / 1000)
+        return SimulatedResponse(" ".join(prompt.split()[-60:-1]))
+
+
+def make_document(pages=PAGES, seed=0):
+    rng = random.Random(seed)
+    vocabulary = ["stress", "sleep", "focus", "exercise", "routine", "breathing", "support",
+                  "journal", "habit", "energy", "mindfulness", "balance", "rest", "goal"]
+    return "\n\n".join(
+        " ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_PAGE)) for _ in range(pages)
+    )
+
+
+def timed_summary(document):
+    SimulatedGemini.calls = 0
+    start = time.perf_counter()
+    file_utils.summarize_document(document)
+    return time.perf_counter() - start, SimulatedGemini.calls
+
+
+if __name__ == "__main__":
+    simulated = SimulatedGemini()
+    file_utils.get_gemini_model = lambda: simulated
+    file_utils.SUMMARY_CACHE_DIR = tempfile.mkdtemp()
+
+    document = make_document()
+    words = len(document.split())
+    print(f"Document: {PAGES} pages, {words} words")
+    print(f"Single prompt (old): ~{CALL_LATENCY + SECONDS_PER_1K_WORDS * words / 1000:.2f} s simulated, "
+          f"and likely over the context limit")
+
+    cold, calls = timed_summary(document)
+    print(f"Map-reduce, cold cache: {cold:.2f} s, {calls} calls")
+
+    warm, calls = timed_summary(document)
+    print(f"Map-reduce, same document again: {warm:.3f} s, {calls} calls")
+
+    file_utils._summary_cache.clear()
+    overlapping = document + "\n\n" + make_document(pages=20, seed=1)
+    overlap, calls = timed_summary(overlapping)
+    print(f"Map-reduce, overlapping upload (+20 pages, memory cache cleared): {overlap:.2f} s, {calls} calls")
+
+    pages = document.split("\n\n")
+    pages.insert(3, make_document(pages=1, seed=2))  # a page inserted near the start
+    pages[200] = pages[200].replace("stress", "pressure", 5)  # and an edit in the middle
+    edited, calls = timed_summary("\n\n".join(pages))
+    map_chunks = len(file_utils.content_chunks(document))
+    print(f"Map-reduce, edited upload (page inserted at 4, page 200 edited): {edited:.2f} s, "
+          f"{calls} calls ({map_chunks} map chunks in the document)")
+
+    shutil.rmtree(file_utils.SUMMARY_CACHE_DIR, ignore_errors=True)
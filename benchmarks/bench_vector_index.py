@@ -0,0 +1,54 @@
+# benchmarks/bench_vector_index.py
+# Recall@k vs latency of the approximate index types against the exact flat baseline,
+# over synthetic clustered 384-d vectors (MiniLM-sized).
+# Run from the project root: python -m benchmarks.bench_vector_index [--chunks 100000]
+
+import argparse
+import numpy as np
+
+from utils.vector_index import build_index, search_index, evaluate_index
+
+DIMENSION = 384  # all-MiniLM-L6-v2
+
+# (index type, params) combinations to report
+CONFIGS = [
+    ("flat_ip", {}),
+    ("ivf_flat", {"nprobe": 4}),
+    ("ivf_flat", {"nprobe": 16}),
+    ("hnsw", {"ef_search": 32}),
+    ("hnsw", {"ef_search": 128}),
+    ("ivf_pq", {"nprobe": 16}),
+    ("ivf_pq", {"nprobe": 64}),
+    ("ivf_pq", {"pq_m": 16, "nprobe": 16}),
+    ("ivf_pq", {"nprobe": 16, "k_factor": 0}),  # no re-ranking: PQ ranking alone
+]
+
+
+def synthetic_embeddings(n, topics=500, noise=0.35, seed=0):
+    """Chunks scattered around topic centers, roughly like sentence embeddings of a library."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, DIMENSION)).astype(np.float32)
+    labels = rng.integers(0, topics, n)
+    return centers[labels] + noise * rng.standard_normal((n, DIMENSION)).astype(np.float32)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    data = synthetic_embeddings(args.chunks + args.queries)
+    embeddings, queries = data[:args.chunks], data[args.chunks:]
+
+    exact = build_index(embeddings, "flat_ip")
+    _, exact_ids = search_index(exact, queries, args.k, "flat_ip")
+
+    print(f"{args.chunks} chunks, {args.queries} queries, k={args.k}")
+    print(f"{'index':<10} {'params':<20} {'build s':>8} {'ms/query':>9} {'size MB':>8} {'recall@' + str(args.k):>10}")
+    for index_type, params in CONFIGS:
+        r = evaluate_index(embeddings, queries, index_type, params, k=args.k, exact_ids=exact_ids)
+        label = ",".join(f"{k}={v}" for k, v in params.items()) or "-"
+        print(f"{index_type:<10} {label:<20} {r['build_s']:>8.2f} {r['search_ms_per_query']:>9.3f} "
+              f"{r['size_mb']:>8.1f} {r[f'recall@{args.k}']:>10.3f}")
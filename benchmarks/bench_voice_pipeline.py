@@ -0,0 +1,109 @@
+# benchmarks/bench_voice_pipeline.py
+# One voice turn through VoicePipeline with a generated WAV fixture and stub STT / LLM /
+# TTS / playback engines (no microphone, network or speakers), compared with running
+# the same stages serially like the old render_voice did.
+# tests/test_voice_pipeline.py covers event order, errors and the helpers with assertions.
+# Run from the project root: python -m benchmarks.bench_voice_pipeline
+
+import os
+import math
+import time
+import wave
+import shutil
+import struct
+import tempfile
+
+from utils.voice_pipeline import VoicePipeline, SentenceSplitter, concat_wavs
+
+SAMPLE_RATE = 16000
+REPLY = (
+    "I'm really sorry you're feeling this stressed about your exams. "
+    "It makes sense to feel overwhelmed when so much seems to depend on them. "
+    "Try breaking your revision into short blocks with proper breaks in between. "
+    "A short walk or some slow breathing before you start can calm your body down. "
+    "And remember, one exam doesn't define you. "
+)
+STT_S = 0.8             # stub transcription time
+LLM_FIRST_TOKEN_S = 0.6  # stub time to first token
+LLM_WORD_S = 0.03       # stub streaming speed per word
+TTS_CHAR_S = 0.004      # stub synthesis time per character
+PLAY_RATE = 14          # stub playback speed, characters per second of speech
+
+
+def write_wav(path, seconds, freq=220.0):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        frames = (int(8000 * math.sin(2 * math.pi * freq * i / SAMPLE_RATE))
+                  for i in range(int(seconds * SAMPLE_RATE)))
+        f.writeframes(b"".join(struct.pack("<h", sample) for sample in frames))
+
+
+def make_stubs(work_dir):
+    def stt(audio_path):
+        assert os.path.exists(audio_path)
+        time.sleep(STT_S)
+        return "I'm so stressed about my exams next week"
+
+    def reply(text):
+        time.sleep(LLM_FIRST_TOKEN_S)
+        for word in REPLY.split(" "):
+            time.sleep(LLM_WORD_S)
+            yield word + " "
+
+    counter = iter(range(10_000))
+
+    def tts(sentence):
+        time.sleep(len(sentence) * TTS_CHAR_S)
+        path = os.path.join(work_dir, f"tts_{next(counter)}.wav")
+        write_wav(path, len(sentence) / PLAY_RATE / 10)  # short real WAV, the sleep models duration
+        return path
+
+    def play(path):
+        with wave.open(path, "rb") as f:
+            time.sleep(f.getnframes() / f.getframerate() * 10)
+
+    return stt, reply, tts, play
+
+
+def serial_turn(audio_path, stt, reply, tts, play):
+    start = time.perf_counter()
+    text = stt(audio_path)
+    response = "".join(reply(text))
+    path = tts(response)
+    first_audio = time.perf_counter() - start
+    play(path)
+    return first_audio, time.perf_counter() - start
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix="bench_voice_")
+    try:
+        fixture = os.path.join(work_dir, "user_turn.wav")
+        write_wav(fixture, 3.0)
+        stt, reply, tts, play = make_stubs(work_dir)
+
+        first_audio, total = serial_turn(fixture, stt, reply, tts, play)
+        print(f"Serial:    first audio at {first_audio:.2f}s, turn done at {total:.2f}s")
+
+        events = list(VoicePipeline(stt, reply, tts, play).run(fixture))
+        timings = events[-1][1]
+        print(f"Pipelined: first audio at {timings['first_audio']:.2f}s, turn done at {timings['total']:.2f}s")
+        print("Stage timings: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+
+        sentences = [event[2] for event in events if event[0] == "sentence"]
+        audio = sorted((event[1], event[2]) for event in events if event[0] == "audio")
+        print(f"{len(sentences)} sentences, {len(audio)} audio clips, "
+              f"joined reply audio {len(concat_wavs([path for _, path in audio])) / 1024:.0f} KB")
+        assert " ".join(sentences).split() == REPLY.split()
+
+        splitter = SentenceSplitter()
+        streamed = [s for chunk in ("Hi. I hear", " you! Exams are hard.", " Rest.") for s in splitter.feed(chunk)]
+        print(f"Sentence splitting on a stream: {streamed + splitter.flush()}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/startup_imports.py
+# Startup import report for the home/login path, based on `python -X importtime`.
+# Run from the project root: python -m benchmarks.startup_imports
+# Exits with status 1 when the budget is exceeded or a heavy module is imported.
+
+import sys
+import subprocess
+
+# Modules app.py imports before the login page renders
+LOGIN_PATH_MODULES = ["streamlit", "components.home", "config.settings", "services.auth"]
+
+IMPORT_BUDGET_MS = 2500
+FORBIDDEN_MODULES = ["torch", "transformers", "sentence_transformers", "faiss",
+                     "whisper", "sounddevice", "pyttsx3", "langchain_google_genai"]
+TOP_N = 15
+
+
+def run_importtime():
+    """Imports the login path in a fresh interpreter and returns (importtime rows, loaded forbidden modules)."""
+    code = (
+        f"import {', '.join(LOGIN_PATH_MODULES)}\n"
+        "import sys\n"
+        f"print(','.join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return rows, loaded
+
+
+def startup_report():
+    rows, loaded = run_importtime()
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+
+    print(f"Login path: {', '.join(LOGIN_PATH_MODULES)}")
+    print(f"Total import time: {total_ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    print(f"\nTop {TOP_N} imports by cumulative time:")
+    for name, _, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:TOP_N]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name.strip()}")
+
+    ok = True
+    if total_ms > IMPORT_BUDGET_MS:
+        print(f"\nFAIL: import time {total_ms:.1f} ms exceeds the {IMPORT_BUDGET_MS} ms budget")
+        ok = False
+    if loaded:
+        print(f"\nFAIL: heavy modules imported on the login path: {', '.join(loaded)}")
+        ok = False
+    if ok:
+        print("\nOK: login path is within budget and loads no heavy models")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if startup_report() else 1)
@@ -1,8 +1,93 @@
 import streamlit as st
-from agent.neuromentor_agent import generate_response
-from utils.chat_memory import save_message_to_history
+from agent.neuromentor_agent import stream_response, new_conversation_context
+from utils.chat_memory import save_message_to_history, load_chat_page
+from utils.metrics import record_timing
 import time
 from datetime import datetime
+from functools import lru_cache
+
+# Shared chat CSS, emitted once per rerun instead of once per message
+CHAT_CSS = """
+    <style>
+        @keyframes fadeIn {
+            from { opacity: 0; }
+            to { opacity: 1; }
+        }
+        .nm-row { display: flex; margin-bottom: 12px; animation: fadeIn 0.5s; }
+        .nm-bubble { padding: 14px 20px; border-radius: 18px; max-width: 75%; word-wrap: break-word; box-shadow: 0 2px 6px rgba(0, 0, 0, 0.1); }
+        .nm-meta { font-size: 12px; color: gray; }
+        .nm-text { margin-top: 6px; font-size: 16px; }
+    </style>
+    """
+
+PAGE_SIZE = 50  # messages shown per page of the transcript
+
+@lru_cache(maxsize=4096)
+def _bubble_html(role, content, timestamp, username):
+    alignment = "flex-end" if role == "user" else "flex-start"
+    bg_color = "#DCF8C6" if role == "user" else "#E6E6FA"
+    sender = f"🧑‍💻 {username}" if role == "user" else "🧠 NeuroMentor"
+    return (
+        f'<div class="nm-row" style="justify-content: {alignment};">'
+        f'<div class="nm-bubble" style="background-color: {bg_color};">'
+        f'<div class="nm-meta">{sender} · {timestamp}</div>'
+        f'<div class="nm-text">{content}</div>'
+        f'</div></div>'
+    )
+
+def _display_time(timestamp):
+    # Stored messages carry a full "%Y-%m-%d %H:%M:%S" timestamp; show the time of day only
+    try:
+        return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").strftime("%I:%M %p")
+    except ValueError:
+        return timestamp
+
+def render_message_html(message, cache=True):
+    """Builds the chat bubble HTML for a single message (cached per message; needs CHAT_CSS on the page)."""
+    build = _bubble_html if cache else _bubble_html.__wrapped__
+    return build(message["role"], message["content"], message.get("timestamp", ""), st.session_state.username)
+
+def _init_transcript():
+    """Loads the latest page of today's session from the chat store."""
+    # The transcript pages by index into one day's session: pin that day for the whole chat
+    st.session_state.chat_date = datetime.now().strftime("%Y-%m-%d")
+    messages, start = load_chat_page(st.session_state.username, st.session_state.chat_date, count=PAGE_SIZE)
+    st.session_state.chat_messages = [
+        {"role": m["role"], "content": m["content"], "timestamp": _display_time(m.get("timestamp", ""))}
+        for m in messages
+    ]
+    st.session_state.chat_loaded_from = start  # store index of chat_messages[0]
+    st.session_state.chat_visible = PAGE_SIZE
+
+def _load_older_page():
+    """Shows one more page, reading it from the chat store when it isn't loaded yet."""
+    st.session_state.chat_visible += PAGE_SIZE
+    missing = st.session_state.chat_visible - len(st.session_state.chat_messages)
+    if missing > 0 and st.session_state.chat_loaded_from > 0:
+        messages, start = load_chat_page(st.session_state.username, st.session_state.chat_date,
+                                         end=st.session_state.chat_loaded_from, count=missing)
+        st.session_state.chat_messages[:0] = [
+            {"role": m["role"], "content": m["content"], "timestamp": _display_time(m.get("timestamp", ""))}
+            for m in messages
+        ]
+        st.session_state.chat_loaded_from = start
+
+def _trim_transcript():
+    """Drops messages above the visible window; they can be paged back in from the store."""
+    extra = len(st.session_state.chat_messages) - st.session_state.chat_visible
+    if extra > 0:
+        del st.session_state.chat_messages[:extra]
+        st.session_state.chat_loaded_from += extra
+
+def render_transcript():
+    """Renders the visible window of the transcript as a single HTML block."""
+    messages = st.session_state.chat_messages[-st.session_state.chat_visible:]
+    if st.session_state.chat_loaded_from > 0 or len(st.session_state.chat_messages) > len(messages):
+        st.button("⬆️ Load older messages", on_click=_load_older_page)
+    st.markdown(
+        CHAT_CSS + "".join(render_message_html(message) for message in messages),
+        unsafe_allow_html=True
+    )
 
 def render_chat():
     # --- Ensure user is logged in ---
@@ -14,37 +99,15 @@ def render_chat():
     st.subheader("Chat freely with your AI wellness companion! 🤗🧠")
     st.write("I’m here to listen, support, and guide you. If you're feeling a bit overwhelmed, or simply want to chat, I’m here for you. You’re not alone! 💬")
 
-    # --- Initialize chat history ---
-    if "chat_messages" not in st.session_state:
-        st.session_state.chat_messages = []
+    # --- Initialize chat history (latest page of today's session) ---
+    if any(key not in st.session_state for key in ("chat_messages", "chat_loaded_from", "chat_date")):
+        _init_transcript()
+    # Bounded context the agent sees (recent turns + rolling summary), not the full transcript
+    if "chat_context" not in st.session_state:
+        st.session_state.chat_context = new_conversation_context()
 
-    # --- Display previous chat messages ---
-    for message in st.session_state.chat_messages:
-        alignment = "flex-end" if message["role"] == "user" else "flex-start"
-        bg_color = "#DCF8C6" if message["role"] == "user" else "#E6E6FA"
-        sender = (
-            f"🧑‍💻 {st.session_state.username}" if message["role"] == "user" else "🧠 NeuroMentor"
-        )
-        timestamp = message.get("timestamp", "")
-
-        st.markdown(
-            f"""
-            <div style="display: flex; justify-content: {alignment}; margin-bottom: 12px; animation: fadeIn 0.5s;">
-                <div style="background-color: {bg_color}; padding: 14px 20px; border-radius: 18px; max-width: 75%; word-wrap: break-word; box-shadow: 0 2px 6px rgba(0, 0, 0, 0.1);">
-                    <div style="font-size: 12px; color: gray;">{sender} · {timestamp}</div>
-                    <div style="margin-top: 6px; font-size: 16px;">{message["content"]}</div>
-                </div>
-            </div>
-
-            <style>
-                @keyframes fadeIn {{
-                    from {{ opacity: 0; }}
-                    to {{ opacity: 1; }}
-                }}
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
+    # --- Display the most recent messages ---
+    render_transcript()
 
     # --- User input box ---
     user_query = st.chat_input("Share your thoughts here... 🤔💬")
@@ -60,23 +123,33 @@ def render_chat():
         save_message_to_history(
             username=st.session_state.username,
             role="user",
-            content=user_query
+            content=user_query,
+            date=st.session_state.chat_date
         )
 
-        # 2. Display "typing..." animation
-        typing_placeholder = st.empty()
-        dots = ""
-        for _ in range(6):  # Show animation for ~3 seconds
-            dots = dots + "." if len(dots) < 3 else ""
-            typing_placeholder.markdown(f"🧠 NeuroMentor is typing{dots}")
-            time.sleep(0.5)
-            if len(dots) == 3:
-                dots = ""
-                typing_placeholder.empty()
-                typing_placeholder = st.empty()
-
-        # 3. Generate AI response
-        ai_response = generate_response(user_query)
+        # 2. Show the user's message and stream the AI response into its bubble
+        st.markdown(render_message_html(user_message), unsafe_allow_html=True)
+        bubble = st.empty()
+        bubble.markdown("🧠 NeuroMentor is typing...")
+
+        # 3. Generate AI response token by token
+        ai_response = ""
+        started = time.perf_counter()
+        for chunk in stream_response(
+            user_query, username=st.session_state.username, context=st.session_state.chat_context
+        ):
+            if not ai_response:
+                record_timing("chat.time_to_first_token", time.perf_counter() - started)
+            ai_response += chunk
+            bubble.markdown(
+                render_message_html({
+                    "role": "assistant",
+                    "content": ai_response,
+                    "timestamp": datetime.now().strftime("%I:%M %p")
+                }, cache=False),  # partial replies are not worth caching
+                unsafe_allow_html=True
+            )
+        ai_response = ai_response.strip()
 
         # 4. Save AI response
         ai_message = {
@@ -85,15 +158,15 @@ def render_chat():
             "timestamp": datetime.now().strftime("%I:%M %p")
         }
         st.session_state.chat_messages.append(ai_message)
+        st.session_state.chat_context.add_exchange(user_query, ai_response)
+        _trim_transcript()
         save_message_to_history(
             username=st.session_state.username,
             role="assistant",
-            content=ai_response
+            content=ai_response,
+            date=st.session_state.chat_date
         )
 
-        # 5. Clear typing animation
-        typing_placeholder.empty()
-
-        # 6. Force rerun to display updated chat (optional)
+        # 5. Force rerun to display updated chat (optional)
         st.experimental_rerun()
 
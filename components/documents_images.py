@@ -2,11 +2,14 @@
 import streamlit as st
 import os
 import shutil
-from utils.vision_utils import analyze_image
+import tempfile
+from utils.vision_utils import analyze_images
 from utils.file_utils import (
-    query_document_rag, save_uploaded_file, read_pdf,
-    summarize_document, merge_texts, save_text_as_file
+    query_document_rag, save_uploaded_file, summarize_document,
+    merge_texts, save_text_as_file, format_source
 )
+from utils.pdf_text import file_hash, iter_pdf_pages
+from utils.document_library import add_document, remove_document, list_documents, has_documents
 
 def render_gradient_card(content, title="Answer"):
     st.markdown(
@@ -27,6 +30,38 @@ def render_gradient_card(content, title="Answer"):
         unsafe_allow_html=True
     )
 
+def render_answer(answer, sources):
+    render_gradient_card(answer, title="Chat Response")
+    with st.expander("📑 Sources"):
+        for idx, source in enumerate(sources, 1):
+            st.markdown(f"**Section {idx}** · {format_source(source)}")
+            st.caption(source["text"])
+
+def render_library_question(username):
+    """Question box over the whole library, for when nothing is uploaded in this run."""
+    st.markdown("#### 💬 Ask about your library")
+    question = st.text_input("Ask a question about your documents:", key="library_question")
+    if st.button("Submit Question", key="library_submit"):
+        if question.strip():
+            render_answer(*query_document_rag(None, question, username=username))
+        else:
+            st.error("❗ Please enter a valid question.")
+
+def render_library(username):
+    documents = list_documents(username)
+    with st.expander(f"📚 My Document Library ({len(documents)})"):
+        if not documents:
+            st.caption("Uploaded PDFs and text files are kept here so you can ask about them later.")
+        for doc in documents:
+            col1, col2 = st.columns([5, 1])
+            col1.markdown(f"**{doc['name']}** · {doc['pages']} pages · added {doc['added']}")
+            if col2.button("🗑️", key=f"remove_{doc['hash']}"):
+                remove_document(username, doc["hash"])
+                # Don't re-add it on the next rerun while the file is still in the uploader
+                st.session_state.library_removed.add(doc["hash"])
+                st.experimental_rerun()
+    return documents
+
 def render():
     st.title("📄 Documents & 🖼️ Images")
     st.subheader("Upload files for analysis, chatting, or summarizing!")
@@ -41,10 +76,18 @@ def render():
         accept_multiple_files=True
     )
 
+    username = st.session_state.username
+    if "library_removed" not in st.session_state:
+        st.session_state.library_removed = set()
+    documents = render_library(username)
+
+    document_hashes = []
     if uploaded_files:
         all_texts = []
-        temp_folder = "temp_uploads"
-        os.makedirs(temp_folder, exist_ok=True)
+        document_files = {}  # file name -> [(page_number, text)], for answers citing file and page
+        image_uploads = []
+        # Per-run scratch folder; documents persist in the user's library
+        temp_folder = tempfile.mkdtemp(prefix="neuromentor_uploads_")
 
         for uploaded_file in uploaded_files:
             file_type = uploaded_file.type
@@ -54,19 +97,32 @@ def render():
             save_uploaded_file(uploaded_file, temp_path)
 
             if "image" in file_type:
-                st.image(uploaded_file, caption="Uploaded Image", use_column_width=True)
-                analysis = analyze_image(temp_path)
-                render_gradient_card(analysis, title="Image Analysis")
+                image_uploads.append((uploaded_file, temp_path))
             elif "pdf" in file_type or "text" in file_type:
+                doc_hash = file_hash(temp_path)
+                document_hashes.append(doc_hash)
+                if doc_hash not in st.session_state.library_removed:
+                    _, added = add_document(username, temp_path, uploaded_file.name, doc_hash=doc_hash)
+                    if added:
+                        st.success(f"📚 Added {uploaded_file.name} to your library.")
                 if "pdf" in file_type:
-                    text = read_pdf(temp_path)
+                    pages = list(iter_pdf_pages(temp_path))
                 else:
                     with open(temp_path, "r", encoding="utf-8") as f:
-                        text = f.read()
-                all_texts.append(text)
+                        pages = [(1, f.read())]
+                document_files[uploaded_file.name] = pages
+                all_texts.append("".join(text for _, text in pages))
             else:
                 st.error(f"Unsupported file type: {file_type}")
 
+        # Analyze all uploaded images concurrently
+        if image_uploads:
+            with st.spinner("Analyzing images..."):
+                analyses = analyze_images([temp_path for _, temp_path in image_uploads])
+            for (uploaded_file, _), analysis in zip(image_uploads, analyses):
+                st.image(uploaded_file, caption="Uploaded Image", use_column_width=True)
+                render_gradient_card(analysis, title="Image Analysis")
+
         if all_texts:
             merged_text = merge_texts(all_texts)
             st.text_area("📄 Extracted Document Content:", merged_text, height=300)
@@ -86,11 +142,19 @@ def render():
             mode = st.radio("Select Mode:", ["Chat about Document", "Summarize Document"])
 
             if mode == "Chat about Document":
+                scope = st.radio("Search in:", ["These uploads", "My whole library"], horizontal=True)
                 question = st.text_input("Ask a question about the document:")
                 if st.button("Submit Question"):
                     if question.strip():
-                        answer = query_document_rag(merged_text, question)
-                        render_gradient_card(answer, title="Chat Response")
+                        if scope == "My whole library":
+                            answer, sources = query_document_rag(None, question, username=username)
+                        elif has_documents(username, document_hashes):
+                            # Search the uploads' library embeddings instead of encoding them again
+                            answer, sources = query_document_rag(None, question, username=username,
+                                                                 doc_hashes=document_hashes)
+                        else:
+                            answer, sources = query_document_rag(document_files, question)
+                        render_answer(answer, sources)
                     else:
                         st.error("❗ Please enter a valid question.")
             elif mode == "Summarize Document":
@@ -98,5 +162,12 @@ def render():
                     summary = summarize_document(merged_text)
                     render_gradient_card(summary, title="Document Summary")
 
-        # Clean up temp uploads folder
-        shutil.rmtree(temp_folder)
+        # Clean up this run's uploads
+        shutil.rmtree(temp_folder, ignore_errors=True)
+
+    # A removed document stays out only while its file is still in the uploader:
+    # once it leaves, uploading it again adds it back
+    st.session_state.library_removed.intersection_update(document_hashes)
+
+    if documents and not document_hashes:
+        render_library_question(username)
@@ -10,8 +10,8 @@ from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 
 # Ensure these imports are valid and available in your utils module
-from utils.analytics import analyze_sentiment, analyze_emotions
-from utils.file_ops import get_all_session_paths, load_chat_from_file
+from utils.analytics_store import build_session_text, get_session_scores
+from utils.file_ops import get_user_session_paths, load_chat_from_file
 from utils.voice_memory import load_voice_messages
 from utils.pdf_export import export_history_pdf
 
@@ -41,15 +41,13 @@ def show_history_page():
     st.divider()
 
     # ——— Load Session Data ———
-    sessions = []
-    all_paths = get_all_session_paths()
+    loaded = []
+    user_paths = get_user_session_paths(username, start_date, end_date)
 
-    # Iterate through all session paths and filter by date
-    for chat_path in all_paths:
+    # Iterate through this user's session paths in the selected date range
+    for chat_path in user_paths:
         date_str = os.path.basename(os.path.dirname(chat_path))
         date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-        if not (start_date <= date_obj <= end_date):
-            continue
 
         # Load chat and voice messages
         try:
@@ -58,27 +56,27 @@ def show_history_page():
             st.error(f"Error loading chat session from {chat_path}: {e}")
             continue
 
-        voice_msgs = load_voice_messages(username)
-
         # Ensure that chat_msgs is a list and contains the expected data structure
         if not isinstance(chat_msgs, list):
             st.error(f"Expected 'chat_msgs' to be a list, but got {type(chat_msgs)}.")
             continue
 
-        # Combine text from chat and voice
-        combined_text = " ".join(m["content"] for m in chat_msgs) + " " + " ".join(v["content"] for v in voice_msgs if v["type"] == "text")
+        # Combine text from chat and the same day's voice session
+        voice_msgs = load_voice_messages(username, date_str)
+        combined_text = build_session_text(chat_msgs, voice_msgs)
+        loaded.append((chat_path, date_obj, combined_text))
 
-        # Sentiment and emotion analysis
-        sent = analyze_sentiment(combined_text)
-        emos = analyze_emotions(combined_text)
-        primary = max(emos, key=emos.get) if emos else "neutral"
+    # Sentiment and emotion analysis (precomputed; only new or changed sessions are scored)
+    scores = get_session_scores(username, [(path, text) for path, _, text in loaded])
 
+    sessions = []
+    for (chat_path, date_obj, combined_text), score in zip(loaded, scores):
         sessions.append({
             "date": date_obj,
-            "sentiment_score": sent["score"],
-            "primary_emotion": primary,
+            "sentiment_score": score["sentiment_score"],
+            "primary_emotion": score["primary_emotion"],
             "raw_text": combined_text,
-            **emos
+            **score["emotions"]
         })
 
     if not sessions:
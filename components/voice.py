@@ -2,90 +2,83 @@
 import os
 import sys
 import time
+import uuid
 import random
 import tempfile
 
-import sounddevice as sd
-import wavio
-import pyttsx3
-import speech_recognition as sr
 import streamlit as st
 
-from playsound import playsound
 from utils.voice_memory import save_voice_message, load_voice_messages
-from agent.neuromentor_agent import generate_response
+from agent.neuromentor_agent import stream_response
+from utils.voice_pipeline import VoicePipeline, concat_wavs
+from utils.stt import transcribe, wav_bytes
 
 # ------------------- Voice Utility Functions ------------------- #
 
-def record_audio(duration=6, fs=44100):
-    """Record audio for a given duration and save to a WAV file."""
-    save_dir = os.path.join("data", "voice_sessions")
-    os.makedirs(save_dir, exist_ok=True)
-
-    filename = f"user_recording_{int(time.time())}.wav"
-    save_path = os.path.join(save_dir, filename)
+def record_audio(duration=6, fs=16000):
+    """Record audio for a given duration; returns (int16 numpy array, sample rate) kept in memory."""
+    import sounddevice as sd
 
     try:
-        recording = sd.rec(int(duration * fs), samplerate=fs, channels=1)
+        # 16 kHz mono int16 is what the STT engines consume, so no resampling or WAV file is needed
+        recording = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype="int16")
         sd.wait()
-        wavio.write(save_path, recording, fs, sampwidth=2)
-        return save_path
+        return recording[:, 0], fs
     except Exception as e:
         print(f"[Error] Recording audio failed: {str(e)}")
         return None
 
-def speech_to_text(audio_path):
-    """Convert recorded audio to text using Google's Speech Recognition API."""
-    if not audio_path or not os.path.exists(audio_path):
+def speech_to_text(audio, sample_rate=None):
+    """Convert a recording ((numpy array, sample rate) or a WAV file path) to text with the configured STT backend."""
+    if isinstance(audio, tuple):
+        audio, sample_rate = audio
+    if audio is None or (isinstance(audio, str) and not os.path.exists(audio)):
         return "Sorry, the audio file was not found."
 
-    recognizer = sr.Recognizer()
     try:
-        with sr.AudioFile(audio_path) as source:
-            audio = recognizer.record(source)
-            text = recognizer.recognize_google(audio)
-        os.remove(audio_path)  # Delete file after recognition
-        return text
-    except sr.UnknownValueError:
-        return "Sorry, I couldn't understand what you said."
-    except sr.RequestError as e:
-        return f"Speech recognition error: {str(e)}"
+        text = transcribe(audio, sample_rate)
+        return text or "Sorry, I couldn't understand what you said."
     except Exception as e:
         return f"Speech-to-text processing failed: {str(e)}"
 
+def synthesize_speech(text):
+    """Convert text to speech and return the path of the WAV file (raises on failure; safe off the script thread)."""
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    voices = engine.getProperty('voices')
+
+    # Platform-specific voice selection
+    if "linux" in sys.platform:
+        engine.setProperty("voice", "english")
+    elif "darwin" in sys.platform:
+        engine.setProperty("voice", "com.apple.speech.synthesis.voice.Alex")
+    elif "win" in sys.platform:
+        engine.setProperty('voice', random.choice(voices).id)
+
+    # Randomize speech rate slightly
+    base_rate = engine.getProperty('rate')
+    varied_rate = random.choice([base_rate - 20, base_rate, base_rate + 20])
+    engine.setProperty('rate', varied_rate)
+
+    save_dir = os.path.join("data", "voice_sessions")
+    os.makedirs(save_dir, exist_ok=True)
+
+    # Unique per sentence: several files are written within the same second
+    filename = f"neuromentor_tts_{int(time.time())}_{uuid.uuid4().hex[:8]}.wav"
+    audio_path = os.path.join(save_dir, filename)
+
+    engine.save_to_file(text, audio_path)
+    engine.runAndWait()
+
+    if not os.path.exists(audio_path):
+        raise RuntimeError("Text-to-speech audio file was not created.")
+    return audio_path
+
 def text_to_speech(text):
     """Convert text to speech and save the output as a WAV file."""
     try:
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
-
-        # Platform-specific voice selection
-        if "linux" in sys.platform:
-            engine.setProperty("voice", "english")
-        elif "darwin" in sys.platform:
-            engine.setProperty("voice", "com.apple.speech.synthesis.voice.Alex")
-        elif "win" in sys.platform:
-            engine.setProperty('voice', random.choice(voices).id)
-
-        # Randomize speech rate slightly
-        base_rate = engine.getProperty('rate')
-        varied_rate = random.choice([base_rate - 20, base_rate, base_rate + 20])
-        engine.setProperty('rate', varied_rate)
-
-        save_dir = os.path.join("data", "voice_sessions")
-        os.makedirs(save_dir, exist_ok=True)
-
-        filename = f"neuromentor_tts_{int(time.time())}.wav"
-        audio_path = os.path.join(save_dir, filename)
-
-        engine.save_to_file(text, audio_path)
-        engine.runAndWait()
-
-        if os.path.exists(audio_path):
-            return audio_path
-        else:
-            st.error("Text-to-speech audio file was not created.")
-            return None
+        return synthesize_speech(text)
     except Exception as e:
         st.error(f"Text-to-Speech Error: {str(e)}")
         st.info(f"Generated Text: {text}")
@@ -123,45 +116,58 @@ def render_voice():
 
     if record:
         st.toast("Recording... 🎙️")
-        audio_path = record_audio()
-
-        if audio_path and os.path.exists(audio_path):
-            # First read the user audio
-            with open(audio_path, "rb") as audio_file:
-                user_audio_bytes = audio_file.read()
-
-            text = speech_to_text(audio_path)
-
-            if text:
-                # Save user message (text + audio bytes)
-                st.session_state.voice_messages.append({
-                    "role": "user",
-                    "content": text,
-                    "audio_path": audio_path
-                })
-                save_voice_message(st.session_state.username, "user", audio_bytes=user_audio_bytes, text_message=text)
-
-                # Display user message
-                st.markdown(f"🧑‍💻 **{st.session_state.username}:** {text}")
-                st.audio(user_audio_bytes, format="audio/wav")
-
-                # Generate AI response
-                ai_response = generate_response(text)
-                ai_audio_path = text_to_speech(ai_response)
-
-                if ai_audio_path and os.path.exists(ai_audio_path):
-                    with open(ai_audio_path, "rb") as ai_audio_file:
-                        ai_audio_bytes = ai_audio_file.read()
-
+        recording = record_audio()
+
+        if recording is not None:
+            # WAV bytes for saving and playback; STT works on the numpy audio directly
+            user_audio_bytes = wav_bytes(*recording)
+
+            # STT, reply and TTS run as concurrent stages: sentences are synthesized while
+            # the rest of the reply is still being written. No play_fn: that would play on
+            # the server; the reply is sent to the browser once as a single st.audio clip.
+            username = st.session_state.username  # worker threads can't read session_state
+            pipeline = VoicePipeline(
+                stt_fn=speech_to_text,
+                reply_fn=lambda text: stream_response(text, username=username),
+                tts_fn=synthesize_speech,
+            )
+
+            sentences, audio_paths = [], {}
+            reply_placeholder = None
+            for event in pipeline.run(recording):
+                kind = event[0]
+                if kind == "transcript" and event[1]:
+                    text = event[1]
+                    # Save user message (text + audio bytes)
                     st.session_state.voice_messages.append({
-                        "role": "assistant",
-                        "content": ai_response,
-                        "audio_path": ai_audio_path
+                        "role": "user",
+                        "content": text,
+                        "audio_path": None
                     })
-                    save_voice_message("NeuroMentor", "assistant", audio_bytes=ai_audio_bytes, text_message=ai_response)
-
-                    # Display AI response
-                    st.markdown(f"🤖 **NeuroMentor:** {ai_response}")
-                    st.audio(ai_audio_bytes, format="audio/wav")
-
-    
\ No newline at end of file
+                    save_voice_message(username, "user", audio_bytes=user_audio_bytes, text_message=text)
+
+                    # Display user message
+                    st.markdown(f"🧑‍💻 **{username}:** {text}")
+                    st.audio(user_audio_bytes, format="audio/wav")
+                    reply_placeholder = st.empty()
+                elif kind == "sentence":
+                    sentences.append(event[2])
+                    if reply_placeholder is not None:
+                        reply_placeholder.markdown(f"🤖 **NeuroMentor:** {' '.join(sentences)}")
+                elif kind == "audio":
+                    audio_paths[event[1]] = event[2]
+                elif kind == "error":
+                    st.warning(f"Voice {event[1]} error: {event[2]}")
+
+            ai_response = " ".join(sentences)
+            if ai_response and audio_paths:
+                ai_audio_bytes = concat_wavs([audio_paths[i] for i in sorted(audio_paths)])
+                st.session_state.voice_messages.append({
+                    "role": "assistant",
+                    "content": ai_response,
+                    "audio_path": audio_paths[min(audio_paths)]
+                })
+                save_voice_message(username, "assistant", audio_bytes=ai_audio_bytes, text_message=ai_response)
+                st.audio(ai_audio_bytes, format="audio/wav")
+            elif ai_response:
+                st.info(f"Generated Text: {ai_response}")
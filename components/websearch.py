@@ -1,21 +1,44 @@
 # components/websearch.py
 import streamlit as st
 from utils.web_search import live_search
-from agent.neuromentor_agent import generate_response  # Make sure folder is 'agents' not 'agent'
+from utils.llm import get_gemini_response
+from utils.page_fetcher import fetch_pages, build_passages
 
-def summarize_links(links):
-    """Send top links to Gemini to summarize for the user."""
-    context = "Summarize the following pages into simple, clear, helpful tips for a student or professional:\n"
-    for idx, link in enumerate(links, 1):
-        context += f"{idx}. {link}\n"
+LINK_SUMMARY_PROMPT = (
+    "Summarize the following pages into simple, clear, helpful tips for a student or professional "
+    "who asked: \"{query}\"\n"
+    "Use only the page content below and mention which page [number] each tip comes from.\n\n"
+    "{passages}\n\n"
+    "Summary:"
+)
 
-    # Call Gemini to summarize
-    summary = generate_response(context)
-
-    # Extract only the text part if summary is an object
-    if hasattr(summary, 'content'):
-        summary = summary.content
+def summarize_links(query, results):
+    """Fetch the top result pages and have Gemini summarize their content for the user."""
+    pages = fetch_pages([r["link"] for r in results if r.get("link")])
+    passages = build_passages(pages)
+    if not passages:
+        # No page could be read: fall back to the search snippets
+        passages = "\n".join(
+            f"[{idx}] {r.get('title', '')} ({r.get('link', '')})\n{r.get('snippet', '')}"
+            for idx, r in enumerate(results, 1)
+        )
 
+    # Straight to Gemini, without the intent guardrail call: one LLM call per search
+    try:
+        summary = get_gemini_response(
+            LINK_SUMMARY_PROMPT.format(query=query.strip(), passages=passages),
+            prompt_type="link_summary",
+            cache_text=query,
+        )
+    except Exception as e:
+        # get_gemini_response already reported the error; show the search snippets instead
+        print(f"Link summary failed: {e}")
+        snippets = "<br>".join(
+            f"• <b>{r.get('title', '')}</b>: {r.get('snippet', '')}" for r in results if r.get("snippet")
+        )
+        if not snippets:
+            return "I couldn't put together a summary right now 💙 Please try again in a moment."
+        return "I couldn't put together a summary right now 💙 Here's what the top results say:<br><br>" + snippets
     return summary.strip()
 
 def render_web_search():
@@ -37,10 +60,11 @@ def render_web_search():
 
             if results:
                 # Take top 3 links
-                top_links = [r.get("link") for r in results[:3] if r.get("link")]
+                top_results = [r for r in results[:3] if r.get("link")]
+                top_links = [r["link"] for r in top_results]
 
-                # Summarize using Gemini
-                summarized_answer = summarize_links(top_links)
+                # Fetch the pages and summarize their content using Gemini
+                summarized_answer = summarize_links(query, top_results)
 
                 # Show summarized answer nicely
                 st.success("✅ NeuroMentor's Summarized Answer:")
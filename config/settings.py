@@ -4,8 +4,60 @@ from dotenv import load_dotenv
 
 load_dotenv()  # Load environment variables from .env
 
+def _env_flag(name, default="true"):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 class Settings:
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
+    # Guardrail: answer scope + reply in one Gemini call, and skip the call entirely
+    # when the local keyword pre-classifier is confident
+    COMBINED_INTENT_REPLY = _env_flag("NEUROMENTOR_COMBINED_INTENT_REPLY")
+    LOCAL_GUARDRAIL = _env_flag("NEUROMENTOR_LOCAL_GUARDRAIL")
+
+    # Sentiment/emotion analytics: chunks per padded batch and torch threads (0 = torch default)
+    ANALYTICS_BATCH_SIZE = int(os.getenv("NEUROMENTOR_ANALYTICS_BATCH_SIZE", "16"))
+    ANALYTICS_THREADS = int(os.getenv("NEUROMENTOR_ANALYTICS_THREADS", "0"))
+    # "torch", "quantized" (int8) or "onnx" (ONNX Runtime export)
+    ANALYTICS_BACKEND = os.getenv("NEUROMENTOR_ANALYTICS_BACKEND", "torch").strip().lower()
+
+    # Gemini response cache: exact tier always, embedding-similarity tier when LLM_CACHE_SEMANTIC is on
+    LLM_CACHE_ENABLED = _env_flag("NEUROMENTOR_LLM_CACHE")
+    LLM_CACHE_SEMANTIC = _env_flag("NEUROMENTOR_LLM_CACHE_SEMANTIC", "false")
+    LLM_CACHE_SEMANTIC_THRESHOLD = float(os.getenv("NEUROMENTOR_LLM_CACHE_SEMANTIC_THRESHOLD", "0.92"))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("NEUROMENTOR_LLM_CACHE_MAX_ENTRIES", "2048"))
+
+    # Shared Gemini client: concurrent calls per model, per-attempt timeout (s), retries on 429/5xx
+    LLM_MAX_CONCURRENCY = int(os.getenv("NEUROMENTOR_LLM_MAX_CONCURRENCY", "4"))
+    LLM_TIMEOUT = float(os.getenv("NEUROMENTOR_LLM_TIMEOUT", "60"))
+    LLM_MAX_RETRIES = int(os.getenv("NEUROMENTOR_LLM_MAX_RETRIES", "3"))
+
+    # Document retrieval index: flat_l2, flat_ip (default), ivf_flat, hnsw or ivf_pq (see utils/vector_index)
+    VECTOR_INDEX_TYPE = os.getenv("NEUROMENTOR_VECTOR_INDEX_TYPE", "flat_ip").strip().lower()
+
+    # Long-term memory: past exchanges added to the reply prompt (count, token budget, min cosine)
+    MEMORY_RETRIEVAL = _env_flag("NEUROMENTOR_MEMORY_RETRIEVAL")
+    MEMORY_TOP_K = int(os.getenv("NEUROMENTOR_MEMORY_TOP_K", "3"))
+    MEMORY_TOKEN_BUDGET = int(os.getenv("NEUROMENTOR_MEMORY_TOKEN_BUDGET", "400"))
+    MEMORY_MIN_SIMILARITY = float(os.getenv("NEUROMENTOR_MEMORY_MIN_SIMILARITY", "0.35"))
+
+    # Multi-turn context (estimated tokens): verbatim recent turns, rolling summary of older
+    # turns, and how many evicted tokens are folded into the summary per summarizer call
+    CONTEXT_RECENT_TOKENS = int(os.getenv("NEUROMENTOR_CONTEXT_RECENT_TOKENS", "600"))
+    CONTEXT_SUMMARY_TOKENS = int(os.getenv("NEUROMENTOR_CONTEXT_SUMMARY_TOKENS", "250"))
+    CONTEXT_SUMMARY_BATCH_TOKENS = int(os.getenv("NEUROMENTOR_CONTEXT_SUMMARY_BATCH_TOKENS", "400"))
+
+    # Serper web search: endpoint, result cache TTL (s) and connect/read timeouts (s)
+    SERPER_URL = os.getenv("NEUROMENTOR_SERPER_URL", "https://google.serper.dev/search")
+    SEARCH_CACHE_TTL = float(os.getenv("NEUROMENTOR_SEARCH_CACHE_TTL", str(6 * 3600)))
+    SEARCH_CONNECT_TIMEOUT = float(os.getenv("NEUROMENTOR_SEARCH_CONNECT_TIMEOUT", "3.05"))
+    SEARCH_READ_TIMEOUT = float(os.getenv("NEUROMENTOR_SEARCH_READ_TIMEOUT", "10"))
+
+    # Speech-to-text: "google" (Web Speech API) or "whisper" (local, offline), and the Whisper model size.
+    # Google stays the default until Whisper's accuracy and speed are measured on recorded clips
+    # (python -m benchmarks.bench_stt --clips DIR).
+    STT_BACKEND = os.getenv("NEUROMENTOR_STT_BACKEND", "google").strip().lower()
+    STT_MODEL = os.getenv("NEUROMENTOR_STT_MODEL", "base").strip()
+
 settings = Settings()
@@ -0,0 +1,100 @@
+# tests/conftest.py
+# Run from the project root: python -m pytest -q
+
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Base for the stub servers' request handlers: HTTP/1.1, no request log, and `self.stub`
+    for the StubServer's shared state.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def stub(self):
+        return self.server.stub
+
+    def send(self, status, payload=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # the client closed the connection mid-request
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+    """
+    A ThreadingHTTPServer on a free local port serving `handler` (a StubHandler subclass)
+    from a daemon thread. Handlers share `lock`, `latency`, the in-flight counters and any
+    extra `state` passed in as attributes; `url` is the base URL plus `path`.
+    """
+
+    def __init__(self, handler, latency=0.0, path="", **state):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        vars(self).update(state)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.stub = self
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+        self._closed = False
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @contextmanager
+    def serving(self):
+        """Counts the request as in flight and waits `latency` seconds before the answer."""
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.server.shutdown()
+            self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    """Starts StubServers for a test and closes them afterwards."""
+    servers = []
+
+    def start(handler, latency=0.0, path="", **state):
+        servers.append(StubServer(handler, latency, path, **state))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
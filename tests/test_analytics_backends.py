@@ -0,0 +1,78 @@
+# tests/test_analytics_backends.py
+# Parity of the quantized/ONNX analytics backends with full-precision PyTorch.
+# Each backend runs in a fresh interpreter, since the backend is read from the environment at startup.
+# The ONNX case needs `python -m utils.analytics_export` first and is skipped otherwise.
+
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("transformers")
+pytest.importorskip("torch")
+
+from utils.analytics import ONNX_FILE_NAMES, EMOTION_MODEL, SENTIMENT_MODEL, onnx_model_path  # noqa: E402
+
+PARITY_TOLERANCE = 0.05
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEXTS = [
+    "I felt really anxious before my presentation today.",
+    "Talking to my friend afterwards helped me calm down a lot.",
+    "Work pressure is building up and I feel overwhelmed.",
+    "Today was honestly a great day, I finally passed my exam!",
+    "",
+]
+SCORE_SCRIPT = (
+    "import json, sys\n"
+    "from utils.analytics import analyze_sentiment_batch, analyze_emotions_batch\n"
+    "texts = json.loads(sys.argv[1])\n"
+    "print(json.dumps([analyze_sentiment_batch(texts), analyze_emotions_batch(texts)]))\n"
+)
+
+
+def score_with(backend):
+    env = dict(os.environ, NEUROMENTOR_ANALYTICS_BACKEND=backend)
+    result = subprocess.run(
+        [sys.executable, "-c", SCORE_SCRIPT, json.dumps(TEXTS)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return score_with("torch")
+
+
+def test_torch_scores_are_well_formed(reference):
+    sentiments, emotions = reference
+    assert len(sentiments) == len(emotions) == len(TEXTS)
+    assert sentiments[-1] == {"label": "neutral", "score": 0.5}  # empty text
+    assert emotions[-1] == {}
+    for sentiment, emos in zip(sentiments[:-1], emotions[:-1]):
+        assert 0.0 <= sentiment["score"] <= 1.0
+        assert sentiment["label"] == ("positive" if sentiment["score"] >= 0.5 else "negative")
+        assert sum(emos.values()) == pytest.approx(1.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("backend", ["quantized", "onnx"])
+def test_backend_matches_torch(reference, backend):
+    if backend == "onnx":
+        pytest.importorskip("optimum.onnxruntime")
+        for model_id in (SENTIMENT_MODEL, EMOTION_MODEL):
+            path = onnx_model_path(model_id)
+            if not any(os.path.exists(os.path.join(ROOT, path, name)) for name in ONNX_FILE_NAMES):
+                pytest.skip(f"no ONNX export in {path}; run python -m utils.analytics_export")
+
+    sentiments, emotions = score_with(backend)
+    ref_sentiments, ref_emotions = reference
+    for sentiment, ref_sentiment in zip(sentiments, ref_sentiments):
+        assert sentiment["score"] == pytest.approx(ref_sentiment["score"], abs=PARITY_TOLERANCE)
+    for emos, ref_emos in zip(emotions, ref_emotions):
+        assert set(emos) == set(ref_emos)
+        for label, score in ref_emos.items():
+            assert emos[label] == pytest.approx(score, abs=PARITY_TOLERANCE)
@@ -0,0 +1,46 @@
+# tests/test_combined_reply.py
+# Parsing the one-call SCOPE/REPLY answer, plain and dressed up in markdown, both from a
+# full response and from a stream.
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from agent import neuromentor_agent as agent  # noqa: E402
+
+ANSWERS = [
+    "SCOPE: relevant\nREPLY: Hey, that sounds tough 💙",
+    "**SCOPE:** relevant\n**REPLY:** Hey, that sounds tough 💙",
+    "**SCOPE**: Relevant\n\n**Reply**:\nHey, that sounds tough 💙",
+    "## SCOPE: relevant\n## REPLY: Hey, that sounds tough 💙",
+    "_SCOPE:_ relevant\n__REPLY:__ Hey, that sounds tough 💙",
+]
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+def test_parse_combined_response_with_markdown_labels(answer):
+    assert agent.parse_combined_response(answer) == (True, "Hey, that sounds tough 💙")
+
+
+def test_parse_combined_response_irrelevant_and_missing():
+    assert agent.parse_combined_response("**SCOPE:** irrelevant\n**REPLY:**")[0] is False
+    assert agent.parse_combined_response("Hey, that sounds tough")[0] is None
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+def test_streamed_combined_answer_uses_one_call(monkeypatch, answer):
+    calls = []
+
+    def fake_stream(prompt):
+        calls.append(prompt)
+        for i in range(0, len(answer), 3):  # small chunks that split the labels and their markup
+            yield answer[i:i + 3]
+
+    monkeypatch.setattr(agent, "stream_gemini_response", fake_stream)
+    monkeypatch.setattr(agent, "_local_verdict", lambda query: None)
+    monkeypatch.setattr(agent, "_memory_context", lambda query, username: "")
+    monkeypatch.setattr(agent.settings, "COMBINED_INTENT_REPLY", True)
+
+    reply = "".join(agent.stream_response("I can't sleep before my exams"))
+    assert reply == "Hey, that sounds tough 💙"
+    assert len(calls) == 1
@@ -0,0 +1,246 @@
+# tests/test_llm_client.py
+# LLMClient's chat and generate_content adapters against a local fake Gemini server
+# speaking the REST generateContent format. The pinned SDKs only reach Gemini over
+# gRPC for async calls, so the models below are minimal REST clients with the same
+# interface the adapters use (ainvoke / generate_content_async, model / model_name).
+
+import copy
+import json
+import time
+import asyncio
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from conftest import StubHandler
+from utils.llm_client import LLMClient
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.code = status  # like google.api_core exceptions
+
+
+class FakeGemini(StubHandler):
+    """
+    POST /v1beta/models/<model>:generateContent. Prompts starting with "429" or "400"
+    fail with that status the first time they are seen (400 every time); every answer
+    takes the server's `latency` seconds.
+    """
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["contents"][0]["parts"][0]["text"]
+        with self.stub.lock:
+            first = all(r["prompt"] != prompt for r in self.stub.requests)
+            self.stub.requests.append({"path": self.path, "prompt": prompt,
+                                       "retries": self.headers.get("X-Client-Retries")})
+        if prompt.startswith("400") or (prompt.startswith("429") and first):
+            self.send(int(prompt[:3]))
+            return
+        with self.stub.serving():
+            payload = json.dumps({"candidates": [{
+                "content": {"role": "model", "parts": [{"text": f"echo: {prompt}"}]},
+                "finishReason": "STOP",
+            }]}).encode("utf-8")
+            self.send(200, payload, {"Content-Type": "application/json"})
+
+
+def _generate(url, model, prompt, retries):
+    request = urllib.request.Request(
+        f"{url}/models/{model}:generateContent",
+        data=json.dumps({"contents": [{"role": "user", "parts": [{"text": prompt}]}]}).encode("utf-8"),
+        headers={"Content-Type": "application/json", "X-Client-Retries": str(retries)},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())["candidates"][0]["content"]["parts"][0]["text"]
+    except urllib.error.HTTPError as e:
+        raise HTTPStatusError(e.code)
+
+
+class RestChatModel:
+    """
+    Shaped like ChatGoogleGenerativeAI: .model, .max_retries, .copy(update=...), ainvoke()
+    and astream(). The stream yields the reply word by word, `chunk_delay` seconds apart.
+    """
+
+    def __init__(self, url, model="gemini-1.5-pro", max_retries=6, chunk_delay=0.02):
+        self.url = url
+        self.model = model
+        self.max_retries = max_retries
+        self.chunk_delay = chunk_delay
+        self.streams = {"active": 0, "max_active": 0, "closed": 0}  # shared with copies
+
+    def copy(self, update):
+        clone = copy.copy(self)
+        vars(clone).update(update)
+        return clone
+
+    async def ainvoke(self, prompt):
+        return await asyncio.to_thread(_generate, self.url, self.model, prompt, self.max_retries)
+
+    async def astream(self, prompt):
+        self.streams["active"] += 1
+        self.streams["max_active"] = max(self.streams["max_active"], self.streams["active"])
+        try:
+            text = await asyncio.to_thread(_generate, self.url, self.model, prompt, self.max_retries)
+            for number, word in enumerate(text.split(" ")):
+                if number:
+                    await asyncio.sleep(self.chunk_delay)
+                yield word + " "
+        finally:
+            self.streams["active"] -= 1
+            self.streams["closed"] += 1
+
+
+class RestGenerativeModel:
+    """Shaped like genai.GenerativeModel (SDK versions with request_options)."""
+
+    def __init__(self, url, model_name="gemini-1.5-flash"):
+        self.url = url
+        self.model_name = model_name
+
+    async def generate_content_async(self, contents, request_options=None):
+        retries = "default" if request_options is None else request_options.get("retry", "default")
+        return await asyncio.to_thread(_generate, self.url, self.model_name, contents, retries)
+
+
+@pytest.fixture
+def gemini(stub_server):
+    return stub_server(FakeGemini, latency=0.2, path="/v1beta")
+
+
+def make_client(**kwargs):
+    options = dict(max_concurrency=8, timeout=5, max_retries=3, base_delay=0.01)
+    options.update(kwargs)
+    return LLMClient(**options)
+
+
+def test_concurrent_sessions_run_in_parallel_and_retry_429(gemini):
+    client = make_client()
+    llm = RestChatModel(gemini.url)
+    prompts = [f"429 hi {i}" if i % 3 == 0 else f"hi {i}" for i in range(8)]
+    results = [None] * len(prompts)
+
+    def session(i):  # one Streamlit script thread per session, using the sync facade
+        results[i] = client.invoke_chat(llm, prompts[i])
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(len(prompts))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert results == [f"echo: {prompt}" for prompt in prompts]
+    assert elapsed < len(prompts) * gemini.latency / 2  # parallel, not serial
+    assert len(gemini.requests) == len(prompts) + 3      # one retry per 429
+    assert all(r["path"] == "/v1beta/models/gemini-1.5-pro:generateContent" for r in gemini.requests)
+
+
+def test_chat_adapter_turns_off_langchain_retries(gemini):
+    llm = RestChatModel(gemini.url, max_retries=6)
+    assert make_client().invoke_chat(llm, "hello") == "echo: hello"
+    assert gemini.requests[0]["retries"] == "0"
+    assert llm.max_retries == 6  # the caller's model is left alone
+
+
+def test_generate_content_adapter_disables_sdk_retry(gemini):
+    client = make_client()
+    model = RestGenerativeModel(gemini.url)
+    assert client.generate_content(model, "hello") == "echo: hello"
+    assert gemini.requests[0]["retries"] == "None"
+    assert gemini.requests[0]["path"] == "/v1beta/models/gemini-1.5-flash:generateContent"
+
+
+def test_gather_runs_adapter_calls_concurrently(gemini):
+    client = make_client()
+    model = RestGenerativeModel(gemini.url)
+    start = time.perf_counter()
+    results = client.gather([client.agenerate_content(model, f"page {i}") for i in range(6)])
+    assert results == [f"echo: page {i}" for i in range(6)]
+    assert time.perf_counter() - start < 6 * gemini.latency / 2
+
+
+def test_concurrency_is_limited_per_model(gemini):
+    client = make_client(max_concurrency=2)
+    chat = RestChatModel(gemini.url, model="chat-model")
+    client.gather([client.ainvoke_chat(chat, f"q {i}") for i in range(6)])
+    assert gemini.max_in_flight == 2
+
+    gemini.max_in_flight = 0
+    vision = RestGenerativeModel(gemini.url, model_name="vision-model")
+    client.gather([client.ainvoke_chat(chat, f"a {i}") for i in range(2)] +
+                  [client.agenerate_content(vision, f"b {i}") for i in range(2)])
+    assert gemini.max_in_flight == 4  # separate semaphore per model
+
+
+def test_non_retryable_error_is_raised_without_retrying(gemini):
+    with pytest.raises(HTTPStatusError):
+        make_client().invoke_chat(RestChatModel(gemini.url), "400 bad request")
+    assert len(gemini.requests) == 1
+
+
+def test_timeouts_are_retried_then_raised(gemini):
+    gemini.latency = 0.3
+    with pytest.raises(asyncio.TimeoutError):
+        make_client(timeout=0.1, max_retries=2).invoke_chat(RestChatModel(gemini.url), "slow")
+    assert len(gemini.requests) == 3
+
+
+def test_stream_yields_chunks_in_order_and_retries_before_the_first(gemini):
+    llm = RestChatModel(gemini.url)
+    chunks = list(make_client().stream_chat(llm, "429 stream me please"))
+    assert "".join(chunks).strip() == "echo: 429 stream me please"
+    assert len(chunks) == 5
+    assert len(gemini.requests) == 2  # the 429 was retried
+    assert all(r["retries"] == "0" for r in gemini.requests)
+
+
+def test_streams_share_the_model_semaphore(gemini):
+    client = make_client(max_concurrency=2)
+    llm = RestChatModel(gemini.url, model="stream-model")
+
+    def session(i):
+        list(client.stream_chat(llm, f"reply number {i}"))
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert llm.streams["max_active"] == 2  # held for the whole stream, not just the first request
+
+
+def test_stream_stalled_before_the_first_chunk_is_retried(gemini):
+    gemini.latency = 0.3
+    with pytest.raises(asyncio.TimeoutError):
+        list(make_client(timeout=0.1, max_retries=2).stream_chat(RestChatModel(gemini.url), "slow start"))
+    assert len(gemini.requests) == 3
+
+
+def test_stream_stalled_mid_reply_times_out_without_retrying(gemini):
+    gemini.latency = 0.0
+    llm = RestChatModel(gemini.url, chunk_delay=0.3)
+    chunks = []
+    with pytest.raises(asyncio.TimeoutError):
+        for chunk in make_client(timeout=0.25).stream_chat(llm, "slow stream"):
+            chunks.append(chunk)
+    assert chunks == ["echo: "]  # a partial reply can't be replayed
+    assert len(gemini.requests) == 1
+
+
+def test_closing_a_stream_early_releases_the_semaphore(gemini):
+    client = make_client(max_concurrency=1)
+    llm = RestChatModel(gemini.url, model="single-model")
+    stream = client.stream_chat(llm, "a long reply that nobody reads to the end")
+    assert next(stream) == "echo: "
+    stream.close()
+    # The cancelled stream must give its slot back, or this would block forever
+    assert "".join(client.stream_chat(llm, "next")).strip() == "echo: next"
+    assert llm.streams["closed"] == 2
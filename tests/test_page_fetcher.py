@@ -0,0 +1,172 @@
+# tests/test_page_fetcher.py
+# The fetch-and-extract pipeline against a local fixture server: main-text extraction,
+# ETag revalidation, size caps, the per-host concurrency limit and prompt passages.
+# benchmarks/bench_page_fetcher.py measures fetch times on the same kind of fixture.
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import StubHandler
+import utils.page_fetcher as page_fetcher
+
+ARTICLE = (
+    "<html><head><title>Managing exam stress {n}</title><style>body{{color:red}}</style></head><body>"
+    "<nav><a href='/'>Home</a> <a href='/about'>About us and our whole team of writers</a></nav>"
+    "<header>Subscribe to our newsletter for weekly wellbeing tips and tricks!</header>"
+    "<article><h1>Managing exam stress</h1>"
+    "<p>Break revision into short sessions with planned breaks, and keep a regular sleep schedule.</p>"
+    "<p>Slow breathing &amp; a short walk lower physical tension before an exam (page {n}).</p>"
+    "<script>var tracking = 'this should never reach the prompt';</script>"
+    "</article><footer>© 2024 Example Health. All rights reserved. Cookie settings.</footer></body></html>"
+)
+HUGE = ("<p>" + "Endless filler text about wellbeing. " * 50 + "</p>") * 2000
+
+
+class FixtureSite(StubHandler):
+    """
+    GET /<n> serves ARTICLE with an ETag, /huge a multi-megabyte page, /pdf a non-HTML body,
+    /nocharset a UTF-8 page without a charset in its Content-Type and /missing a 404.
+    Every answer takes the server's `latency` seconds.
+    """
+
+    def do_GET(self):
+        with self.stub.lock:
+            self.stub.requests.append((self.path, self.headers.get("If-None-Match")))
+        with self.stub.serving():
+            self._respond()
+
+    def _respond(self):
+        etag = f'"{self.path}-v1"'
+        if self.path == "/missing":
+            self.send(404, b"", {"Content-Type": "text/html"})
+        elif self.headers.get("If-None-Match") == etag:
+            with self.stub.lock:
+                self.stub.not_modified += 1
+            self.send(304, b"", {"ETag": etag})
+        elif self.path == "/huge":
+            self.send(200, HUGE.encode("utf-8"), {"Content-Type": "text/html; charset=utf-8", "ETag": etag})
+        elif self.path == "/nocharset":
+            self.send(200, ARTICLE.format(n="– café ☕").encode("utf-8"),
+                      {"Content-Type": "text/html", "ETag": etag})
+        elif self.path == "/pdf":
+            self.send(200, b"%PDF-1.4 not really", {"Content-Type": "application/pdf", "ETag": etag})
+        else:
+            self.send(200, ARTICLE.format(n=self.path.strip("/")).encode("utf-8"),
+                      {"Content-Type": "text/html; charset=utf-8", "ETag": etag})
+
+
+@pytest.fixture
+def site(stub_server):
+    return stub_server(FixtureSite, not_modified=0)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "pages")
+
+
+def test_extractor_keeps_main_text_only():
+    extractor = page_fetcher.TextExtractor()
+    html = ARTICLE.format(n=1)
+    for i in range(0, len(html), 7):  # fed in small pieces, as it streams in
+        extractor.feed(html[i:i + 7])
+    extractor.close()
+    result = extractor.result()
+
+    assert result["title"] == "Managing exam stress 1"
+    assert result["text"].split("\n") == [
+        "Break revision into short sessions with planned breaks, and keep a regular sleep schedule.",
+        "Slow breathing & a short walk lower physical tension before an exam (page 1).",
+    ]
+
+
+def test_fetch_page_extracts_and_caches(site, cache_dir):
+    url = f"{site.url}/1"
+    page = page_fetcher.fetch_page(url, cache_dir)
+    assert page["url"] == url
+    assert page["title"] == "Managing exam stress 1"
+    for boilerplate in ("tracking", "Subscribe", "Cookie", "About us", "Home"):
+        assert boilerplate not in page["text"]
+
+    assert page_fetcher.fetch_page(url, cache_dir) == page
+    assert [path for path, _ in site.requests] == ["/1"]  # second call served from cache within the TTL
+
+
+def test_expired_pages_are_revalidated_with_etag(site, cache_dir):
+    url = f"{site.url}/2"
+    page = page_fetcher.fetch_page(url, cache_dir)
+    revalidated = page_fetcher.fetch_page(url, cache_dir, ttl=0)
+
+    assert revalidated == page
+    assert site.requests == [("/2", None), ("/2", '"/2-v1"')]
+    assert site.not_modified == 1
+
+
+def test_oversized_page_is_capped(site, cache_dir):
+    max_bytes = 200_000
+    page = page_fetcher.fetch_page(f"{site.url}/huge", cache_dir, max_bytes=max_bytes)
+    assert len(HUGE) > 10 * max_bytes
+    assert 0 < len(page["text"]) <= max_bytes
+    assert page["text"].startswith("Endless filler text about wellbeing.")
+
+
+def test_non_html_and_failed_pages_are_empty(site, cache_dir):
+    assert page_fetcher.fetch_page(f"{site.url}/pdf", cache_dir)["text"] == ""
+    assert page_fetcher.fetch_page(f"{site.url}/missing", cache_dir) == {
+        "url": f"{site.url}/missing", "title": "", "text": ""}
+
+
+def test_pages_without_charset_are_decoded_as_utf8(site, cache_dir):
+    page = page_fetcher.fetch_page(f"{site.url}/nocharset", cache_dir)
+    assert page["title"] == "Managing exam stress – café ☕"
+
+
+def test_concurrent_cache_writes_of_one_url(cache_dir):
+    url = "https://example.org/same-page"
+
+    def write(n):
+        page_fetcher._write_cache(url, cache_dir, {"url": url, "title": f"v{n}", "text": "x" * 10_000,
+                                                   "fetched_at": time.time()})
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(write, range(200)))  # raises if any write fails
+    assert page_fetcher._read_cache(url, cache_dir)["title"].startswith("v")
+    assert os.listdir(cache_dir) == [os.path.basename(page_fetcher._cache_path(url, cache_dir))]
+
+
+def test_failed_revalidation_falls_back_to_cached_text(site, cache_dir):
+    url = f"{site.url}/3"
+    page = page_fetcher.fetch_page(url, cache_dir)
+    site.close()
+    assert page_fetcher.fetch_page(url, cache_dir, ttl=0) == page
+
+
+def test_fetch_pages_keeps_order_and_limits_each_host(site, cache_dir):
+    site.latency = 0.2
+    urls = [f"{site.url}/{n}" for n in range(1, 7)]
+    start = time.perf_counter()
+    pages = page_fetcher.fetch_pages(urls, cache_dir)
+    elapsed = time.perf_counter() - start
+
+    assert [page["title"] for page in pages] == [f"Managing exam stress {n}" for n in range(1, 7)]
+    assert site.max_in_flight == page_fetcher.PER_HOST_LIMIT
+    assert elapsed < len(urls) * site.latency * 0.75  # concurrent, not serial
+
+
+def test_build_passages_numbers_pages_and_shares_budget():
+    pages = [
+        {"url": "https://a.example/1", "title": "First", "text": "alpha " * 400},
+        {"url": "https://b.example/2", "title": "", "text": ""},
+        {"url": "https://c.example/3", "title": "", "text": "gamma " * 400},
+    ]
+    passages = page_fetcher.build_passages(pages, token_budget=200)
+    first, second = passages.split("\n\n")
+
+    assert first.startswith("[1] First (https://a.example/1)\n")
+    assert second.startswith("[2] https://c.example/3 (https://c.example/3)\n")
+    for part in (first, second):
+        assert page_fetcher.count_tokens(part) <= 100 + 1  # the "…" marking the cut
+    assert page_fetcher.build_passages([pages[1]]) == ""
@@ -0,0 +1,146 @@
+# tests/test_search_client.py
+# SearchClient against a local stub Serper server: caching, TTL, request coalescing,
+# disk persistence and query normalization. benchmarks/bench_search_client.py measures
+# hit rate and latency on a replayed workload.
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from conftest import StubHandler
+from utils.search_client import SearchClient, normalize_query
+
+
+class StubSerper(StubHandler):
+    """
+    POST /search {"q": ...} -> {"organic": [...]}. Queries starting with "fail" answer 500;
+    every answer takes the server's `latency` seconds.
+    """
+
+    def do_POST(self):
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["q"]
+        with self.stub.lock:
+            self.stub.queries.append(query)
+            self.stub.api_keys.append(self.headers.get("X-API-KEY"))
+        with self.stub.serving():
+            if query.startswith("fail"):
+                self.send(500)
+                return
+            payload = json.dumps({"organic": [
+                {"title": f"Result {i} for {query}", "link": f"https://example.org/{i}"} for i in range(3)
+            ]}).encode("utf-8")
+            self.send(200, payload, {"Content-Type": "application/json"})
+
+
+@pytest.fixture
+def serper(stub_server):
+    return stub_server(StubSerper, latency=0.1, path="/search", queries=[], api_keys=[])
+
+
+@pytest.fixture
+def make_client(serper, tmp_path):
+    def make(**kwargs):
+        options = dict(api_key="test-key", url=serper.url, cache_dir=str(tmp_path / "cache"))
+        options.update(kwargs)
+        return SearchClient(**options)
+    return make
+
+
+def test_normalize_query():
+    assert normalize_query("  How to manage   exam stress?  ") == "how to manage exam stress"
+    assert normalize_query("Tips\tto sleep better!") == "tips to sleep better"
+    assert normalize_query("burnout") == normalize_query("BURNOUT.")
+
+
+def test_repeated_query_is_served_from_cache(serper, make_client):
+    client = make_client()
+    first = client.search("how to manage exam stress")
+    assert first[0]["title"] == "Result 0 for how to manage exam stress"
+    assert client.search("How to manage  exam stress?") == first
+    assert serper.queries == ["how to manage exam stress"]
+    assert serper.api_keys == ["test-key"]
+
+    report = client.report()
+    assert (report["hits"], report["misses"], report["upstream_calls"]) == (1, 1, 1)
+    assert report["hit_rate"] == 0.5
+
+
+def test_expired_entries_are_fetched_again(serper, make_client):
+    client = make_client(ttl=0.2)
+    client.search("tips to sleep better")
+    client.search("tips to sleep better")
+    assert len(serper.queries) == 1
+    time.sleep(0.3)
+    client.search("tips to sleep better")
+    assert len(serper.queries) == 2
+
+
+def test_concurrent_identical_queries_share_one_request(serper, make_client):
+    client = make_client()
+    serper.latency = 0.3
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(client.search, ["mindfulness for beginners"] * 8))
+    assert len(serper.queries) == 1
+    assert all(result == results[0] for result in results)
+    report = client.report()
+    assert report["misses"] == 1
+    assert report["hits"] + report["coalesced"] == 7
+
+
+def test_cache_survives_a_new_client(serper, make_client):
+    make_client().search("how to stop overthinking")
+    restarted = make_client()
+    assert restarted.search("How to stop overthinking?")[0]["title"] == "Result 0 for how to stop overthinking"
+    assert len(serper.queries) == 1
+    assert restarted.report()["hits"] == 1
+
+
+def test_memory_only_client_keeps_nothing_on_disk(serper, make_client, tmp_path):
+    client = make_client(cache_dir=None)
+    client.search("what to do when feeling lonely")
+    client.search("what to do when feeling lonely")
+    assert len(serper.queries) == 1
+    assert not (tmp_path / "cache").exists()
+
+
+def test_failures_are_raised_to_every_waiter_and_not_cached(serper, make_client, tmp_path):
+    client = make_client()
+    serper.latency = 0.3
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(client.search, "fail please") for _ in range(4)]
+    for future in futures:
+        with pytest.raises(requests.HTTPError):
+            future.result()
+    assert len(serper.queries) == 1
+
+    with pytest.raises(requests.HTTPError):
+        client.search("fail please")
+    assert len(serper.queries) == 2  # the error was not cached
+    assert not list(tmp_path.glob("cache/*.json"))
+
+
+def test_lru_keeps_at_most_max_entries_in_memory(serper, make_client):
+    client = make_client(max_entries=2, cache_dir=None)
+    for query in ("a", "b", "c"):
+        client.search(query)
+    client.search("a")  # evicted from memory, so fetched again
+    assert serper.queries == ["a", "b", "c", "a"]
+
+
+def test_concurrent_clients_store_the_same_query(serper, make_client, tmp_path):
+    clients = [make_client() for _ in range(4)]
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda client: client.search("how to stop overthinking"), clients))
+    assert all(result == results[0] for result in results)
+    assert len(list(tmp_path.glob("cache/*"))) == 1  # one entry, no temp files left behind
+
+
+def test_clear_drops_memory_and_disk(serper, make_client):
+    client = make_client()
+    client.search("breathing exercises for anxiety")
+    client.clear()
+    make_client().search("breathing exercises for anxiety")
+    assert len(serper.queries) == 2
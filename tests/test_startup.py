@@ -0,0 +1,41 @@
+# tests/test_startup.py
+
+import threading
+
+import pytest
+
+from utils.lazy import lazy_resource
+
+
+def test_login_path_within_import_budget():
+    pytest.importorskip("streamlit")
+    from benchmarks.startup_imports import IMPORT_BUDGET_MS, run_importtime
+
+    rows, loaded = run_importtime()
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+
+    assert loaded == [], f"heavy modules imported on the login path: {loaded}"
+    assert total_ms <= IMPORT_BUDGET_MS
+
+
+def test_lazy_resource_builds_once_per_arguments():
+    calls = []
+
+    @lazy_resource
+    def build(name):
+        calls.append(name)
+        return object()
+
+    threads = [threading.Thread(target=build, args=("base",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert build("base") is build("base")
+    assert build("small") is not build("base")
+    assert calls == ["base", "small"]
+
+    build.cache_clear()
+    build("base")
+    assert calls == ["base", "small", "base"]
@@ -0,0 +1,36 @@
+# tests/test_vector_index.py
+# ivf_pq stays compressed in memory and re-ranks from the stored vectors.
+# benchmarks/bench_vector_index.py compares all index types at MiniLM size.
+
+import faiss
+import numpy as np
+
+from utils.vector_index import build_index, search_index, recall_at_k
+
+DIMENSION = 64
+PARAMS = {"pq_m": 8, "nbits": 6, "nprobe": 16}
+
+
+def clustered(n, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((200, DIMENSION)).astype(np.float32)
+    return centers[rng.integers(0, 200, n)] + 0.35 * rng.standard_normal((n, DIMENSION)).astype(np.float32)
+
+
+def test_ivf_pq_is_compressed_and_reranks_from_stored_vectors(tmp_path):
+    data = clustered(4_100)
+    embeddings, queries = data[:4_000], data[4_000:]
+    np.save(tmp_path / "embeddings.npy", embeddings)
+    stored = np.load(tmp_path / "embeddings.npy", mmap_mode="r")
+
+    exact = build_index(embeddings, "flat_ip")
+    _, exact_ids = search_index(exact, queries, 10, "flat_ip")
+    index = build_index(embeddings, "ivf_pq", PARAMS)
+    assert len(faiss.serialize_index(index)) < len(faiss.serialize_index(exact)) / 4
+
+    _, pq_ids = search_index(index, queries, 10, "ivf_pq", {**PARAMS, "k_factor": 0}, vectors=stored)
+    scores, ids = search_index(index, queries, 10, "ivf_pq", PARAMS, vectors=stored)
+    assert recall_at_k(ids, exact_ids, 10) > 0.9
+    assert recall_at_k(ids, exact_ids, 10) > recall_at_k(pq_ids, exact_ids, 10)
+    assert ids.shape == scores.shape == (100, 10)
+    assert np.all(np.diff(scores, axis=1) <= 1e-6)  # best first, like faiss
@@ -0,0 +1,182 @@
+# tests/test_voice_pipeline.py
+# VoicePipeline with a generated WAV fixture and stub STT / LLM / TTS / playback engines
+# (no microphone, network or speakers), plus SentenceSplitter and concat_wavs.
+# benchmarks/bench_voice_pipeline.py compares pipelined and serial turn latency.
+
+import math
+import wave
+import struct
+import threading
+
+import pytest
+
+from utils.voice_pipeline import VoicePipeline, SentenceSplitter, concat_wavs
+
+SAMPLE_RATE = 16000
+TRANSCRIPT = "I'm so stressed about my exams next week"
+REPLY = [
+    "I'm really sorry you're feeling this stressed. ",
+    "Try breaking your revision into short blocks. ",
+    "One exam doesn't define you.",
+]
+
+
+def write_wav(path, seconds, freq=220.0):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        frames = (int(8000 * math.sin(2 * math.pi * freq * i / SAMPLE_RATE))
+                  for i in range(int(seconds * SAMPLE_RATE)))
+        f.writeframes(b"".join(struct.pack("<h", sample) for sample in frames))
+
+
+def frame_count(path):
+    with wave.open(str(path), "rb") as f:
+        return f.getnframes()
+
+
+class Stubs:
+    """Stub engines that record what they were called with, in order."""
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.calls = []
+        self.lock = threading.Lock()
+        self.first_tts = threading.Event()
+
+    def log(self, *call):
+        with self.lock:
+            self.calls.append(call)
+
+    def stt(self, audio_path):
+        self.log("stt", frame_count(audio_path))
+        return TRANSCRIPT
+
+    def reply(self, text):
+        assert text == TRANSCRIPT
+        yield REPLY[0]
+        # The rest of the reply waits until TTS has started on the first sentence: a
+        # serial pipeline would stall here
+        self.log("llm_waiting", self.first_tts.wait(timeout=5))
+        for chunk in REPLY[1:]:
+            yield chunk
+        self.log("llm_done")
+
+    def tts(self, sentence):
+        self.log("tts", sentence)
+        self.first_tts.set()
+        with self.lock:
+            path = self.work_dir / f"tts_{sum(call[0] == 'tts' for call in self.calls)}.wav"
+        write_wav(path, 0.05 * len(sentence.split()))
+        return str(path)
+
+    def play(self, path):
+        self.log("play", path)
+
+
+@pytest.fixture
+def stubs(tmp_path):
+    return Stubs(tmp_path)
+
+
+@pytest.fixture
+def fixture_wav(tmp_path):
+    path = tmp_path / "user_turn.wav"
+    write_wav(path, 1.0)
+    return str(path)
+
+
+def test_turn_events_in_order(stubs, fixture_wav):
+    events = list(VoicePipeline(stubs.stt, stubs.reply, stubs.tts, stubs.play).run(fixture_wav))
+
+    assert events[0] == ("transcript", TRANSCRIPT)
+    assert events[-1][0] == "done"
+    sentences = [event[1:] for event in events if event[0] == "sentence"]
+    assert sentences == [(i, chunk.strip()) for i, chunk in enumerate(REPLY)]
+    audio = [event for event in events if event[0] == "audio"]
+    assert [event[1] for event in audio] == [0, 1, 2]
+    for index, path in ((event[1], event[2]) for event in audio):
+        # each sentence's audio comes after the sentence itself
+        assert events.index(("sentence", index, REPLY[index].strip())) < events.index(("audio", index, path))
+
+    timings = events[-1][1]
+    assert {"stt", "llm_first_sentence", "llm", "first_audio", "tts", "total"} <= set(timings)
+    assert timings["first_audio"] <= timings["total"]
+    assert stubs.calls[0] == ("stt", SAMPLE_RATE)
+    assert [call[1] for call in stubs.calls if call[0] == "play"] == [event[2] for event in audio]
+
+
+def test_tts_starts_before_the_reply_is_finished(stubs, fixture_wav):
+    list(VoicePipeline(stubs.stt, stubs.reply, stubs.tts).run(fixture_wav))
+
+    names = [call[0] for call in stubs.calls]
+    assert ("llm_waiting", True) in stubs.calls
+    assert names.index("tts") < names.index("llm_done")
+
+
+def test_without_play_fn_nothing_is_played(stubs, fixture_wav):
+    events = list(VoicePipeline(stubs.stt, stubs.reply, stubs.tts).run(fixture_wav))
+    assert sum(event[0] == "audio" for event in events) == len(REPLY)
+    assert not any(call[0] == "play" for call in stubs.calls)
+
+
+def test_stage_errors_are_reported_as_events(stubs, fixture_wav):
+    def broken_stt(audio):
+        raise RuntimeError("mic unplugged")
+
+    events = list(VoicePipeline(broken_stt, stubs.reply, stubs.tts).run(fixture_wav))
+    assert [event[0] for event in events] == ["error", "done"]
+    assert events[0] == ("error", "stt", "mic unplugged")
+
+    def broken_reply(text):
+        yield "Half a sentence that never "
+        raise ConnectionError("stream dropped")
+
+    events = list(VoicePipeline(stubs.stt, broken_reply, stubs.tts).run(fixture_wav))
+    assert ("error", "llm", "stream dropped") in events
+    assert events[-1][0] == "done"
+
+    def flaky_tts(sentence):
+        if sentence.startswith("Try"):
+            raise OSError("no voice")
+        return stubs.tts(sentence)
+
+    def broken_play(path):
+        raise OSError("no speakers")
+
+    events = list(VoicePipeline(stubs.stt, stubs.reply, flaky_tts, broken_play).run(fixture_wav))
+    assert ("error", "tts", "no voice") in events
+    assert [event[1] for event in events if event[0] == "audio"] == [0, 2]  # the other sentences still play
+    assert sum(event[:2] == ("error", "playback") for event in events) == 2
+
+
+def test_concat_wavs_joins_frames(tmp_path):
+    paths = []
+    for i, seconds in enumerate((0.25, 0.5, 0.1)):
+        paths.append(str(tmp_path / f"{i}.wav"))
+        write_wav(paths[-1], seconds)
+    joined = tmp_path / "joined.wav"
+    joined.write_bytes(concat_wavs(paths))
+
+    assert frame_count(joined) == sum(frame_count(path) for path in paths)
+    with wave.open(str(joined), "rb") as f:
+        assert (f.getnchannels(), f.getsampwidth(), f.getframerate()) == (1, 2, SAMPLE_RATE)
+    assert concat_wavs([]) == b""
+
+
+def test_sentence_splitter_on_a_stream():
+    splitter = SentenceSplitter(min_chars=10)
+    sentences = []
+    for chunk in ("Hi. I hear", " you! Exams are", " hard (really.) Rest", " well"):
+        sentences += splitter.feed(chunk)
+    assert sentences == ["Hi. I hear you!", "Exams are hard (really.)"]
+    assert splitter.flush() == ["Rest well"]
+    assert splitter.flush() == []
+
+
+def test_sentence_splitter_waits_for_whitespace_after_punctuation():
+    splitter = SentenceSplitter(min_chars=1)
+    assert splitter.feed("It costs 3.5") == []
+    assert splitter.feed("0 dollars. Then") == ["It costs 3.50 dollars."]
+    assert splitter.flush() == ["Then"]
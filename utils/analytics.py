@@ -1,33 +1,143 @@
 #utils/analytics.py
+import os
 import streamlit as st
-from transformers import pipeline
+from config.settings import settings
+
+# Pipelines are built on first use, so importing this module doesn't pull in torch/transformers.
+
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+
+# Inference backends (settings.ANALYTICS_BACKEND):
+#   "torch"     - full-precision PyTorch (default)
+#   "quantized" - PyTorch with dynamic int8 quantization of the Linear layers
+#   "onnx"      - ONNX Runtime export, see `python -m utils.analytics_export`
+BACKENDS = ("torch", "quantized", "onnx")
+ONNX_MODEL_DIR = "models/onnx"
+ONNX_FILE_NAMES = ("model_quantized.onnx", "model.onnx")
+
+def onnx_model_path(model_id: str) -> str:
+    return os.path.join(ONNX_MODEL_DIR, model_id.replace("/", "__"))
+
+def _configure_threads():
+    if settings.ANALYTICS_THREADS > 0:
+        import torch
+        torch.set_num_threads(settings.ANALYTICS_THREADS)
+
+def _build_pipeline(task: str, model_id: str, **kwargs):
+    from transformers import pipeline
+    _configure_threads()
+
+    backend = settings.ANALYTICS_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown analytics backend '{backend}', expected one of {BACKENDS}.")
+
+    if backend == "onnx":
+        from transformers import AutoTokenizer
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        path = onnx_model_path(model_id)
+        file_name = next((f for f in ONNX_FILE_NAMES if os.path.exists(os.path.join(path, f))), None)
+        if file_name is None:
+            raise FileNotFoundError(
+                f"No ONNX export found for {model_id} in {path}. Run: python -m utils.analytics_export"
+            )
+        model = ORTModelForSequenceClassification.from_pretrained(path, file_name=file_name)
+        return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(path), **kwargs)
+
+    pipe = pipeline(task, model=model_id, **kwargs)
+    if backend == "quantized":
+        import torch
+        pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipe
 
 # ---- Sentiment pipeline ----
 @st.cache_resource
 def _sentiment_pipeline():
-    return pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-
-sentiment_analyzer = _sentiment_pipeline()
+    return _build_pipeline("sentiment-analysis", SENTIMENT_MODEL)
 
 # ---- Emotion pipeline ----
 @st.cache_resource
 def _emotion_pipeline():
     # model that returns scores for multiple emotions
-    return pipeline("text-classification",
-                    model="j-hartmann/emotion-english-distilroberta-base",
-                    return_all_scores=True)
+    return _build_pipeline("text-classification", EMOTION_MODEL, return_all_scores=True)
+
+def _chunk_texts(tokenizer, texts: list):
+    """
+    Splits each non-empty text into windows that fit the model, on token boundaries.
+    Returns (chunks, owners, weights): chunk text, index of the source text, token count.
+    """
+    max_tokens = min(tokenizer.model_max_length, 512) - 2  # room for [CLS]/[SEP]
+    chunks, owners, weights = [], [], []
+    for i, text in enumerate(texts):
+        if not text.strip():
+            continue
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                            verbose=False)["offset_mapping"]
+        for start in range(0, len(offsets), max_tokens):
+            window = offsets[start:start + max_tokens]
+            chunks.append(text[window[0][0]:window[-1][1]])
+            owners.append(i)
+            weights.append(len(window))
+    return chunks, owners, weights
+
+def _run_batched(pipe, texts: list, batch_size: int = None):
+    """
+    Runs every chunk of every text through the pipeline in padded batches.
+    Returns (outputs, owners, weights) aligned per chunk.
+    """
+    chunks, owners, weights = _chunk_texts(pipe.tokenizer, texts)
+    if not chunks:
+        return [], [], []
+    outputs = pipe(chunks, batch_size=batch_size or settings.ANALYTICS_BATCH_SIZE,
+                   truncation=True, max_length=512)
+    return outputs, owners, weights
+
+def analyze_sentiment_batch(texts: list, batch_size: int = None) -> list:
+    """
+    Scores many texts at once. Long texts are scored over all their chunks and the
+    positive probability is averaged, weighted by chunk length.
+    """
+    outputs, owners, weights = _run_batched(_sentiment_pipeline(), texts, batch_size)
+
+    totals = [0.0] * len(texts)
+    token_counts = [0] * len(texts)
+    for r, owner, weight in zip(outputs, owners, weights):
+        positive = r["score"] if r["label"] == "POSITIVE" else 1 - r["score"]
+        totals[owner] += positive * weight
+        token_counts[owner] += weight
+
+    results = []
+    for total, count in zip(totals, token_counts):
+        if not count:
+            results.append({"label": "neutral", "score": 0.5})
+            continue
+        score = total / count
+        results.append({"label": "positive" if score >= 0.5 else "negative", "score": score})
+    return results
+
+def analyze_emotions_batch(texts: list, batch_size: int = None) -> list:
+    """
+    Scores many texts at once, returning per-emotion scores averaged over each
+    text's chunks, weighted by chunk length.
+    """
+    outputs, owners, weights = _run_batched(_emotion_pipeline(), texts, batch_size)
+
+    totals = [{} for _ in texts]
+    token_counts = [0] * len(texts)
+    for chunk_scores, owner, weight in zip(outputs, owners, weights):
+        for r in chunk_scores:
+            label = r["label"].lower()
+            totals[owner][label] = totals[owner].get(label, 0.0) + r["score"] * weight
+        token_counts[owner] += weight
 
-emotion_analyzer = _emotion_pipeline()
+    return [
+        {label: score / count for label, score in emos.items()} if count else {}
+        for emos, count in zip(totals, token_counts)
+    ]
 
 def analyze_sentiment(text: str) -> dict:
-    if not text.strip():
-        return {"label":"neutral","score":0.5}
-    r = sentiment_analyzer(text[:512])[0]
-    score = r["score"] if r["label"]=="POSITIVE" else 1 - r["score"]
-    return {"label": r["label"].lower(), "score": score}
+    return analyze_sentiment_batch([text])[0]
 
 def analyze_emotions(text: str) -> dict:
-    if not text.strip():
-        return {}
-    results = emotion_analyzer(text[:512])[0]  # list of dicts
-    return { r["label"].lower(): r["score"] for r in results }
+    return analyze_emotions_batch([text])[0]
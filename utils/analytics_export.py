@@ -0,0 +1,39 @@
+# utils/analytics_export.py
+# Exports the analytics models to ONNX (optionally int8-quantized) for the "onnx" backend.
+# Usage: python -m utils.analytics_export [--no-quantize]
+# Requires: pip install "optimum[onnxruntime]"
+
+import argparse
+
+from utils.analytics import SENTIMENT_MODEL, EMOTION_MODEL, onnx_model_path
+
+
+def export_model(model_id: str, quantize: bool = True) -> str:
+    """
+    Exports a Hugging Face sequence-classification model to ONNX under models/onnx.
+    With `quantize`, a dynamic int8 model_quantized.onnx is written next to model.onnx.
+    """
+    from transformers import AutoTokenizer
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    path = onnx_model_path(model_id)
+    model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+    model.save_pretrained(path)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(path)
+
+    if quantize:
+        quantizer = ORTQuantizer.from_pretrained(path)
+        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=path, quantization_config=qconfig)
+
+    print(f"Exported {model_id} to {path}{' (int8)' if quantize else ''}.")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the analytics models to ONNX.")
+    parser.add_argument("--no-quantize", action="store_true", help="Keep the full-precision ONNX model only.")
+    args = parser.parse_args()
+    for model_id in (SENTIMENT_MODEL, EMOTION_MODEL):
+        export_model(model_id, quantize=not args.no_quantize)
@@ -0,0 +1,135 @@
+# utils/analytics_store.py
+
+import os
+import json
+import hashlib
+import argparse
+import threading
+
+from utils.analytics import analyze_sentiment_batch, analyze_emotions_batch
+from utils.file_ops import get_user_session_paths, load_chat_from_file
+from utils.voice_memory import load_voice_messages
+
+# Persisted sentiment/emotion scores: data/analytics/<username>.json
+#   {"<session file>": {"hash": ..., "sentiment_score": ..., "primary_emotion": ..., "emotions": {...}}}
+# A session is only re-scored when the hash of its text changes.
+ANALYTICS_DIR = "data/analytics"
+CHAT_DIR = "data/chat_sessions"
+
+_lock = threading.Lock()
+_stores = {}  # username -> store dict
+
+
+def build_session_text(chat_msgs: list, voice_msgs: list) -> str:
+    """
+    Combines chat and voice text the way the History & Insights page scores it.
+    voice_msgs must be the voice session of the same date, so a session's text (and hash)
+    only changes when that day's messages do.
+    """
+    return " ".join(m["content"] for m in chat_msgs) + " " + " ".join(
+        v["content"] for v in voice_msgs if v.get("type") == "text"
+    )
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def score_texts(texts: list) -> list:
+    """
+    Runs the sentiment and emotion models on many sessions' text in one batched pass.
+    """
+    rows = []
+    for sent, emos in zip(analyze_sentiment_batch(texts), analyze_emotions_batch(texts)):
+        primary = max(emos, key=emos.get) if emos else "neutral"
+        rows.append({"sentiment_score": sent["score"], "primary_emotion": primary, "emotions": emos})
+    return rows
+
+
+def _store_path(username: str) -> str:
+    return os.path.join(ANALYTICS_DIR, f"{username}.json")
+
+
+def _load_store(username: str) -> dict:
+    store = _stores.get(username)
+    if store is None:
+        try:
+            with open(_store_path(username), "r", encoding="utf-8") as f:
+                store = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            store = {}
+        _stores[username] = store
+    return store
+
+
+def _save_store(username: str, store: dict):
+    os.makedirs(ANALYTICS_DIR, exist_ok=True)
+    path = _store_path(username)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def get_session_scores(username: str, sessions: list) -> list:
+    """
+    Returns precomputed scores for a list of (session_file, text) pairs.
+    Only sessions that are new or whose text changed are scored; the store is saved once.
+    The models run outside the lock, so other users' pages aren't held up by a long scoring pass.
+    """
+    digests = [text_hash(text) for _, text in sessions]
+    with _lock:
+        store = _load_store(username)
+        stale = [
+            i for i, ((session_file, _), digest) in enumerate(zip(sessions, digests))
+            if store.get(session_file, {}).get("hash") != digest
+        ]
+        results = {i: store[session_file] for i, (session_file, _) in enumerate(sessions) if i not in stale}
+
+    if stale:
+        scored = score_texts([sessions[i][1] for i in stale])
+        with _lock:
+            store = _load_store(username)
+            for i, row in zip(stale, scored):
+                store[sessions[i][0]] = results[i] = {"hash": digests[i], **row}
+            _save_store(username, store)
+
+    return [results[i] for i in range(len(sessions))]
+
+
+def backfill(usernames: list = None, base_dir: str = CHAT_DIR) -> int:
+    """
+    Scores every historical session of the given users (all users by default).
+    Returns the number of sessions processed.
+    """
+    if usernames is None:
+        usernames = sorted(
+            name for name in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, name))
+        ) if os.path.isdir(base_dir) else []
+
+    processed = 0
+    for username in usernames:
+        sessions = []
+        for chat_path in get_user_session_paths(username, base_dir=base_dir):
+            try:
+                chat_msgs = load_chat_from_file(chat_path)
+            except Exception as e:
+                print(f"Skipping {chat_path}: {e}")
+                continue
+            voice_msgs = load_voice_messages(username, os.path.basename(os.path.dirname(chat_path)))
+            sessions.append((chat_path, build_session_text(chat_msgs, voice_msgs)))
+
+        get_session_scores(username, sessions)
+        processed += len(sessions)
+        print(f"Scored {len(sessions)} sessions for {username}.")
+    return processed
+
+
+if __name__ == "__main__":
+    # Offline backfill: python -m utils.analytics_store [--user NAME ...]
+    parser = argparse.ArgumentParser(description="Precompute sentiment/emotion scores for chat sessions.")
+    parser.add_argument("--user", action="append", dest="users", help="Only backfill this user (repeatable).")
+    parser.add_argument("--base-dir", default=CHAT_DIR, help="Chat sessions folder.")
+    args = parser.parse_args()
+    total = backfill(args.users, args.base_dir)
+    print(f"Backfill complete: {total} sessions.")
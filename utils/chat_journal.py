@@ -0,0 +1,247 @@
+# utils/chat_journal.py
+
+import os
+import json
+import time
+import atexit
+import threading
+from collections import OrderedDict
+
+# Each day's session is stored as a compact JSON snapshot (session_<date>.json)
+# plus an append-only JSON-lines journal (session_<date>.jsonl) next to it.
+# Snapshots are {"journal_generation": n, "messages": [...]} (legacy plain lists are
+# generation 0) and each journal starts with a {"journal_generation": n} header. A
+# compaction writes the snapshot with the next generation before deleting the journal,
+# so a journal left behind by a crash in between is recognized as already folded in.
+JOURNAL_SUFFIX = ".jsonl"
+FSYNC_EVERY = 16          # fsync after this many appended records...
+FSYNC_INTERVAL = 1.0      # ...or when this many seconds passed since the last fsync
+COMPACT_EVERY = 500       # fold the journal into the snapshot after this many records
+MAX_OPEN_JOURNALS = 32    # least recently used journals beyond this are closed
+
+_lock = threading.Lock()
+_open_journals = OrderedDict()  # journal path -> {"file", "pending", "records", "last_sync"}
+
+
+def journal_path(snapshot_path: str) -> str:
+    """
+    Returns the journal file that belongs to a session snapshot.
+    """
+    return os.path.splitext(snapshot_path)[0] + JOURNAL_SUFFIX
+
+
+def _read_journal_file(path: str):
+    """
+    Returns (generation, records) of a journal file; a torn last line (crash mid-write) is ignored.
+    """
+    generation, records = 0, []
+    if not os.path.exists(path):
+        return generation, records
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if number == 0 and isinstance(record, dict) and set(record) == {"journal_generation"}:
+                generation = record["journal_generation"]
+            else:
+                records.append(record)
+    return generation, records
+
+
+def _read_snapshot(snapshot_path: str):
+    """
+    Returns (generation, messages) of a snapshot.
+    """
+    if not os.path.exists(snapshot_path):
+        return 0, []
+    with open(snapshot_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data.get("journal_generation", 0), data.get("messages", [])
+    return 0, data
+
+
+def read_journal(snapshot_path: str) -> list:
+    """
+    Reads the journal records of a session snapshot that are not folded into it yet.
+    """
+    generation, records = _read_journal_file(journal_path(snapshot_path))
+    return records if generation == _read_snapshot(snapshot_path)[0] else []
+
+
+def _read_session_locked(snapshot_path: str) -> list:
+    snapshot_generation, messages = _read_snapshot(snapshot_path)
+    generation, records = _read_journal_file(journal_path(snapshot_path))
+    return messages + records if generation == snapshot_generation else messages
+
+
+def read_session(snapshot_path: str) -> list:
+    """
+    Returns all messages of a session: the snapshot followed by the journal.
+    Holds the journal lock so a concurrent compaction can't make messages appear twice or go missing.
+    """
+    with _lock:
+        return _read_session_locked(snapshot_path)
+
+
+def _recover_journal(path: str, snapshot_generation: int) -> int:
+    """
+    Prepares a journal for appending and returns its record count. A journal already
+    folded into the snapshot (crash during compaction) is removed, and a torn last line
+    is cut off so the next record doesn't get glued onto it.
+    """
+    if not os.path.exists(path):
+        return 0
+    generation, records = _read_journal_file(path)
+    if generation != snapshot_generation:
+        os.remove(path)
+        return 0
+    with open(path, "rb+") as f:
+        data = f.read()
+        torn = bool(data) and not data.endswith(b"\n")
+        if torn:
+            f.truncate(data.rfind(b"\n") + 1)
+    return len(_read_journal_file(path)[1]) if torn else len(records)
+
+
+def _open_state(path: str, snapshot_path: str) -> dict:
+    state = _open_journals.get(path)
+    if state is None:
+        snapshot_generation = _read_snapshot(snapshot_path)[0]
+        records = _recover_journal(path, snapshot_generation)
+        new_journal = not os.path.exists(path) or os.path.getsize(path) == 0
+        state = {
+            "file": open(path, "a", encoding="utf-8"),
+            "pending": 0,
+            "records": records,
+            "last_sync": time.monotonic(),
+        }
+        if new_journal:
+            state["file"].write(json.dumps({"journal_generation": snapshot_generation}) + "\n")
+        _open_journals[path] = state
+        while len(_open_journals) > MAX_OPEN_JOURNALS:
+            _close_locked(next(iter(_open_journals)))
+    else:
+        _open_journals.move_to_end(path)
+    return state
+
+
+def _sync(state: dict):
+    state["file"].flush()
+    os.fsync(state["file"].fileno())
+    state["pending"] = 0
+    state["last_sync"] = time.monotonic()
+
+
+def _close_locked(path: str):
+    state = _open_journals.pop(path, None)
+    if state is not None:
+        if state["pending"]:
+            _sync(state)
+        state["file"].close()
+
+
+def _compact_locked(snapshot_path: str):
+    path = journal_path(snapshot_path)
+    _close_locked(path)
+
+    generation = _read_snapshot(snapshot_path)[0]
+    messages = _read_session_locked(snapshot_path)
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        # The next generation: the current journal is folded in from here on
+        json.dump({"journal_generation": generation + 1, "messages": messages}, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, snapshot_path)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def append_message(snapshot_path: str, message: dict):
+    """
+    Appends a single message to the session journal.
+    The line is flushed immediately so readers see it; fsync is batched.
+    """
+    line = json.dumps(message, ensure_ascii=False) + "\n"
+    path = journal_path(snapshot_path)
+
+    with _lock:
+        # Keep an (empty) snapshot around so session discovery by *.json still works
+        if not os.path.exists(snapshot_path):
+            with open(snapshot_path, "w", encoding="utf-8") as f:
+                json.dump([], f)
+
+        state = _open_state(path, snapshot_path)
+        state["file"].write(line)
+        state["file"].flush()
+        state["pending"] += 1
+        state["records"] += 1
+
+        if state["pending"] >= FSYNC_EVERY or time.monotonic() - state["last_sync"] >= FSYNC_INTERVAL:
+            _sync(state)
+
+        if state["records"] >= COMPACT_EVERY:
+            _compact_locked(snapshot_path)
+
+
+def compact_session(snapshot_path: str):
+    """
+    Folds the journal of a session into its snapshot.
+    """
+    with _lock:
+        _compact_locked(snapshot_path)
+
+
+def discard_session(snapshot_path: str):
+    """
+    Closes and removes the journal of a session (used when deleting it).
+    """
+    path = journal_path(snapshot_path)
+    with _lock:
+        _close_locked(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def flush_journals():
+    """
+    Fsyncs every open journal.
+    """
+    with _lock:
+        for state in _open_journals.values():
+            if state["pending"]:
+                _sync(state)
+
+
+def close_journals():
+    """
+    Fsyncs and closes every open journal (at exit; they are reopened on the next append).
+    """
+    with _lock:
+        for path in list(_open_journals):
+            _close_locked(path)
+
+
+def migrate_sessions(base_dir: str = "data/chat_sessions") -> int:
+    """
+    Migrates existing sessions to the journal layout.
+    Legacy pretty-printed session_<date>.json files are already valid snapshots (generation 0),
+    so this rewrites them compactly and folds any outstanding journal. Returns the number of sessions.
+    """
+    migrated = 0
+    for root, dirs, files in os.walk(base_dir):
+        for file in files:
+            if file.startswith("session_") and file.endswith(".json"):
+                compact_session(os.path.join(root, file))
+                migrated += 1
+    return migrated
+
+
+atexit.register(close_journals)
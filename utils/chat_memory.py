@@ -1,14 +1,16 @@
 # utils/chat_memory.py
 
 import os
-import json
 from datetime import datetime
 from fpdf import FPDF
+from utils.chat_journal import append_message, read_session, discard_session
+from utils.session_index import record_message, remove_session
+from utils.memory_index import enqueue_message
 
 # Base folder for all chat session data
 CHAT_DIR = "data/chat_sessions"
 
-def save_message_to_history(username: str, role: str, content: str, source: str = "chat"):
+def save_message_to_history(username: str, role: str, content: str, source: str = "chat", date: str = None):
     """
     Saves a single chat or voice message to a JSON file organized by user and date.
     Args:
@@ -16,34 +18,28 @@ def save_message_to_history(username: str, role: str, content: str, source: str
         role: "user" or "neuromentor"
         content: The text content of the message.
         source: "chat" or "voice" (default is chat)
+        date: The session day ("%Y-%m-%d") to append to (default is today)
     """
     # Prepare directory path
-    date_today = datetime.now().strftime("%Y-%m-%d")
+    date_today = date or datetime.now().strftime("%Y-%m-%d")
     base_dir = os.path.join(CHAT_DIR, username, date_today)
     os.makedirs(base_dir, exist_ok=True)
 
     # Prepare filename (one file per session day)
     filename = os.path.join(base_dir, f"session_{date_today}.json")
 
-    # Load existing messages
-    if os.path.exists(filename):
-        with open(filename, "r", encoding="utf-8") as f:
-            chat_data = json.load(f)
-    else:
-        chat_data = []
-
-    # Append new message
-    chat_data.append({
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    # Append new message to the session journal (no read-modify-write of the snapshot)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    append_message(filename, {
+        "timestamp": timestamp,
         "role": role,
         "type": "text",         # Indicating it's a text message
         "source": source,       # "chat" or "voice"
         "content": content
     })
-
-    # Save back
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(chat_data, f, ensure_ascii=False, indent=2)
+    record_message(username, date_today, filename, base_dir=CHAT_DIR)
+    # Embedded for memory retrieval on a background thread
+    enqueue_message(username, role, content, source=source, timestamp=timestamp)
 
 def load_chat_history(username: str, date: str) -> list:
     """
@@ -51,17 +47,28 @@ def load_chat_history(username: str, date: str) -> list:
     """
     filepath = os.path.join(CHAT_DIR, username, date, f"session_{date}.json")
     if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_session(filepath)
     return []
 
+def load_chat_page(username: str, date: str, end: int = None, count: int = 50):
+    """
+    Loads one page of a day's messages: the `count` messages before index `end`
+    (the latest ones when `end` is None). Returns (messages, start index).
+    """
+    messages = load_chat_history(username, date)
+    end = len(messages) if end is None else min(end, len(messages))
+    start = max(0, end - count)
+    return messages[start:end], start
+
 def delete_session(username: str, date: str, session_file: str):
     """
     Delete a specific chat session by date and filename.
     """
     session_path = os.path.join(CHAT_DIR, username, date, session_file)
+    discard_session(session_path)
     if os.path.exists(session_path):
         os.remove(session_path)
+    remove_session(username, date, base_dir=CHAT_DIR)
 
 def summarize_session(chat_session: list) -> str:
     """
@@ -0,0 +1,112 @@
+# utils/chunker.py
+
+import re
+import numpy as np
+
+# Sentence ends: terminal punctuation (plus closing quotes/brackets) before whitespace, or a blank line
+SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)|\n\s*\n")
+DEFAULT_OVERLAP = 32
+SENTENCE_SEARCH = 0.25  # look for a sentence end in the last quarter of a window
+
+
+def model_token_limit(model) -> int:
+    """
+    Max content tokens per chunk for a SentenceTransformer (its max_seq_length minus [CLS]/[SEP]).
+    """
+    return int(model.max_seq_length) - 2
+
+
+def _page_tokens(tokenizer, text: str, page_offset: int):
+    """
+    Tokenizes one page and returns numpy arrays of absolute token start/end offsets and
+    a mask of tokens that end a sentence.
+    """
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True,
+                        verbose=False)["offset_mapping"]
+    if not offsets:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=bool)
+
+    spans = np.asarray(offsets, dtype=np.int64)
+    sentence_ends = np.fromiter((m.end() for m in SENTENCE_END.finditer(text)), dtype=np.int64)
+    # a token ends a sentence if a sentence-end match finishes at (or right after) the token
+    is_end = np.isin(spans[:, 1], sentence_ends) | np.isin(spans[:, 1] + 1, sentence_ends)
+    return spans[:, 0] + page_offset, spans[:, 1] + page_offset, is_end
+
+
+def chunk_document(pages, tokenizer, max_tokens: int, overlap: int = DEFAULT_OVERLAP):
+    """
+    Splits a document into overlapping chunks that fit the embedding model.
+
+    `pages` is a string or an iterable of (page_number, text); it is consumed as a
+    stream. Each window holds at most `max_tokens` tokens, ends at a sentence boundary
+    when one is close to the limit, and the next window starts `overlap` tokens before
+    the previous one ended.
+
+    Yields compact records: {"text", "start", "end", "page_start", "page_end"}, where
+    start/end are character offsets into the concatenated page texts.
+    """
+    if isinstance(pages, str):
+        pages = [(1, pages)]
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be >= 0 and smaller than max_tokens")
+
+    starts = np.zeros(0, dtype=np.int64)
+    ends = np.zeros(0, dtype=np.int64)
+    page_of = np.zeros(0, dtype=np.int64)
+    is_end = np.zeros(0, dtype=bool)
+    page_texts = {}  # page number -> (absolute offset, text) for pages still in the buffer
+    offset = 0
+    emitted_until = -1  # end offset of the last chunk yielded
+
+    def slice_text(start, stop, first_page, last_page):
+        parts = []
+        for number in range(first_page, last_page + 1):
+            if number not in page_texts:
+                continue
+            page_offset, text = page_texts[number]
+            lo, hi = max(start - page_offset, 0), min(stop - page_offset, len(text))
+            if lo < hi:
+                parts.append(text[lo:hi])
+        return "".join(parts)
+
+    def make_chunk(count):
+        start, stop = int(starts[0]), int(ends[count - 1])
+        first_page, last_page = int(page_of[0]), int(page_of[count - 1])
+        return {
+            "text": slice_text(start, stop, first_page, last_page),
+            "start": start,
+            "end": stop,
+            "page_start": first_page,
+            "page_end": last_page,
+        }
+
+    for page_number, text in pages:
+        page_texts[page_number] = (offset, text)
+        page_starts, page_ends, page_is_end = _page_tokens(tokenizer, text, offset)
+        offset += len(text)
+
+        starts = np.concatenate([starts, page_starts])
+        ends = np.concatenate([ends, page_ends])
+        page_of = np.concatenate([page_of, np.full(len(page_starts), page_number, dtype=np.int64)])
+        is_end = np.concatenate([is_end, page_is_end])
+
+        while len(starts) > max_tokens:
+            # Prefer the last sentence end in the tail of the window
+            search_from = int(max_tokens * (1 - SENTENCE_SEARCH))
+            candidates = np.flatnonzero(is_end[search_from:max_tokens])
+            count = search_from + int(candidates[-1]) + 1 if len(candidates) else max_tokens
+
+            yield make_chunk(count)
+            emitted_until = int(ends[count - 1])
+
+            keep_from = max(count - overlap, 1)
+            starts, ends, page_of, is_end = (
+                starts[keep_from:], ends[keep_from:], page_of[keep_from:], is_end[keep_from:]
+            )
+            for number in [n for n in page_texts if n < page_of[0]]:
+                del page_texts[number]
+
+    # Last window, unless it is only the overlap of the previous chunk
+    if len(starts) and int(ends[-1]) > emitted_until:
+        yield make_chunk(len(starts))
@@ -0,0 +1,232 @@
+# utils/document_library.py
+
+import os
+import json
+import shutil
+import threading
+from datetime import datetime
+
+import faiss
+import numpy as np
+
+from utils.chunker import chunk_document, model_token_limit
+from utils.embeddings import get_embedding_model, embed_texts
+from utils.pdf_text import file_hash, iter_pdf_pages
+
+# Per-user document library:
+#   data/library/<username>/catalog.json           documents by content hash
+#   data/library/<username>/docs/<hash>/chunks.json chunk records (text, offsets, pages)
+#   data/library/<username>/docs/<hash>/embeddings.npy
+#   data/library/<username>/index.faiss             one ID-mapped index over all chunks
+# Chunk ids are (document sequence number << CHUNK_BITS) | chunk number, so a document
+# can be added or removed without rebuilding the index.
+# The catalog is the commit point. The index is derived from the per-document
+# embeddings: if a crash between the two writes leaves it out of step with the
+# catalog, it is rebuilt on the next load.
+LIBRARY_DIR = "data/library"
+CHUNK_BITS = 24
+EMBED_BATCH_SIZE = 256
+
+_locks = {}
+_locks_guard = threading.Lock()
+_indexes = {}  # username -> faiss index
+
+
+def _user_lock(username: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(username, threading.Lock())
+
+
+def _user_dir(username: str) -> str:
+    return os.path.join(LIBRARY_DIR, username)
+
+
+def _doc_dir(username: str, doc_hash: str) -> str:
+    return os.path.join(_user_dir(username), "docs", doc_hash)
+
+
+def _load_catalog(username: str) -> dict:
+    try:
+        with open(os.path.join(_user_dir(username), "catalog.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"next_seq": 1, "documents": {}}
+
+
+def _save_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _chunk_ids(seq: int, count: int) -> np.ndarray:
+    return (np.int64(seq) << CHUNK_BITS) | np.arange(count, dtype=np.int64)
+
+
+def _seq_range(seq: int):
+    return faiss.IDSelectorRange(int(seq) << CHUNK_BITS, (int(seq) + 1) << CHUNK_BITS)
+
+
+def _load_index(username: str, catalog: dict):
+    index = _indexes.get(username)
+    if index is not None:
+        return index
+
+    path = os.path.join(_user_dir(username), "index.faiss")
+    expected = sum(doc["chunks"] for doc in catalog["documents"].values())
+    index = faiss.read_index(path) if os.path.exists(path) else None
+    if index is None or index.ntotal != expected:
+        # Missing, or out of step with the catalog (crash between the two writes):
+        # rebuild it from the stored per-document embeddings
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(get_embedding_model().get_sentence_embedding_dimension()))
+        for doc_hash, doc in catalog["documents"].items():
+            embeddings = np.load(os.path.join(_doc_dir(username, doc_hash), "embeddings.npy"))
+            if len(embeddings):
+                index.add_with_ids(embeddings, _chunk_ids(doc["seq"], len(embeddings)))
+    _indexes[username] = index
+    return index
+
+
+def _save_index(username: str, index):
+    path = os.path.join(_user_dir(username), "index.faiss")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    faiss.write_index(index, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def _read_pages(file_path: str):
+    if file_path.lower().endswith(".pdf"):
+        return iter_pdf_pages(file_path)
+    with open(file_path, "r", encoding="utf-8") as f:
+        return [(1, f.read())]
+
+
+def add_document(username: str, file_path: str, name: str = None, doc_hash: str = None):
+    """
+    Adds a PDF or text file to the user's library. Re-adding a file with the same
+    content is free. Returns (doc_hash, added) where `added` is False for duplicates.
+    Pass `doc_hash` when the caller already has the file's hash.
+    """
+    doc_hash = doc_hash or file_hash(file_path)
+    with _user_lock(username):
+        catalog = _load_catalog(username)
+        if doc_hash in catalog["documents"]:
+            return doc_hash, False
+
+        model = get_embedding_model()
+        chunks = list(chunk_document(_read_pages(file_path), model.tokenizer, model_token_limit(model)))
+        texts = [chunk["text"] for chunk in chunks]
+        dimension = model.get_sentence_embedding_dimension()
+        embeddings = np.vstack([
+            embed_texts(texts[i:i + EMBED_BATCH_SIZE]) for i in range(0, len(texts), EMBED_BATCH_SIZE)
+        ]) if texts else np.zeros((0, dimension), dtype=np.float32)
+
+        doc_dir = _doc_dir(username, doc_hash)
+        _save_json(os.path.join(doc_dir, "chunks.json"), chunks)
+        np.save(os.path.join(doc_dir, "embeddings.npy"), embeddings)
+
+        seq = catalog["next_seq"]
+        index = _load_index(username, catalog)
+        index.remove_ids(_seq_range(seq))  # leftovers of an add that crashed before its catalog write
+        if len(embeddings):
+            index.add_with_ids(embeddings, _chunk_ids(seq, len(embeddings)))
+        _save_index(username, index)
+
+        catalog["next_seq"] = seq + 1
+        catalog["documents"][doc_hash] = {
+            "name": name or os.path.basename(file_path),
+            "seq": seq,
+            "chunks": len(chunks),
+            "pages": max((chunk["page_end"] for chunk in chunks), default=0),
+            "added": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        _save_json(os.path.join(_user_dir(username), "catalog.json"), catalog)
+        return doc_hash, True
+
+
+def remove_document(username: str, doc_hash: str) -> bool:
+    """
+    Removes a document and its chunks from the user's library.
+    """
+    with _user_lock(username):
+        catalog = _load_catalog(username)
+        doc = catalog["documents"].pop(doc_hash, None)
+        if doc is None:
+            return False
+
+        index = _load_index(username, catalog)
+        index.remove_ids(_seq_range(doc["seq"]))
+        _save_json(os.path.join(_user_dir(username), "catalog.json"), catalog)  # commit point
+        _save_index(username, index)
+        shutil.rmtree(_doc_dir(username, doc_hash), ignore_errors=True)
+        return True
+
+
+def list_documents(username: str) -> list:
+    """
+    Returns the user's documents as a list of {"hash", "name", "pages", "chunks", "added"}.
+    """
+    catalog = _load_catalog(username)
+    return [{"hash": doc_hash, **doc} for doc_hash, doc in catalog["documents"].items()]
+
+
+def has_documents(username: str, doc_hashes) -> bool:
+    """
+    True when every one of the given documents is in the user's library.
+    """
+    documents = _load_catalog(username)["documents"]
+    return all(doc_hash in documents for doc_hash in doc_hashes)
+
+
+def _search_documents(username: str, catalog: dict, query_vector: np.ndarray, doc_hashes, top_k: int):
+    # Exact search over the stored embeddings of a few documents (no index needed)
+    ids, vectors = [], []
+    for doc_hash in doc_hashes:
+        doc = catalog["documents"].get(doc_hash)
+        if doc is None:
+            continue
+        embeddings = np.load(os.path.join(_doc_dir(username, doc_hash), "embeddings.npy"))
+        ids.append(_chunk_ids(doc["seq"], len(embeddings)))
+        vectors.append(embeddings)
+    if not ids or not sum(len(v) for v in vectors):
+        return np.zeros((1, 0), dtype=np.float32), np.zeros((1, 0), dtype=np.int64)
+    ids, vectors = np.concatenate(ids), np.vstack(vectors)
+    scores = vectors @ query_vector[0]
+    order = np.argsort(-scores)[:top_k]
+    return scores[order][None, :], ids[order][None, :]
+
+
+def search_library(username: str, query: str, top_k: int = 3, doc_hashes=None) -> list:
+    """
+    Returns the top_k chunk records across the user's whole library (or only the
+    documents in `doc_hashes`), each with the "document" name and similarity "score" added.
+    The stored embeddings are reused, so nothing but the query is encoded.
+    """
+    query_vector = embed_texts([query])
+    with _user_lock(username):
+        catalog = _load_catalog(username)
+        if doc_hashes is not None:
+            scores, ids = _search_documents(username, catalog, query_vector, doc_hashes, top_k)
+        else:
+            index = _load_index(username, catalog)
+            if index.ntotal == 0:
+                return []
+            scores, ids = index.search(query_vector, min(top_k, index.ntotal))
+
+    by_seq = {doc["seq"]: (doc_hash, doc) for doc_hash, doc in catalog["documents"].items()}
+    chunk_cache = {}
+    results = []
+    for score, chunk_id in zip(scores[0], ids[0]):
+        if chunk_id < 0:
+            continue
+        seq, number = int(chunk_id) >> CHUNK_BITS, int(chunk_id) & ((1 << CHUNK_BITS) - 1)
+        if seq not in by_seq:
+            continue
+        doc_hash, doc = by_seq[seq]
+        if doc_hash not in chunk_cache:
+            with open(os.path.join(_doc_dir(username, doc_hash), "chunks.json"), "r", encoding="utf-8") as f:
+                chunk_cache[doc_hash] = json.load(f)
+        results.append({**chunk_cache[doc_hash][number], "document": doc["name"], "score": float(score)})
+    return results
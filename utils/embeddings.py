@@ -0,0 +1,20 @@
+# utils/embeddings.py
+
+import numpy as np
+from utils.lazy import lazy_resource
+
+# Shared sentence embedding model, loaded once on first use
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+@lazy_resource
+def get_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)  # Fast and lightweight
+
+def embed_texts(texts: list, normalize: bool = True) -> np.ndarray:
+    """
+    Encodes texts into a float32 matrix (one row per text), L2-normalized by default
+    so that a dot product is the cosine similarity.
+    """
+    embeddings = get_embedding_model().encode(list(texts), normalize_embeddings=normalize)
+    return np.asarray(embeddings, dtype=np.float32)
@@ -3,6 +3,8 @@
 import os
 import json
 from datetime import datetime
+from utils.chat_journal import read_journal
+from utils.session_index import get_user_sessions
 
 def get_all_session_paths(base_dir='data/chat_sessions'):
     """
@@ -14,11 +16,18 @@ def get_all_session_paths(base_dir='data/chat_sessions'):
     # Walk through the directory and subdirectories
     for root, dirs, files in os.walk(base_dir):
         for file in files:
-            if file.endswith(".json"):  # assuming each session is stored as a .json file
+            if file.startswith("session_") and file.endswith(".json"):  # each session is a session_<date>.json file
                 all_paths.append(os.path.join(root, file))
     
     return all_paths
 
+def get_user_session_paths(username, start_date=None, end_date=None, base_dir='data/chat_sessions'):
+    """
+    Get the session file paths of a single user within a date range, using the
+    per-user session manifest instead of walking every user's folder.
+    """
+    return [entry["file"] for entry in get_user_sessions(username, start_date, end_date, base_dir=base_dir)]
+
 def load_chat_from_file(file_path):
     """
     Load chat session data from a JSON file.
@@ -34,6 +43,9 @@ def load_chat_from_file(file_path):
             if not isinstance(chat_data, list):
                 raise ValueError(f"Expected 'messages' to be a list in {file_path}, but got {type(chat_data)}.")
 
+        # Messages appended since the last compaction live in the session journal
+        chat_data = chat_data + read_journal(file_path)
+
         cleaned_chat_data = []
         for idx, message in enumerate(chat_data):
             if "content" in message:
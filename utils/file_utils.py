@@ -1,16 +1,26 @@
 #utils/ file_utils.py
 import os
-import fitz  # PyMuPDF
-import faiss
+import hashlib
+from collections import OrderedDict
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import google.generativeai as genai
 from config.settings import settings
+from utils.index_cache import get_cached_index
+from utils.lazy import lazy_resource
+from utils.embeddings import EMBEDDING_MODEL_NAME, get_embedding_model
+from utils.llm_client import llm_client
+from utils.pdf_text import iter_pdf_pages
+from utils.chunker import chunk_document, model_token_limit, DEFAULT_OVERLAP
+from utils.vector_index import build_index, search_index
+from utils.document_library import search_library
 
-# Load models once
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')  # Fast and lightweight
-genai.configure(api_key=settings.GOOGLE_API_KEY)
-gemini_model = genai.GenerativeModel('models/gemini-1.5-pro')
+EMBED_BATCH_SIZE = 256  # chunks encoded per batch while building an index
+
+# Models are loaded once, on first use
+@lazy_resource
+def get_gemini_model():
+    import google.generativeai as genai
+    genai.configure(api_key=settings.GOOGLE_API_KEY)
+    return genai.GenerativeModel('models/gemini-1.5-pro')
 
 def save_uploaded_file(uploaded_file, save_path):
     try:
@@ -21,49 +31,235 @@ def save_uploaded_file(uploaded_file, save_path):
         raise Exception(f"File could not be saved: {str(e)}")
 
 def read_pdf(file_path):
-    doc = fitz.open(file_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text
+    return "".join(text for _, text in iter_pdf_pages(file_path))
 
 def merge_texts(text_list):
     return "\n\n".join(text_list)
 
 def save_text_as_file(text, filename):
     save_path = os.path.join("temp_uploads", filename)
+    os.makedirs("temp_uploads", exist_ok=True)
     with open(save_path, "w", encoding="utf-8") as f:
         f.write(text)
     return save_path
 
+def chunk_text_stream(texts, chunk_size=300):
+    """
+    Yields chunk_size-word chunks from an iterable of texts (e.g. PDF pages) without
+    joining them into one string first.
+    """
+    words = []
+    for text in texts:
+        words.extend(text.split())
+        while len(words) >= chunk_size:
+            yield " ".join(words[:chunk_size])
+            del words[:chunk_size]
+    if words:
+        yield " ".join(words)
+
 def chunk_text(text, chunk_size=300):
-    words = text.split()
-    return [" ".join(words[i:i+chunk_size]) for i in range(0, len(words), chunk_size)]
+    return list(chunk_text_stream([text], chunk_size))
+
+def build_faiss_index(chunks, index_type=None, index_params=None):
+    """
+    Encodes chunks (any iterable of strings or chunk records, consumed in batches)
+    and builds a faiss index of the configured type over them.
+    """
+    model = get_embedding_model()
+    index_type = index_type or settings.VECTOR_INDEX_TYPE
+    all_chunks, batches, batch = [], [], []
+
+    def add_batch():
+        texts = [chunk["text"] if isinstance(chunk, dict) else chunk for chunk in batch]
+        batches.append(np.asarray(model.encode(texts), dtype=np.float32))
+        all_chunks.extend(batch)
+
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == EMBED_BATCH_SIZE:
+            add_batch()
+            batch = []
+    if batch:
+        add_batch()
+
+    dimension = model.get_sentence_embedding_dimension()
+    embeddings = np.vstack(batches) if batches else np.zeros((0, dimension), dtype=np.float32)
+    index = build_index(embeddings, index_type, index_params)
+    return index, embeddings, all_chunks
 
-def build_faiss_index(chunks):
-    embeddings = embedding_model.encode(chunks)
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(np.array(embeddings))
-    return index, embeddings, chunks
+def chunk_pages(pages, overlap=DEFAULT_OVERLAP):
+    """
+    Token-aware, overlapping chunk records (text, offsets, pages) sized for the embedding model.
+    """
+    model = get_embedding_model()
+    return chunk_document(pages, model.tokenizer, model_token_limit(model), overlap)
 
-def query_document_rag(document_text, user_query, top_k=3):
-    chunks = chunk_text(document_text)
-    index, embeddings, raw_chunks = build_faiss_index(chunks)
-    query_embedding = embedding_model.encode([user_query])
+def build_pdf_index(file_path, overlap=DEFAULT_OVERLAP):
+    """
+    Builds (index, embeddings, chunks) straight from the PDF page stream.
+    """
+    return build_faiss_index(chunk_pages(iter_pdf_pages(file_path), overlap))
 
-    D, I = index.search(np.array(query_embedding), top_k)
-    retrieved_chunks = [raw_chunks[i] for i in I[0]]
+def _pages_key(pages):
+    return "\0".join(f"{number}\1{text}" for number, text in pages)
+
+def _file_chunks(files, overlap):
+    # Each file is chunked on its own (no chunk spans two files) and keeps its own page numbers
+    for name, pages in files.items():
+        for chunk in chunk_pages(pages, overlap):
+            chunk["document"] = name
+            yield chunk
+
+def build_document_index(document, overlap=DEFAULT_OVERLAP):
+    """
+    Returns (index, embeddings, chunk records) for a document (text, a list of
+    (page_number, text) pages, or {file name: pages} for several files, whose chunks
+    then carry the file name as "document"), reusing the cached index when it was
+    indexed before.
+    """
+    if isinstance(document, dict):
+        files = {name: list(pages) for name, pages in document.items()}
+        key = "\0\0".join(f"{name}\2{_pages_key(pages)}" for name, pages in files.items())
+        build = lambda _: build_faiss_index(_file_chunks(files, overlap))
+    else:
+        pages = [(1, document)] if isinstance(document, str) else list(document)
+        key = _pages_key(pages)
+        build = lambda _: build_faiss_index(chunk_pages(pages, overlap))
+    return get_cached_index(
+        key, build, namespace=f"{EMBEDDING_MODEL_NAME}:tokens:{overlap}:{settings.VECTOR_INDEX_TYPE}"
+    )
+
+def format_source(chunk):
+    """Human-readable provenance of a chunk record, e.g. 'pages 3–4' or 'notes.pdf, page 2'."""
+    if chunk["page_start"] == chunk["page_end"]:
+        pages = f"page {chunk['page_start']}"
+    else:
+        pages = f"pages {chunk['page_start']}–{chunk['page_end']}"
+    return f"{chunk['document']}, {pages}" if chunk.get("document") else pages
+
+def query_document_rag(document, user_query, top_k=3, username=None, doc_hashes=None):
+    """
+    Answers a question about a document (text, a list of (page_number, text) pages, or
+    {file name: pages}), or, when `username` is given, about that user's document library
+    (only the documents in `doc_hashes` when given, reusing their stored embeddings).
+    Returns (answer, sources), where sources are the retrieved chunk records.
+    """
+    if username is not None:
+        retrieved_chunks = search_library(username, user_query, top_k, doc_hashes)
+    else:
+        index, embeddings, raw_chunks = build_document_index(document)
+        query_embedding = np.asarray(get_embedding_model().encode([user_query]), dtype=np.float32)
+
+        D, I = search_index(index, query_embedding, top_k, settings.VECTOR_INDEX_TYPE, vectors=embeddings)
+        retrieved_chunks = [raw_chunks[i] for i in I[0] if i >= 0]
 
     context = "You are helping based on the following extracted document sections:\n\n"
     for idx, chunk in enumerate(retrieved_chunks, 1):
-        context += f"Section {idx}:\n{chunk}\n\n"
+        context += f"Section {idx} ({format_source(chunk)}):\n{chunk['text']}\n\n"
     context += f"Now answer the user's question clearly:\nQ: {user_query}\nA:"
 
-    response = gemini_model.generate_content(context)
-    return response.text
+    response = llm_client.generate_content(get_gemini_model(), context)
+    return response.text, retrieved_chunks
+
+# ---- Map-reduce summarization ----
+SUMMARY_CHUNK_WORDS = 2000      # average words per map chunk
+SUMMARY_MIN_WORDS = 1000        # a chunk never ends before this many words...
+SUMMARY_MAX_WORDS = 3000        # ...and always ends before exceeding this many
+SUMMARY_REDUCE_FANIN = 6        # partial summaries combined per reduce call
+SUMMARY_CACHE_DIR = "data/summary_cache"
+SUMMARY_MEMORY_ENTRIES = 4096
+
+FINAL_SUMMARY_PROMPT = "Summarize the following document clearly, concisely, and beautifully:\n\n{text}\n\nSummary:"
+MAP_SUMMARY_PROMPT = (
+    "Summarize this part of a larger document clearly and concisely, keeping the key facts and ideas:\n\n"
+    "{text}\n\nSummary:"
+)
+REDUCE_SUMMARY_PROMPT = (
+    "Combine these partial summaries of the same document into one clear, concise summary:\n\n"
+    "{text}\n\nSummary:"
+)
+
+_summary_cache = OrderedDict()  # prompt hash -> summary text
+
+def _summary_key(prompt):
+    return hashlib.sha256(f"{get_gemini_model().model_name}\0{prompt}".encode("utf-8")).hexdigest()
+
+async def _cached_summary_async(prompt):
+    """
+    Summarizes one prompt, reusing earlier results (memory, then disk) keyed by content hash.
+    """
+    key = _summary_key(prompt)
+    if key in _summary_cache:
+        _summary_cache.move_to_end(key)
+        return _summary_cache[key]
+
+    path = os.path.join(SUMMARY_CACHE_DIR, f"{key}.txt")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            summary = f.read()
+    else:
+        response = await llm_client.agenerate_content(get_gemini_model(), prompt)
+        summary = response.text
+        os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(summary)
+
+    _summary_cache[key] = summary
+    while len(_summary_cache) > SUMMARY_MEMORY_ENTRIES:
+        _summary_cache.popitem(last=False)
+    return summary
+
+def _summarize_prompts(prompts):
+    # Runs concurrently; the shared LLM client bounds how many calls are in flight
+    return llm_client.gather([_cached_summary_async(prompt) for prompt in prompts])
+
+def _line_units(text, max_words):
+    # Non-empty lines (paragraphs, PDF lines) are the units; over-long lines are split into word windows
+    for line in text.splitlines():
+        words = line.split()
+        for start in range(0, len(words), max_words):
+            yield " ".join(words[start:start + max_words])
+
+def content_chunks(text, target_words=SUMMARY_CHUNK_WORDS, min_words=SUMMARY_MIN_WORDS,
+                   max_words=SUMMARY_MAX_WORDS):
+    """
+    Splits text into chunks whose boundaries depend only on nearby content: after
+    min_words, a chunk ends at a line whose hash picks it (with probability
+    proportional to its length, so chunks average about target_words), or before it
+    would exceed max_words. An edit anywhere only changes the chunk it falls in (and
+    at most its neighbour), so the map summaries of every other chunk stay cached.
+    """
+    span = max(target_words - min_words, 1)
+    chunks, current, count = [], [], 0
+    for unit in _line_units(text, max_words):
+        words = len(unit.split())
+        if current and count + words > max_words:
+            chunks.append("\n".join(current))
+            current, count = [], 0
+        current.append(unit)
+        count += words
+        digest = int.from_bytes(hashlib.blake2b(unit.encode("utf-8"), digest_size=8).digest(), "big")
+        if count >= min_words and digest % span < words:
+            chunks.append("\n".join(current))
+            current, count = [], 0
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
 
 def summarize_document(document_text):
-    prompt = f"Summarize the following document clearly, concisely, and beautifully:\n\n{document_text}\n\nSummary:"
-    response = gemini_model.generate_content(prompt)
-    return response.text
+    """
+    Summarizes a document of any size: chunks are summarized in parallel (map), then
+    the partial summaries are combined in rounds (reduce) into the final summary.
+    Chunks are content-defined and their summaries cached by content hash, so repeated,
+    extended or edited uploads only summarize the chunks that actually changed.
+    """
+    chunks = content_chunks(document_text)
+    if len(chunks) <= 1:
+        return _summarize_prompts([FINAL_SUMMARY_PROMPT.format(text=document_text)])[0]
+
+    partials = _summarize_prompts([MAP_SUMMARY_PROMPT.format(text=chunk) for chunk in chunks])
+    while len(partials) > SUMMARY_REDUCE_FANIN:
+        groups = [partials[i:i + SUMMARY_REDUCE_FANIN] for i in range(0, len(partials), SUMMARY_REDUCE_FANIN)]
+        partials = _summarize_prompts([REDUCE_SUMMARY_PROMPT.format(text="\n\n".join(group)) for group in groups])
+
+    return _summarize_prompts([FINAL_SUMMARY_PROMPT.format(text="\n\n".join(partials))])[0]
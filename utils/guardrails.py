@@ -1,5 +1,6 @@
 # utils/guardrails.py
 
+import re
 from utils.llm import get_gemini_response
 
 INTENT_CHECK_PROMPT = """
@@ -12,6 +13,50 @@ Just reply with one word: relevant or irrelevant.
 Message: "{query}"
 """
 
+# Words that make a message clearly about feelings or personal challenges.
+# Only unambiguous ones: "down", "tense" or "happy" also show up in off-topic messages
+# ("shut down the server", "past tense", "happy hour"), so those go to the remote check.
+WELLNESS_KEYWORDS = [
+    "feel", "feeling", "feelings", "mood", "stress", "stressed", "anxiety", "anxious",
+    "nervous", "worried", "overwhelmed", "sad", "depressed", "lonely", "alone",
+    "sleep", "tired", "exhausted", "burnout", "panic", "cry", "crying", "upset",
+    "angry", "afraid", "scared", "fear", "hopeless", "motivation", "self-esteem",
+    "confidence", "relationship", "breakup", "grief", "therapy", "mental", "wellness",
+    "meditation", "mindfulness", "relax", "calm", "cope", "coping", "pressure",
+]
+
+# Words that make a message clearly off-topic
+OFF_TOPIC_KEYWORDS = [
+    "python", "javascript", "java", "code", "coding", "compile", "sql", "function",
+    "football", "cricket", "score", "match result", "stock price", "bitcoin",
+    "recipe", "weather forecast", "capital of", "translate", "math problem",
+]
+
+
+def _contains_any(text: str, keywords: list) -> bool:
+    return any(re.search(rf"\b{re.escape(word)}\b", text) for word in keywords)
+
+
+def local_scope_check(query: str):
+    """
+    Cheap whole-word keyword pre-classifier.
+    Returns True/False only when exactly one keyword list matches; anything else
+    (no match, or both) returns None so the remote guardrail decides.
+    """
+    text = query.lower().strip()
+    if not text:
+        return None
+
+    in_scope = _contains_any(text, WELLNESS_KEYWORDS)
+    off_topic = _contains_any(text, OFF_TOPIC_KEYWORDS)
+
+    if in_scope and not off_topic:
+        return True
+    if off_topic and not in_scope:
+        return False
+    return None
+
+
 def is_within_scope(query: str) -> bool:
     """
     Determines if the query is about mental wellness.
@@ -19,7 +64,7 @@ def is_within_scope(query: str) -> bool:
     """
     prompt = INTENT_CHECK_PROMPT.format(query=query.strip())
     try:
-        response = get_gemini_response(prompt).lower().strip()
-        return "relevant" in response
+        response = get_gemini_response(prompt, prompt_type="guardrail", cache_text=query).lower().strip()
+        return "relevant" in response and "irrelevant" not in response
     except Exception:
-        return False  # If something goes wrong, treat it as off-topic.
\ No newline at end of file
+        return False  # If something goes wrong, treat it as off-topic.
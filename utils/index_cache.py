@@ -0,0 +1,109 @@
+# utils/index_cache.py
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+
+# Document indexes are keyed by a hash of the document text, so follow-up questions
+# about the same upload only pay for encoding the query.
+INDEX_CACHE_DIR = "data/index_cache"
+MAX_MEMORY_ENTRIES = 8
+
+_lock = threading.Lock()
+_memory_cache = OrderedDict()  # key -> (index, embeddings, chunks)
+
+
+def content_key(document_text: str, namespace: str = "") -> str:
+    """
+    Returns the cache key for a document. `namespace` should capture anything that
+    changes the index for the same text (embedding model, chunk size, ...).
+    """
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(document_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _entry_dir(key: str) -> str:
+    return os.path.join(INDEX_CACHE_DIR, key)
+
+
+def _remember(key: str, entry: tuple):
+    with _lock:
+        _memory_cache[key] = entry
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MAX_MEMORY_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _load_from_disk(key: str):
+    entry_dir = _entry_dir(key)
+    index_path = os.path.join(entry_dir, "index.faiss")
+    if not os.path.exists(index_path):
+        return None
+    try:
+        index = faiss.read_index(index_path)
+        embeddings = np.load(os.path.join(entry_dir, "embeddings.npy"), mmap_mode="r")
+        with open(os.path.join(entry_dir, "chunks.json"), "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        return index, embeddings, chunks
+    except Exception as e:
+        print(f"Ignoring unreadable index cache entry {key}: {e}")
+        return None
+
+
+def _save_to_disk(key: str, entry: tuple):
+    index, embeddings, chunks = entry
+    entry_dir = _entry_dir(key)
+    tmp_dir = f"{entry_dir}.tmp{threading.get_ident()}"
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+        faiss.write_index(index, os.path.join(tmp_dir, "index.faiss"))
+        np.save(os.path.join(tmp_dir, "embeddings.npy"), np.asarray(embeddings, dtype=np.float32))
+        with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump(chunks, f, ensure_ascii=False)
+        if os.path.exists(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+    except Exception as e:
+        print(f"Could not persist index cache entry {key}: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def get_cached_index(document_text: str, build_fn, namespace: str = ""):
+    """
+    Returns (index, embeddings, chunks) for a document, building it with
+    `build_fn(document_text)` only when neither the memory LRU nor the disk cache has it.
+    """
+    key = content_key(document_text, namespace)
+
+    with _lock:
+        entry = _memory_cache.get(key)
+        if entry is not None:
+            _memory_cache.move_to_end(key)
+            return entry
+
+    entry = _load_from_disk(key)
+    if entry is None:
+        entry = build_fn(document_text)
+        _save_to_disk(key, entry)
+
+    _remember(key, entry)
+    return entry
+
+
+def clear_index_cache(disk: bool = False):
+    """
+    Drops the in-memory cache, and the on-disk cache too when `disk` is True.
+    """
+    with _lock:
+        _memory_cache.clear()
+    if disk:
+        shutil.rmtree(INDEX_CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,25 @@
+# utils/lazy.py
+
+import threading
+import functools
+
+
+def lazy_resource(factory):
+    """
+    Decorator that defers building a heavy model, pipeline or SDK client until it is
+    first requested, then reuses it for the life of the process (across Streamlit reruns).
+    Heavy imports belong inside the decorated factory so importing the module stays cheap.
+    """
+    lock = threading.Lock()
+    cache = {}
+
+    @functools.wraps(factory)
+    def wrapper(*args):
+        if args not in cache:
+            with lock:
+                if args not in cache:
+                    cache[args] = factory(*args)
+        return cache[args]
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
@@ -1,33 +1,73 @@
 # utils/llm.py
 
 import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
 from config.settings import settings
+from utils.lazy import lazy_resource
+from utils.llm_cache import CACHE_POLICIES, response_cache
+from utils.llm_client import llm_client
 
-# Initialize Gemini 1.5 Pro via LangChain
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-pro",
-    google_api_key=settings.GOOGLE_API_KEY,
-    temperature=0.6,
-)
+GEMINI_MODEL = "gemini-1.5-pro"
+GEMINI_TEMPERATURE = 0.6
 
-def get_gemini_response(query: str) -> str:
+# Initialize Gemini 1.5 Pro via LangChain (on first use)
+@lazy_resource
+def get_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=GEMINI_MODEL,
+        google_api_key=settings.GOOGLE_API_KEY,
+        temperature=GEMINI_TEMPERATURE,
+        max_retries=0,  # retries are llm_client's job, for both calls and streams
+    )
+
+def _response_text(response) -> str:
+    # Check if response contains the 'text' property and return it without any additional metadata.
+    if hasattr(response, "text"):
+        return response.text.strip()
+    elif isinstance(response, dict) and 'text' in response:
+        # If the response is a dictionary and contains the 'text' field
+        return response['text'].strip()
+    else:
+        # Fallback to string conversion if 'text' attribute is absent
+        return str(response).strip()
+
+def get_gemini_response(query: str, prompt_type: str = None, cache_text: str = None) -> str:
     """
     Sends the user query to Gemini 1.5 Pro and returns a text response.
+
+    Call sites opt in to the response cache by passing a `prompt_type` listed in
+    CACHE_POLICIES; `cache_text` (e.g. the user's message) is what the semantic tier compares.
+    """
+    policy = CACHE_POLICIES.get(prompt_type) if settings.LLM_CACHE_ENABLED else None
+    try:
+        if policy:
+            cached = response_cache.get(prompt_type, query, GEMINI_MODEL, GEMINI_TEMPERATURE,
+                                        lookup_text=cache_text, semantic=policy["semantic"])
+            if cached is not None:
+                return cached
+
+        text = _response_text(llm_client.invoke_chat(get_llm(), query))
+
+        if policy:
+            response_cache.put(prompt_type, query, GEMINI_MODEL, GEMINI_TEMPERATURE, text,
+                               ttl=policy["ttl"], lookup_text=cache_text, semantic=policy["semantic"])
+        return text
+
+    except Exception as e:
+        st.error(f"Gemini response error: {e}")
+        raise e
+
+
+def stream_gemini_response(query: str):
+    """
+    Streams the Gemini 1.5 Pro response to the query, yielding text chunks as they arrive.
+    The stream goes through llm_client, so it shares the model's concurrency limit and timeout.
     """
     try:
-        response = llm.invoke(query)
-
-        # Check if response contains the 'text' property and return it without any additional metadata.
-        if hasattr(response, "text"):
-            return response.text.strip()
-        elif isinstance(response, dict) and 'text' in response:
-            # If the response is a dictionary and contains the 'text' field
-            return response['text'].strip()
-        else:
-            # Fallback to string conversion if 'text' attribute is absent
-            return str(response).strip()
-        
+        for chunk in llm_client.stream_chat(get_llm(), query):
+            text = getattr(chunk, "content", chunk)
+            if isinstance(text, str) and text:
+                yield text
     except Exception as e:
         st.error(f"Gemini response error: {e}")
         raise e
@@ -0,0 +1,124 @@
+# utils/llm_cache.py
+
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from config.settings import settings
+from utils.metrics import increment
+
+# Which prompt types may be answered from the cache, and for how long.
+# "semantic" enables the embedding-similarity tier for that type (only when
+# settings.LLM_CACHE_SEMANTIC is on). Chat replies are personal and never cached.
+CACHE_POLICIES = {
+    "guardrail": {"ttl": 24 * 3600, "semantic": True},
+    "hybrid_answer": {"ttl": 6 * 3600, "semantic": False},
+    "link_summary": {"ttl": 6 * 3600, "semantic": False},
+}
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM responses.
+
+    - Exact tier: keyed by a hash of prompt type, model, temperature and the
+      whitespace-normalized prompt.
+    - Semantic tier (optional): per prompt type, the embedding of the lookup text
+      (usually the user's message) is compared with stored ones; a cosine similarity
+      above the threshold counts as a hit.
+
+    Both tiers expire entries after the policy TTL and evict least recently used
+    entries beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 2048, semantic_threshold: float = 0.92, embed_fn=None):
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        self.embed_fn = embed_fn
+        self._lock = threading.Lock()
+        self._exact = OrderedDict()     # key -> (expires_at, response)
+        self._semantic = {}             # prompt type -> OrderedDict(key -> (vector, expires_at, response))
+
+    @staticmethod
+    def make_key(prompt_type: str, prompt: str, model: str, temperature: float) -> str:
+        raw = f"{prompt_type}\0{model}\0{temperature}\0{_normalize(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str):
+        return self.embed_fn([_normalize(text).lower()])[0]
+
+    def get(self, prompt_type: str, prompt: str, model: str, temperature: float,
+            lookup_text: str = None, semantic: bool = False):
+        now = time.time()
+        key = self.make_key(prompt_type, prompt, model, temperature)
+
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._exact.move_to_end(key)
+                    increment(f"llm_cache.{prompt_type}.exact_hit")
+                    return entry[1]
+                del self._exact[key]
+
+        if semantic and self.embed_fn is not None and lookup_text:
+            vector = self._embed(lookup_text)
+            with self._lock:
+                entries = self._semantic.get(prompt_type, {})
+                best_key, best_score = None, self.semantic_threshold
+                for entry_key, (entry_vector, expires_at, _) in list(entries.items()):
+                    if expires_at <= now:
+                        del entries[entry_key]
+                        continue
+                    score = float(entry_vector @ vector)
+                    if score >= best_score:
+                        best_key, best_score = entry_key, score
+                if best_key is not None:
+                    entries.move_to_end(best_key)
+                    increment(f"llm_cache.{prompt_type}.semantic_hit")
+                    return entries[best_key][2]
+
+        increment(f"llm_cache.{prompt_type}.miss")
+        return None
+
+    def put(self, prompt_type: str, prompt: str, model: str, temperature: float, response: str,
+            ttl: float, lookup_text: str = None, semantic: bool = False):
+        expires_at = time.time() + ttl
+        key = self.make_key(prompt_type, prompt, model, temperature)
+        vector = self._embed(lookup_text) if semantic and self.embed_fn is not None and lookup_text else None
+
+        with self._lock:
+            self._exact[key] = (expires_at, response)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_entries:
+                self._exact.popitem(last=False)
+
+            if vector is not None:
+                entries = self._semantic.setdefault(prompt_type, OrderedDict())
+                entries[key] = (vector, expires_at, response)
+                entries.move_to_end(key)
+                while len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._exact.clear()
+            self._semantic.clear()
+
+
+def _default_embed_fn(texts):
+    from utils.embeddings import embed_texts
+    return embed_texts(texts)
+
+
+response_cache = ResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    semantic_threshold=settings.LLM_CACHE_SEMANTIC_THRESHOLD,
+    embed_fn=_default_embed_fn if settings.LLM_CACHE_SEMANTIC else None,
+)
@@ -0,0 +1,209 @@
+# utils/llm_client.py
+
+import queue
+import random
+import asyncio
+import inspect
+import threading
+
+from config.settings import settings
+from utils.metrics import increment, timed
+
+# HTTP statuses worth retrying: rate limited or a transient server error
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def is_retryable(exc: Exception) -> bool:
+    """
+    True for timeouts, 429 and 5xx errors (google.api_core exceptions expose the
+    HTTP status as `.code`, HTTP clients usually as `.status_code` or `.status`).
+    """
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    for attr in ("code", "status_code", "status"):
+        status = getattr(exc, attr, None)
+        if isinstance(status, int) and status in RETRYABLE_STATUS:
+            return True
+    return False
+
+
+class LLMClient:
+    """
+    Shared async client for Gemini calls (LangChain ChatGoogleGenerativeAI and the raw
+    google.generativeai SDK).
+
+    All calls run on one background event loop, with a bounded semaphore per model,
+    a per-attempt timeout and jittered exponential retries on 429/5xx. Synchronous
+    callers (Streamlit script threads) use the blocking facade methods, which can be
+    called from many threads at once without serializing on each other.
+    """
+
+    def __init__(self, max_concurrency: int = 4, timeout: float = 60.0,
+                 max_retries: int = 3, base_delay: float = 0.5):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._semaphores = {}  # model name -> asyncio.Semaphore (used on the client loop only)
+
+    # ---- Event loop ----
+    def _get_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client-loop", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def run(self, coro):
+        """
+        Runs a coroutine on the client loop and blocks until it finishes.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[model] = semaphore
+        return semaphore
+
+    # ---- Core call with concurrency limit, timeout and retries ----
+    async def call(self, model: str, make_call):
+        """
+        Awaits `make_call()` (a zero-argument function returning a coroutine) under the
+        model's semaphore, with the timeout and retry policy applied.
+        """
+        increment("llm_client.calls")
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore(model):
+                    with timed(f"llm_client.{model}"):
+                        return await asyncio.wait_for(make_call(), self.timeout)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    increment("llm_client.timeouts")
+                if attempt == self.max_retries or not is_retryable(e):
+                    increment("llm_client.failures")
+                    raise
+                increment("llm_client.retries")
+                # Backoff happens outside the semaphore so other calls can proceed
+                await asyncio.sleep(self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    # ---- LangChain ChatGoogleGenerativeAI ----
+    async def ainvoke_chat(self, llm, prompt):
+        """
+        One chat call. Retries are this client's job: LangChain's own tenacity retries
+        (max_retries, 6 by default) would multiply with ours, so they are switched off.
+        """
+        if getattr(llm, "max_retries", 0):
+            llm = _without_retries(llm)
+        return await self.call(getattr(llm, "model", "chat"), lambda: llm.ainvoke(prompt))
+
+    def invoke_chat(self, llm, prompt):
+        return self.run(self.ainvoke_chat(llm, prompt))
+
+    async def _pump_chat_stream(self, llm, prompt, out: queue.Queue):
+        # Holds the model's semaphore for the whole stream; each chunk gets the timeout.
+        # Only a stream that failed before its first chunk can be retried.
+        model = getattr(llm, "model", "chat")
+        increment("llm_client.streams")
+        for attempt in range(self.max_retries + 1):
+            started = False
+            try:
+                async with self._semaphore(model):
+                    with timed(f"llm_client.{model}.stream"):
+                        stream = llm.astream(prompt).__aiter__()
+                        try:
+                            while True:
+                                try:
+                                    chunk = await asyncio.wait_for(stream.__anext__(), self.timeout)
+                                except StopAsyncIteration:
+                                    break
+                                started = True
+                                out.put(("chunk", chunk))
+                        finally:
+                            if hasattr(stream, "aclose"):
+                                await stream.aclose()
+                out.put(("done", None))
+                return
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    increment("llm_client.timeouts")
+                if started or attempt == self.max_retries or not is_retryable(e):
+                    increment("llm_client.failures")
+                    out.put(("error", e))
+                    return
+                increment("llm_client.retries")
+                await asyncio.sleep(self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def stream_chat(self, llm, prompt):
+        """
+        Streams a chat reply, yielding chunks to the calling thread as they arrive. The
+        stream runs on the client loop under the model's semaphore, with the timeout
+        applied to every chunk. Closing the generator early cancels the stream.
+        """
+        if getattr(llm, "max_retries", 0):
+            llm = _without_retries(llm)
+        out = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._pump_chat_stream(llm, prompt, out), self._get_loop())
+        try:
+            while True:
+                kind, value = out.get()
+                if kind == "chunk":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    # ---- Raw google.generativeai SDK ----
+    async def agenerate_content(self, model, contents):
+        """
+        One generate_content call. SDK versions with request_options get retry=None, so
+        the API client's default retry doesn't run underneath ours.
+        """
+        options = {"request_options": {"retry": None}} if _accepts_request_options(model) else {}
+        return await self.call(getattr(model, "model_name", "genai"),
+                               lambda: model.generate_content_async(contents, **options))
+
+    def generate_content(self, model, contents):
+        return self.run(self.agenerate_content(model, contents))
+
+    def gather(self, coros: list, return_exceptions: bool = False) -> list:
+        """
+        Runs several client coroutines concurrently and returns their results in order.
+        """
+        async def _gather():
+            return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+        return self.run(_gather())
+
+
+_no_retry_copies = {}  # id(llm) -> (llm, copy with max_retries=0)
+
+
+def _without_retries(llm):
+    cached = _no_retry_copies.get(id(llm))
+    if cached is None or cached[0] is not llm:
+        cached = (llm, llm.copy(update={"max_retries": 0}))
+        _no_retry_copies[id(llm)] = cached
+    return cached[1]
+
+
+def _accepts_request_options(model) -> bool:
+    method = getattr(model, "generate_content_async", None)
+    try:
+        return method is not None and "request_options" in inspect.signature(method).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+llm_client = LLMClient(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    timeout=settings.LLM_TIMEOUT,
+    max_retries=settings.LLM_MAX_RETRIES,
+)
@@ -0,0 +1,240 @@
+# utils/memory_index.py
+
+import os
+import json
+import queue
+import argparse
+import threading
+
+import faiss
+import numpy as np
+
+from utils.embeddings import get_embedding_model, embed_texts
+from utils.metrics import increment, timed
+from utils.tokens import count_tokens, truncate_to_tokens
+
+# Long-term memory over a user's own chat and voice history:
+#   data/memory_index/<username>/exchanges.jsonl  one {"timestamp", "source", "user", "assistant"} per line
+#   data/memory_index/<username>/vectors.f32      matching normalized embeddings, appended as raw float32
+# Both files are append-only, so indexing a new exchange costs O(1) disk writes; the faiss
+# index is rebuilt in memory from vectors.f32 on first use.
+MEMORY_DIR = "data/memory_index"
+CHAT_DIR = "data/chat_sessions"
+ASSISTANT_ROLES = ("assistant", "neuromentor")
+MAX_EXCHANGE_TOKENS = 160   # one remembered exchange is cut to this many tokens in the prompt
+QUEUE_BATCH_SIZE = 64       # exchanges embedded together by the background worker
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+_lock = threading.Lock()
+_pending = {}   # (username, source) -> last user message waiting for its reply
+_memories = {}  # username -> (faiss index, list of exchanges)
+
+
+def _user_dir(username: str) -> str:
+    return os.path.join(MEMORY_DIR, username)
+
+
+def exchange_text(exchange: dict) -> str:
+    return f"User: {exchange['user']}\nNeuroMentor: {exchange['assistant']}"
+
+
+def _load_memory(username: str):
+    memory = _memories.get(username)
+    if memory is not None:
+        return memory
+
+    dimension = get_embedding_model().get_sentence_embedding_dimension()
+    exchanges = []
+    try:
+        with open(os.path.join(_user_dir(username), "exchanges.jsonl"), "r", encoding="utf-8") as f:
+            exchanges = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        pass
+    try:
+        vectors = np.fromfile(os.path.join(_user_dir(username), "vectors.f32"), dtype=np.float32)
+    except FileNotFoundError:
+        vectors = np.zeros(0, dtype=np.float32)
+    vectors = vectors.reshape(-1, dimension)
+
+    # A crash between the two appends leaves them out of step: keep the common prefix
+    count = min(len(exchanges), len(vectors))
+    index = faiss.IndexFlatIP(dimension)
+    if count:
+        index.add(np.ascontiguousarray(vectors[:count]))
+    memory = (index, exchanges[:count])
+    _memories[username] = memory
+    return memory
+
+
+def add_exchanges(username: str, exchanges: list):
+    """
+    Embeds and stores exchanges ({"timestamp", "source", "user", "assistant"}) for a user.
+    """
+    if not exchanges:
+        return
+    vectors = embed_texts([exchange_text(e) for e in exchanges])
+    with _lock:
+        index, stored = _load_memory(username)
+        os.makedirs(_user_dir(username), exist_ok=True)
+        with open(os.path.join(_user_dir(username), "exchanges.jsonl"), "a", encoding="utf-8") as f:
+            for exchange in exchanges:
+                f.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+        with open(os.path.join(_user_dir(username), "vectors.f32"), "ab") as f:
+            vectors.tofile(f)
+        index.add(vectors)
+        stored.extend(exchanges)
+    increment("memory.indexed", len(exchanges))
+
+
+# ---- Background indexing ----
+def _pair(username: str, role: str, content: str, source: str, timestamp: str):
+    """
+    Pairs a user message with the next assistant reply from the same source.
+    Returns a finished exchange or None.
+    """
+    key = (username, source)
+    if role == "user":
+        _pending[key] = (content, timestamp)
+    elif role in ASSISTANT_ROLES and key in _pending:
+        user_content, user_timestamp = _pending.pop(key)
+        return {"timestamp": user_timestamp, "source": source, "user": user_content, "assistant": content}
+    return None
+
+
+def _run_worker():
+    while True:
+        items = [_queue.get()]
+        while len(items) < QUEUE_BATCH_SIZE:
+            try:
+                items.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        by_user = {}
+        for item in items:
+            exchange = _pair(*item)
+            if exchange is not None:
+                by_user.setdefault(item[0], []).append(exchange)
+        for username, exchanges in by_user.items():
+            try:
+                with timed("memory.embed_batch"):
+                    add_exchanges(username, exchanges)
+            except Exception as e:
+                print(f"Memory indexing failed for {username}: {e}")
+        for _ in items:
+            _queue.task_done()
+
+
+def enqueue_message(username: str, role: str, content: str, source: str = "chat", timestamp: str = ""):
+    """
+    Queues a saved message for memory indexing. Returns immediately; embedding runs on
+    a background thread once the user message has its reply.
+    """
+    global _worker
+    if not content or not content.strip():
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_worker, name="memory-indexer", daemon=True)
+            _worker.start()
+    _queue.put((username, role, content, source, timestamp))
+
+
+def flush(timeout: float = None):
+    """
+    Waits until every queued message has been indexed (used by backfill and benchmarks).
+    """
+    if timeout is None:
+        _queue.join()
+        return
+    with _queue.all_tasks_done:
+        _queue.all_tasks_done.wait_for(lambda: _queue.unfinished_tasks == 0, timeout)
+
+
+# ---- Retrieval ----
+def retrieve_memories(username: str, query: str, top_k: int = 3, token_budget: int = 400,
+                      min_similarity: float = 0.35) -> list:
+    """
+    Returns up to top_k past exchanges most similar to the query, best first, as prompt-ready
+    strings whose total estimated size stays within `token_budget` tokens.
+    """
+    query_vector = embed_texts([query])
+    with _lock:
+        index, exchanges = _load_memory(username)
+        if index.ntotal == 0:
+            return []
+        with timed("memory.search"):
+            scores, ids = index.search(query_vector, min(top_k, index.ntotal))
+
+    memories, used = [], 0
+    for score, i in zip(scores[0], ids[0]):
+        if i < 0 or score < min_similarity:
+            continue
+        exchange = exchanges[i]
+        text = truncate_to_tokens(exchange_text(exchange), MAX_EXCHANGE_TOKENS)
+        if exchange.get("timestamp"):
+            text = f"[{exchange['timestamp']}] {text}"
+        tokens = count_tokens(text)
+        if used + tokens > token_budget:
+            break
+        memories.append(text)
+        used += tokens
+    increment("memory.retrieved", len(memories))
+    return memories
+
+
+def clear_memory(username: str):
+    """
+    Forgets the user's memory index (e.g. before a full rebuild).
+    """
+    with _lock:
+        _memories.pop(username, None)
+        for name in ("exchanges.jsonl", "vectors.f32"):
+            path = os.path.join(_user_dir(username), name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def rebuild(username: str, base_dir: str = CHAT_DIR) -> int:
+    """
+    Rebuilds a user's memory from all saved chat sessions and voice sessions.
+    Returns the number of exchanges indexed.
+    """
+    from utils.file_ops import get_user_session_paths, load_chat_from_file
+    from utils.voice_memory import BASE_PATH as VOICE_DIR
+
+    messages = []
+    for chat_path in get_user_session_paths(username, base_dir=base_dir):
+        try:
+            messages.extend((m, m.get("source", "chat")) for m in load_chat_from_file(chat_path))
+        except Exception as e:
+            print(f"Skipping {chat_path}: {e}")
+    voice_dir = os.path.join(VOICE_DIR, username)
+    if os.path.isdir(voice_dir):
+        for name in sorted(os.listdir(voice_dir)):
+            if name.endswith("_session.json"):
+                with open(os.path.join(voice_dir, name), "r") as f:
+                    messages.extend((m, "voice") for m in json.load(f) if m.get("type") == "text")
+
+    clear_memory(username)
+    exchanges = []
+    for message, source in messages:
+        exchange = _pair(username, message.get("role"), message.get("content", ""), source,
+                         message.get("timestamp", ""))
+        if exchange is not None:
+            exchanges.append(exchange)
+    for i in range(0, len(exchanges), QUEUE_BATCH_SIZE):
+        add_exchanges(username, exchanges[i:i + QUEUE_BATCH_SIZE])
+    return len(exchanges)
+
+
+if __name__ == "__main__":
+    # Offline rebuild: python -m utils.memory_index --user NAME [--user NAME ...]
+    parser = argparse.ArgumentParser(description="Build the memory index from saved chat and voice history.")
+    parser.add_argument("--user", action="append", dest="users", required=True, help="User to index (repeatable).")
+    parser.add_argument("--base-dir", default=CHAT_DIR, help="Chat sessions folder.")
+    args = parser.parse_args()
+    for name in args.users:
+        print(f"Indexed {rebuild(name, args.base_dir)} exchanges for {name}.")
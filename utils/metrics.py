@@ -0,0 +1,97 @@
+# utils/metrics.py
+
+import time
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# In-process counters and latency samples (kept per process, reset on restart)
+MAX_SAMPLES = 1000
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_timings = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_values = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+
+
+def increment(name: str, value: int = 1):
+    """
+    Adds `value` to the counter `name`.
+    """
+    with _lock:
+        _counters[name] += value
+
+
+def record_timing(name: str, seconds: float):
+    """
+    Records one latency sample (in seconds) for `name`.
+    """
+    with _lock:
+        _timings[name].append(seconds)
+
+
+def record_value(name: str, value: float):
+    """
+    Records one sample of a non-time quantity (e.g. prompt tokens) for `name`.
+    """
+    with _lock:
+        _values[name].append(value)
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Context manager that records how long the block took under `name`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def get_metrics() -> dict:
+    """
+    Returns a snapshot: {"counters": {...}, "timings": {name: {count, avg_ms, p50_ms, p95_ms}},
+    "values": {name: {count, avg, p50, p95, max}}}.
+    """
+    with _lock:
+        counters = dict(_counters)
+        samples = {name: sorted(values) for name, values in _timings.items()}
+        value_samples = {name: sorted(values) for name, values in _values.items()}
+
+    timings = {}
+    for name, values in samples.items():
+        if not values:
+            continue
+        timings[name] = {
+            "count": len(values),
+            "avg_ms": sum(values) / len(values) * 1000,
+            "p50_ms": _percentile(values, 50) * 1000,
+            "p95_ms": _percentile(values, 95) * 1000,
+        }
+
+    values = {}
+    for name, sorted_values in value_samples.items():
+        if not sorted_values:
+            continue
+        values[name] = {
+            "count": len(sorted_values),
+            "avg": sum(sorted_values) / len(sorted_values),
+            "p50": _percentile(sorted_values, 50),
+            "p95": _percentile(sorted_values, 95),
+            "max": sorted_values[-1],
+        }
+    return {"counters": counters, "timings": timings, "values": values}
+
+
+def reset_metrics():
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+        _values.clear()
@@ -0,0 +1,235 @@
+# utils/page_fetcher.py
+
+import os
+import json
+import time
+import codecs
+import hashlib
+import tempfile
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import increment, timed
+from utils.tokens import count_tokens, truncate_to_tokens
+
+PAGE_CACHE_DIR = "data/page_cache"
+PAGE_CACHE_TTL = 24 * 3600       # serve cached text without revalidating for this long
+MAX_PAGE_BYTES = 1_000_000       # stop downloading a page after this many bytes
+MAX_WORKERS = 6                  # pages fetched at once
+PER_HOST_LIMIT = 2               # concurrent requests to one host
+TIMEOUT = (3.05, 8)              # connect / read timeout (s)
+MIN_PARAGRAPH_CHARS = 40         # shorter text blocks are menus, buttons, captions...
+USER_AGENT = "Mozilla/5.0 (compatible; NeuroMentor/1.0)"
+
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer",
+             "aside", "form", "button", "select", "iframe"}
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "ul", "ol", "blockquote", "br",
+              "h1", "h2", "h3", "h4", "h5", "h6", "td", "tr", "table", "pre", "dd", "dt"}
+
+_session = None
+_session_lock = threading.Lock()
+_host_locks = {}
+_host_locks_guard = threading.Lock()
+
+
+class TextExtractor(HTMLParser):
+    """
+    Streaming main-text extractor: feed() it HTML as it downloads. Text inside
+    boilerplate tags (scripts, navigation, footers, forms...) is dropped, the rest is
+    split into paragraphs at block tags, and short blocks are discarded.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.paragraphs = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._current = []
+
+    def _flush(self):
+        text = " ".join("".join(self._current).split())
+        if len(text) >= MIN_PARAGRAPH_CHARS:
+            self.paragraphs.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._current.append(data)
+
+    def result(self) -> dict:
+        self._flush()
+        return {"title": " ".join(self.title.split()), "text": "\n".join(self.paragraphs)}
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=PER_HOST_LIMIT)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session.headers["User-Agent"] = USER_AGENT
+        return _session
+
+
+def _host_lock(url: str) -> threading.Semaphore:
+    host = urlparse(url).netloc.lower()
+    with _host_locks_guard:
+        return _host_locks.setdefault(host, threading.BoundedSemaphore(PER_HOST_LIMIT))
+
+
+# ---- Cache by URL (+ ETag / Last-Modified revalidation) ----
+def _cache_path(url: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def _read_cache(url: str, cache_dir: str):
+    try:
+        with open(_cache_path(url, cache_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_cache(url: str, cache_dir: str, entry: dict):
+    # Unique temp file: several sessions may cache the same URL at once
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = _cache_path(url, cache_dir)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    except OSError as e:
+        increment("page_fetch.cache_write_failed")
+        print(f"Could not cache {url}: {e}")
+
+
+def _download(response, max_bytes: int) -> dict:
+    """
+    Parses the body while it streams in, stopping at max_bytes.
+    """
+    extractor = TextExtractor()
+    # Without a charset in the header requests assumes ISO-8859-1 for text/*; the web is UTF-8
+    has_charset = "charset=" in response.headers.get("Content-Type", "").lower()
+    encoding = response.encoding if has_charset and response.encoding else "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    received = 0
+    for chunk in response.iter_content(chunk_size=16384):
+        received += len(chunk)
+        if received > max_bytes:
+            chunk = chunk[:len(chunk) - (received - max_bytes)]
+            extractor.feed(decoder.decode(chunk, final=True))
+            increment("page_fetch.truncated")
+            break
+        extractor.feed(decoder.decode(chunk))
+    else:
+        extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return {**extractor.result(), "bytes": min(received, max_bytes)}
+
+
+def fetch_page(url: str, cache_dir: str = PAGE_CACHE_DIR, max_bytes: int = MAX_PAGE_BYTES,
+               ttl: float = PAGE_CACHE_TTL) -> dict:
+    """
+    Returns {"url", "title", "text"} with the page's main text ("" when it could not be fetched).
+    Cached pages are reused within the TTL, then revalidated with their ETag / Last-Modified.
+    """
+    cached = _read_cache(url, cache_dir) if cache_dir else None
+    if cached and time.time() - cached["fetched_at"] < ttl:
+        increment("page_fetch.cache_hit")
+        return {"url": url, "title": cached["title"], "text": cached["text"]}
+
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        with _host_lock(url), timed("page_fetch.download"):
+            with _get_session().get(url, headers=headers, timeout=TIMEOUT, stream=True) as response:
+                if response.status_code == 304 and cached:
+                    increment("page_fetch.not_modified")
+                    cached["fetched_at"] = time.time()
+                    if cache_dir:
+                        _write_cache(url, cache_dir, cached)
+                    return {"url": url, "title": cached["title"], "text": cached["text"]}
+
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "")
+                if "html" not in content_type and "text/plain" not in content_type:
+                    increment("page_fetch.skipped_type")
+                    return {"url": url, "title": "", "text": ""}
+                page = _download(response, max_bytes)
+                etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+    except Exception as e:
+        increment("page_fetch.failed")
+        print(f"Could not fetch {url}: {e}")
+        if cached:
+            return {"url": url, "title": cached["title"], "text": cached["text"]}
+        return {"url": url, "title": "", "text": ""}
+
+    increment("page_fetch.fetched")
+    if cache_dir:
+        _write_cache(url, cache_dir, {
+            "url": url, "title": page["title"], "text": page["text"],
+            "etag": etag, "last_modified": last_modified, "fetched_at": time.time(),
+        })
+    return {"url": url, "title": page["title"], "text": page["text"]}
+
+
+def fetch_pages(urls: list, cache_dir: str = PAGE_CACHE_DIR, max_bytes: int = MAX_PAGE_BYTES) -> list:
+    """
+    Fetches and extracts several pages concurrently (at most PER_HOST_LIMIT per host).
+    Results are returned in the order of `urls`.
+    """
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls))) as pool:
+        return list(pool.map(lambda url: fetch_page(url, cache_dir, max_bytes), urls))
+
+
+def build_passages(pages: list, token_budget: int = 2400) -> str:
+    """
+    Numbered page passages for a prompt; the budget is shared equally between pages with text.
+    """
+    pages = [page for page in pages if page["text"]]
+    if not pages:
+        return ""
+    per_page = token_budget // len(pages)
+    parts = []
+    for idx, page in enumerate(pages, 1):
+        header = f"[{idx}] {page['title'] or page['url']} ({page['url']})"
+        text = truncate_to_tokens(page["text"], max(per_page - count_tokens(header), 50))
+        parts.append(f"{header}\n{text}")
+    return "\n\n".join(parts)
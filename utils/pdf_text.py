@@ -0,0 +1,83 @@
+# utils/pdf_text.py
+
+import os
+import json
+import hashlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+# Extracted page text is cached per file content: data/pdf_text_cache/<sha256>.jsonl,
+# one [page_number, text] record per line, so cached documents stream back page by page.
+PDF_TEXT_CACHE_DIR = "data/pdf_text_cache"
+PARALLEL_MIN_PAGES = 100      # smaller PDFs are extracted in-process
+PAGES_PER_WORKER = 50         # page range handed to each worker process
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def file_hash(file_path, block_size=1 << 20) -> str:
+    """
+    Returns the SHA-256 of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_page_range(args):
+    # Runs in a worker process
+    file_path, start, stop = args
+    with fitz.open(file_path) as doc:
+        return [(n + 1, doc[n].get_text()) for n in range(start, stop)]
+
+
+def _extract_pages(file_path):
+    with fitz.open(file_path) as doc:
+        page_count = doc.page_count
+        if page_count < PARALLEL_MIN_PAGES or MAX_WORKERS < 2:
+            for n, page in enumerate(doc, 1):
+                yield n, page.get_text()
+            return
+
+    ranges = [(file_path, start, min(start + PAGES_PER_WORKER, page_count))
+              for start in range(0, page_count, PAGES_PER_WORKER)]
+    # spawn, not fork: Streamlit's process has other threads (LLM client loop, indexers,
+    # script threads) and a forked child could inherit one of their locks held
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")) as executor:
+        # map() keeps page order and hands back each range as soon as it (and those before it) finish
+        for pages in executor.map(_extract_page_range, ranges):
+            yield from pages
+
+
+def iter_pdf_pages(file_path):
+    """
+    Yields (page_number, text) for every page of a PDF, starting with page 1.
+    Served from the cache when this exact file was extracted before; otherwise pages are
+    extracted (across a process pool for large PDFs) and cached as they stream through.
+    """
+    os.makedirs(PDF_TEXT_CACHE_DIR, exist_ok=True)
+    cache_path = os.path.join(PDF_TEXT_CACHE_DIR, f"{file_hash(file_path)}.jsonl")
+
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            for line in f:
+                page_number, text = json.loads(line)
+                yield page_number, text
+        return
+
+    # Unique per call: Streamlit sessions are threads of one process and may extract the same PDF at once
+    fd, tmp_path = tempfile.mkstemp(dir=PDF_TEXT_CACHE_DIR, prefix=os.path.basename(cache_path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for page_number, text in _extract_pages(file_path):
+                f.write(json.dumps([page_number, text], ensure_ascii=False) + "\n")
+                yield page_number, text
+        os.replace(tmp_path, cache_path)
+    finally:
+        # Consumer stopped early or extraction failed: don't leave a partial cache entry
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
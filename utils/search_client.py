@@ -0,0 +1,202 @@
+# utils/search_client.py
+
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import settings
+from utils.metrics import increment, timed
+
+SEARCH_CACHE_DIR = "data/search_cache"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key form of a query: lowercased, whitespace collapsed, surrounding punctuation dropped,
+    so "How to manage exam stress?" and "how to  manage exam stress" share a cache entry.
+    """
+    query = re.sub(r"\s+", " ", query).strip().lower()
+    return query.strip(" ?!.,;:\"'")
+
+
+class SearchClient:
+    """
+    Serper.dev search client.
+
+    - One pooled requests.Session (keep-alive) with connect/read timeouts.
+    - Results cached by normalized query with a TTL, in memory (LRU) and on disk
+      (one small JSON file per query under `cache_dir`), so they survive restarts.
+    - Concurrent identical queries are collapsed into a single upstream request
+      whose result all callers share.
+    Failed requests raise and are never cached.
+    """
+
+    def __init__(self, api_key: str, url: str, ttl: float = 6 * 3600, connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0, pool_size: int = 8, max_entries: int = 1024,
+                 cache_dir: str = SEARCH_CACHE_DIR):
+        self.api_key = api_key
+        self.url = url
+        self.ttl = ttl
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # key -> (expires_at, results)
+        self._inflight = {}          # key -> Future shared by concurrent callers
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "upstream_s": 0.0}
+
+    # ---- Cache ----
+    @staticmethod
+    def _key(query: str) -> str:
+        return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key: str, expires_at: float, results: list):
+        self._cache[key] = (expires_at, results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _cached(self, key: str):
+        """
+        Fresh cached results for the key (memory first, then disk), or None. Caller holds the lock.
+        """
+        now = time.time()
+        entry = self._cache.get(key)
+        if entry is None and self.cache_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                entry = (stored["expires_at"], stored["results"])
+                self._remember(key, *entry)
+            except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                return None
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key: str, query: str, results: list):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, results)
+        if not self.cache_dir:
+            return
+        # Unique temp file: concurrent clients (or a restarted one) may store the same query
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"query": normalize_query(query), "expires_at": expires_at, "results": results}, f)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except OSError as e:
+            increment("search.cache_write_failed")
+            print(f"Could not cache search results: {e}")
+
+    # ---- Upstream ----
+    def _fetch(self, query: str) -> list:
+        start = time.perf_counter()
+        try:
+            with timed("search.upstream"):
+                response = self.session.post(
+                    self.url,
+                    json={"q": query},
+                    headers={"X-API-KEY": self.api_key or ""},
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                return response.json().get("organic", [])
+        finally:
+            with self._lock:
+                self.stats["upstream_calls"] += 1
+                self.stats["upstream_s"] += time.perf_counter() - start
+
+    def search(self, query: str) -> list:
+        """
+        Returns Serper's organic results for the query, from the cache when possible.
+        """
+        key = self._key(query)
+        with self._lock:
+            results = self._cached(key)
+            if results is not None:
+                self.stats["hits"] += 1
+                increment("search.cache_hit")
+                return results
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.stats["misses"] += 1
+                increment("search.cache_miss")
+            else:
+                self.stats["coalesced"] += 1
+                increment("search.coalesced")
+
+        if not leader:
+            return future.result()
+
+        try:
+            results = self._fetch(query)
+            self._store(key, query, results)
+            future.set_result(results)
+            return results
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def report(self) -> dict:
+        """
+        Hit rate (cache hits + coalesced requests over all lookups) and mean upstream latency.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        return {
+            **stats,
+            "hit_rate": (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0,
+            "upstream_avg_ms": stats["upstream_s"] / stats["upstream_calls"] * 1000 if stats["upstream_calls"] else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+search_client = SearchClient(
+    api_key=settings.SERPER_API_KEY,
+    url=settings.SERPER_URL,
+    ttl=settings.SEARCH_CACHE_TTL,
+    connect_timeout=settings.SEARCH_CONNECT_TIMEOUT,
+    read_timeout=settings.SEARCH_READ_TIMEOUT,
+)
@@ -0,0 +1,180 @@
+# utils/session_index.py
+
+import os
+import json
+import time
+import atexit
+import threading
+
+from utils.chat_journal import journal_path, read_session
+
+# Per-user manifest of chat sessions: data/chat_sessions/<username>/manifest.json
+#   {"<date>": {"file": ..., "messages": ..., "bytes": ..., "mtime": ...}, ...}
+# It is maintained on write, so listing a user's sessions never walks other users' folders.
+CHAT_DIR = "data/chat_sessions"
+MANIFEST_FILE = "manifest.json"
+# Message counts are written back in batches; new sessions are written immediately
+SAVE_EVERY = 20          # write the manifest after this many unsaved updates...
+SAVE_INTERVAL = 5.0      # ...or when the oldest unsaved update is this many seconds old
+
+_lock = threading.Lock()
+_manifests = {}  # (base_dir, username) -> manifest dict
+_dirty = {}      # (base_dir, username) -> (unsaved updates, monotonic time of the first one)
+
+
+def _manifest_path(username: str, base_dir: str) -> str:
+    return os.path.join(base_dir, username, MANIFEST_FILE)
+
+
+def _file_stats(snapshot_path: str) -> tuple:
+    size, mtime = 0, 0.0
+    for path in (snapshot_path, journal_path(snapshot_path)):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            size += stat.st_size
+            mtime = max(mtime, stat.st_mtime)
+    return size, mtime
+
+
+def _save_locked(username: str, base_dir: str, manifest: dict):
+    path = _manifest_path(username, base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    _dirty.pop((base_dir, username), None)
+
+
+def _count_messages(snapshot_path: str) -> int:
+    try:
+        return len(read_session(snapshot_path))
+    except Exception:
+        return 0
+
+
+def _rebuild_locked(username: str, base_dir: str) -> dict:
+    manifest = {}
+    user_dir = os.path.join(base_dir, username)
+    if os.path.isdir(user_dir):
+        for date in sorted(os.listdir(user_dir)):
+            snapshot_path = os.path.join(user_dir, date, f"session_{date}.json")
+            if not os.path.exists(snapshot_path):
+                continue
+            size, mtime = _file_stats(snapshot_path)
+            manifest[date] = {
+                "file": snapshot_path,
+                "messages": _count_messages(snapshot_path),
+                "bytes": size,
+                "mtime": mtime,
+            }
+        _save_locked(username, base_dir, manifest)
+    return manifest
+
+
+def _refresh_latest_locked(manifest: dict):
+    # Counts are saved in batches, so after a crash the newest session may be behind its files
+    if manifest:
+        entry = manifest[max(manifest)]
+        stats = _file_stats(entry["file"])
+        if [entry["bytes"], entry["mtime"]] != list(stats):
+            entry["messages"] = _count_messages(entry["file"])
+            entry["bytes"], entry["mtime"] = stats
+
+
+def _load_locked(username: str, base_dir: str) -> tuple:
+    """
+    Returns (manifest, rebuilt); rebuilt is True when it was just recounted from the session files.
+    """
+    key = (base_dir, username)
+    manifest = _manifests.get(key)
+    rebuilt = False
+    if manifest is None:
+        path = _manifest_path(username, base_dir)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            _refresh_latest_locked(manifest)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Missing or corrupt manifest (e.g. sessions written before it existed): rebuild
+            manifest = _rebuild_locked(username, base_dir)
+            rebuilt = True
+        _manifests[key] = manifest
+    return manifest, rebuilt
+
+
+def record_message(username: str, date: str, snapshot_path: str, base_dir: str = CHAT_DIR):
+    """
+    Updates the manifest entry of a session after a message was appended to it.
+    """
+    with _lock:
+        manifest, rebuilt = _load_locked(username, base_dir)
+        entry = manifest.get(date)
+        created = entry is None
+        if created:
+            entry = {"file": snapshot_path, "messages": 0, "bytes": 0, "mtime": 0.0}
+            manifest[date] = entry
+        if rebuilt and not created:
+            return  # the rebuild already counted the message that was just appended
+        entry["messages"] += 1
+        entry["bytes"], entry["mtime"] = _file_stats(snapshot_path)
+
+        key = (base_dir, username)
+        pending, since = _dirty.get(key, (0, time.monotonic()))
+        if created or pending + 1 >= SAVE_EVERY or time.monotonic() - since >= SAVE_INTERVAL:
+            _save_locked(username, base_dir, manifest)
+        else:
+            _dirty[key] = (pending + 1, since)
+
+
+def remove_session(username: str, date: str, base_dir: str = CHAT_DIR):
+    """
+    Drops a session from the user's manifest.
+    """
+    with _lock:
+        manifest, _ = _load_locked(username, base_dir)
+        if manifest.pop(date, None) is not None:
+            _save_locked(username, base_dir, manifest)
+
+
+def get_user_sessions(username: str, start_date=None, end_date=None, base_dir: str = CHAT_DIR) -> list:
+    """
+    Returns the user's sessions between start_date and end_date (inclusive, dates or
+    'YYYY-MM-DD' strings) as a date-sorted list of {"date", "file", "messages", "bytes", "mtime"}.
+    """
+    start = str(start_date) if start_date else None
+    end = str(end_date) if end_date else None
+
+    with _lock:
+        manifest, _ = _load_locked(username, base_dir)
+        items = sorted(manifest.items())
+
+    return [
+        {"date": date, **entry}
+        for date, entry in items
+        if (start is None or date >= start) and (end is None or date <= end)
+    ]
+
+
+def rebuild_manifest(username: str, base_dir: str = CHAT_DIR) -> dict:
+    """
+    Rebuilds a user's manifest from their session folders (migration / repair).
+    """
+    with _lock:
+        manifest = _rebuild_locked(username, base_dir)
+        _manifests[(base_dir, username)] = manifest
+        return manifest
+
+
+def flush_manifests():
+    """
+    Writes every manifest with unsaved message counts.
+    """
+    with _lock:
+        for base_dir, username in list(_dirty):
+            manifest = _manifests.get((base_dir, username))
+            if manifest is not None:
+                _save_locked(username, base_dir, manifest)
+
+
+atexit.register(flush_manifests)
@@ -0,0 +1,55 @@
+# utils/snippet_rerank.py
+
+import numpy as np
+
+from utils.embeddings import embed_texts
+from utils.metrics import timed
+from utils.tokens import count_tokens
+
+DEDUP_THRESHOLD = 0.92     # cosine similarity above which two results count as the same snippet
+CONTEXT_TOKEN_BUDGET = 350  # tokens of web context packed into the hybrid prompt
+MIN_SCORE = 0.2            # results less similar to the query than this are off-topic
+MAX_RESULTS = 5
+
+
+def result_text(result: dict) -> str:
+    title, snippet = result.get("title", "").strip(), result.get("snippet", "").strip()
+    return f"{title}: {snippet}" if title and snippet else title or snippet
+
+
+def rerank_results(query: str, results: list, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                   dedup_threshold: float = DEDUP_THRESHOLD, min_score: float = MIN_SCORE,
+                   max_results: int = MAX_RESULTS) -> list:
+    """
+    Orders search results by relevance to the query and returns the best ones (at most
+    max_results, scoring at least min_score) that fit the token budget, skipping
+    near-duplicates of results already chosen. The best result is always kept.
+
+    The query and all titles+snippets are embedded in one batch; relevance and
+    duplicate checks are dot products of the normalized vectors. Returned results
+    carry their cosine "score".
+    """
+    candidates = [result for result in results if result_text(result)]
+    if not candidates:
+        return []
+
+    with timed("rerank.embed"):
+        vectors = embed_texts([query] + [result_text(result) for result in candidates])
+    with timed("rerank.select"):
+        scores = vectors[1:] @ vectors[0]
+        # Similarity of every candidate to every other one, for duplicate checks
+        similarity = vectors[1:] @ vectors[1:].T
+
+        chosen, used = [], 0
+        for i in np.argsort(-scores):
+            if len(chosen) == max_results or (chosen and scores[i] < min_score):
+                break
+            if chosen and similarity[i, chosen].max() >= dedup_threshold:
+                continue
+            tokens = count_tokens(result_text(candidates[i])) + 2
+            # Over budget: skip it, a shorter lower-ranked snippet may still fit
+            if chosen and used + tokens > token_budget:
+                continue
+            chosen.append(int(i))
+            used += tokens
+    return [{**candidates[i], "score": float(scores[i])} for i in chosen]
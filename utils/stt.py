@@ -0,0 +1,201 @@
+# utils/stt.py
+
+import io
+import re
+import time
+import wave
+from math import gcd
+
+import numpy as np
+
+from config.settings import settings
+from utils.lazy import lazy_resource
+from utils.metrics import record_timing, record_value
+
+# Speech-to-text backends:
+#   "google"  - SpeechRecognition's free Google Web Speech API (the original behaviour, default)
+#   "whisper" - local openai-whisper model on CPU, no network (opt in with NEUROMENTOR_STT_BACKEND)
+STT_BACKENDS = ("whisper", "google")
+TARGET_RATE = 16000          # Whisper works on 16 kHz mono
+CHUNK_SECONDS = 30.0         # Whisper's context window
+SPLIT_SEARCH_SECONDS = 2.0   # look this far back from a chunk boundary for a quiet point to cut at
+FRAME_SECONDS = 0.02         # energy frame used to find quiet points
+
+
+# ---- Audio helpers ----
+def to_mono_16k(audio, sample_rate: int) -> np.ndarray:
+    """
+    Float32 mono audio in [-1, 1] at 16 kHz from a numpy recording (any dtype, 1 or 2 channels).
+    """
+    audio = np.asarray(audio)
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if np.issubdtype(audio.dtype, np.integer):
+        audio = audio.astype(np.float32) / np.iinfo(audio.dtype).max
+    audio = audio.astype(np.float32, copy=False)
+    if sample_rate != TARGET_RATE:
+        from scipy.signal import resample_poly
+        factor = gcd(sample_rate, TARGET_RATE)
+        audio = resample_poly(audio, TARGET_RATE // factor, sample_rate // factor).astype(np.float32)
+    return audio
+
+
+def load_wav(path: str):
+    """
+    Reads a PCM WAV file into (int16/int32/uint8 numpy array, sample rate).
+    """
+    with wave.open(path, "rb") as f:
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[f.getsampwidth()]
+        audio = np.frombuffer(f.readframes(f.getnframes()), dtype=dtype)
+        if f.getnchannels() > 1:
+            audio = audio.reshape(-1, f.getnchannels())
+        rate = f.getframerate()
+    if dtype is np.uint8:
+        audio = (audio.astype(np.int16) - 128) * 256
+    return audio, rate
+
+
+def wav_bytes(audio, sample_rate: int) -> bytes:
+    """
+    Encodes a numpy recording as 16-bit PCM WAV bytes (for saving or st.audio).
+    """
+    audio = np.asarray(audio)
+    if not np.issubdtype(audio.dtype, np.integer):
+        audio = np.clip(audio, -1.0, 1.0) * 32767
+    audio = audio.astype(np.int16)
+    output = io.BytesIO()
+    with wave.open(output, "wb") as f:
+        f.setnchannels(1 if audio.ndim == 1 else audio.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(audio.tobytes())
+    return output.getvalue()
+
+
+def split_chunks(audio: np.ndarray, chunk_seconds: float = CHUNK_SECONDS) -> list:
+    """
+    Splits 16 kHz audio into chunks of at most chunk_seconds, cutting at the quietest
+    frame shortly before each boundary so words are not split in half.
+    """
+    chunk, search, frame = (int(s * TARGET_RATE) for s in (chunk_seconds, SPLIT_SEARCH_SECONDS, FRAME_SECONDS))
+    chunks, start = [], 0
+    while len(audio) - start > chunk:
+        window = audio[start + chunk - search:start + chunk]
+        energy = np.square(window[:len(window) // frame * frame].reshape(-1, frame)).mean(axis=1)
+        cut = start + chunk - search + int(np.argmin(energy)) * frame + frame // 2
+        chunks.append(audio[start:cut])
+        start = cut
+    chunks.append(audio[start:])
+    return chunks
+
+
+# ---- Backends ----
+@lazy_resource
+def get_whisper_model(name: str):
+    import whisper
+    return whisper.load_model(name, device="cpu")
+
+
+class WhisperSTT:
+    """
+    Local Whisper transcription. The model is loaded once per process and shared.
+    Long recordings are decoded chunk by chunk; each chunk is prompted with the text
+    so far to keep wording consistent across boundaries.
+    """
+
+    def __init__(self, model_name: str = "base", language: str = "en", chunk_seconds: float = CHUNK_SECONDS):
+        self.model_name = model_name
+        self.language = language
+        self.chunk_seconds = chunk_seconds
+
+    def transcribe_stream(self, audio, sample_rate: int):
+        """
+        Yields the text of each chunk as soon as it is decoded.
+        """
+        model = get_whisper_model(self.model_name)
+        previous = ""
+        for chunk in split_chunks(to_mono_16k(audio, sample_rate), self.chunk_seconds):
+            if len(chunk) < TARGET_RATE // 10:
+                continue  # under 0.1 s: nothing to decode
+            result = model.transcribe(
+                chunk, language=self.language, fp16=False, initial_prompt=previous[-200:] or None,
+                condition_on_previous_text=False,
+            )
+            text = result["text"].strip()
+            if text:
+                previous += " " + text
+                yield text
+
+    def transcribe(self, audio, sample_rate: int) -> str:
+        return " ".join(self.transcribe_stream(audio, sample_rate))
+
+
+class GoogleSTT:
+    """
+    SpeechRecognition's Google Web Speech API (network). Chunks with no intelligible
+    speech are skipped; network errors raise sr.RequestError.
+    """
+
+    def transcribe_stream(self, audio, sample_rate: int):
+        import speech_recognition as sr
+
+        recognizer = sr.Recognizer()
+        for chunk in split_chunks(to_mono_16k(audio, sample_rate)):
+            data = sr.AudioData((np.clip(chunk, -1.0, 1.0) * 32767).astype(np.int16).tobytes(), TARGET_RATE, 2)
+            try:
+                yield recognizer.recognize_google(data)
+            except sr.UnknownValueError:
+                continue
+
+    def transcribe(self, audio, sample_rate: int) -> str:
+        return " ".join(self.transcribe_stream(audio, sample_rate))
+
+
+def get_stt_backend(name: str = None):
+    """
+    The configured STT backend (settings.STT_BACKEND unless `name` is given).
+    """
+    name = (name or settings.STT_BACKEND).strip().lower()
+    if name == "whisper":
+        return WhisperSTT(settings.STT_MODEL)
+    if name == "google":
+        return GoogleSTT()
+    raise ValueError(f"Unknown STT backend '{name}', expected one of {STT_BACKENDS}.")
+
+
+def transcribe(audio, sample_rate: int = None, backend: str = None) -> str:
+    """
+    Transcribes a numpy recording (with its sample rate) or a WAV file path.
+    """
+    if isinstance(audio, str):
+        audio, sample_rate = load_wav(audio)
+    stt = get_stt_backend(backend)
+    start = time.perf_counter()
+    text = stt.transcribe(audio, sample_rate)
+    elapsed = time.perf_counter() - start
+    record_timing(f"stt.{type(stt).__name__}", elapsed)
+    # real-time factor: processing time / audio duration (below 1 is faster than real time)
+    record_value("stt.real_time_factor", elapsed / max(len(audio) / sample_rate, 1e-6))
+    return text
+
+
+# ---- Evaluation ----
+def _words(text: str) -> list:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    (substitutions + deletions + insertions) / reference words, on lowercased words without punctuation.
+    """
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+    previous = np.arange(len(hyp) + 1)
+    for i, word in enumerate(ref, 1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
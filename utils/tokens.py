@@ -0,0 +1,23 @@
+# utils/tokens.py
+
+# Prompt budgets are counted locally: ~4 characters per token is Gemini's documented
+# rule of thumb for English text, close enough for budgeting without an API round trip.
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimated number of Gemini tokens in `text`.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts `text` to roughly `max_tokens` tokens, at a word boundary when possible.
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + "…"
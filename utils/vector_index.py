@@ -0,0 +1,178 @@
+# utils/vector_index.py
+
+import time
+import faiss
+import numpy as np
+
+# Index types:
+#   "flat_l2"  - exact L2 on raw embeddings (the original behaviour)
+#   "flat_ip"  - exact inner product on L2-normalized embeddings (= cosine similarity)
+#   "ivf_flat" - inverted lists over k-means cells, exact vectors inside each cell
+#   "hnsw"     - graph-based search, no training, more memory
+#   "ivf_pq"   - inverted lists with product-quantized vectors, several times smaller than
+#                the flat index. PQ distances alone rank too poorly for RAG (recall@10
+#                ~0.1-0.4), so search_index re-ranks the top k * k_factor candidates exactly
+#                against the stored vectors when given them (e.g. the memmapped
+#                embeddings.npy of the index cache), keeping the index itself compressed.
+#                k_factor 0 (or 1) means PQ ranking only.
+# All types except flat_l2 work on normalized vectors with inner-product similarity.
+INDEX_TYPES = ("flat_l2", "flat_ip", "ivf_flat", "hnsw", "ivf_pq")
+
+DEFAULT_PARAMS = {
+    "flat_l2": {},
+    "flat_ip": {},
+    "ivf_flat": {"nlist": None, "nprobe": 8},
+    "hnsw": {"m": 32, "ef_construction": 80, "ef_search": 64},
+    "ivf_pq": {"nlist": None, "pq_m": 32, "nbits": 8, "nprobe": 16, "k_factor": 8},
+}
+
+TRAIN_SAMPLE_SIZE = 50_000  # max vectors used to train IVF indexes
+MIN_POINTS_PER_CELL = 39    # faiss warns below this
+
+
+def resolve_params(index_type: str, params: dict = None) -> dict:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}.")
+    return {**DEFAULT_PARAMS[index_type], **(params or {})}
+
+
+def _auto_nlist(n: int) -> int:
+    return max(1, min(int(4 * np.sqrt(n)), n // MIN_POINTS_PER_CELL))
+
+
+def _prepare(vectors, index_type: str) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if index_type != "flat_l2" and len(vectors):
+        vectors = vectors.copy()
+        faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _factory_string(index_type: str, params: dict, n: int) -> str:
+    if index_type in ("flat_l2", "flat_ip"):
+        return "Flat"
+    if index_type == "hnsw":
+        return f"HNSW{params['m']}"
+    nlist = params["nlist"] or _auto_nlist(n)
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    return f"IVF{nlist},PQ{params['pq_m']}x{params['nbits']}"
+
+
+def apply_search_params(index, index_type: str, params: dict = None):
+    """
+    Sets the search-time parameters (nprobe for IVF, efSearch for HNSW) on an index.
+    """
+    params = resolve_params(index_type, params)
+    target = faiss.downcast_index(index)
+    if hasattr(target, "base_index"):
+        # ivf_pq indexes built with an in-index refine stage (cached by older versions)
+        if hasattr(target, "k_factor"):
+            target.k_factor = max(params.get("k_factor", 1), 1)
+        target = faiss.downcast_index(target.base_index)
+    if "nprobe" in params and hasattr(target, "nprobe"):
+        target.nprobe = params["nprobe"]
+    if "ef_search" in params and hasattr(target, "hnsw"):
+        target.hnsw.efSearch = params["ef_search"]
+
+
+def build_index(embeddings, index_type: str = "flat_ip", params: dict = None,
+                train_sample: int = TRAIN_SAMPLE_SIZE, seed: int = 0):
+    """
+    Builds a faiss index of the given type over the embeddings.
+    Indexes that need training are trained on a random sample of at most `train_sample` vectors.
+    """
+    params = resolve_params(index_type, params)
+    vectors = _prepare(embeddings, index_type)
+    n, dimension = vectors.shape
+
+    metric = faiss.METRIC_L2 if index_type == "flat_l2" else faiss.METRIC_INNER_PRODUCT
+    too_small = (
+        (index_type == "ivf_flat" and n < MIN_POINTS_PER_CELL) or
+        (index_type == "ivf_pq" and n < (2 ** params["nbits"]) * MIN_POINTS_PER_CELL)
+    )
+    if too_small:
+        # Too few vectors to train cells / codebooks: fall back to exact search
+        index_type, params = "flat_ip", resolve_params("flat_ip")
+    index = faiss.index_factory(dimension, _factory_string(index_type, params, n), metric)
+
+    if index_type == "hnsw":
+        index.hnsw.efConstruction = params["ef_construction"]
+    if not index.is_trained:
+        sample = vectors
+        if n > train_sample:
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(n, train_sample, replace=False)]
+        index.train(sample)
+
+    index.add(vectors)
+    apply_search_params(index, index_type, params)
+    return index
+
+
+def _rerank(queries: np.ndarray, candidates: np.ndarray, vectors, k: int, index_type: str):
+    scores = np.full((len(queries), k), -np.finfo(np.float32).max, dtype=np.float32)
+    ids = np.full((len(queries), k), -1, dtype=np.int64)
+    for row, (query, found) in enumerate(zip(queries, candidates)):
+        found = found[found >= 0]
+        if not len(found):
+            continue
+        exact = _prepare(np.asarray(vectors[found]), index_type) @ query
+        order = np.argsort(-exact)[:k]
+        scores[row, :len(order)] = exact[order]
+        ids[row, :len(order)] = found[order]
+    return scores, ids
+
+
+def search_index(index, queries, k: int, index_type: str = "flat_ip", params: dict = None, vectors=None):
+    """
+    Searches the index with queries prepared the same way as the indexed vectors.
+    For ivf_pq, pass the indexed `vectors` (raw, as given to build_index; a memmap is
+    fine, only candidate rows are read) to re-rank the top k * k_factor PQ candidates exactly.
+    Returns (scores, ids) like faiss.
+    """
+    params = resolve_params(index_type, params)
+    apply_search_params(index, index_type, params)
+    queries = _prepare(queries, index_type)
+    k = min(k, max(index.ntotal, 1))
+    k_factor = params.get("k_factor", 0)
+    if index_type != "ivf_pq" or vectors is None or k_factor <= 1:
+        return index.search(queries, k)
+    _, candidates = index.search(queries, min(k * k_factor, index.ntotal))
+    return _rerank(queries, candidates, vectors, k, index_type)
+
+
+def recall_at_k(approx_ids: np.ndarray, exact_ids: np.ndarray, k: int) -> float:
+    """
+    Fraction of the exact top-k neighbours that the approximate search also returned.
+    """
+    hits = sum(len(set(a[:k]) & set(e[:k])) for a, e in zip(approx_ids, exact_ids))
+    return hits / (len(exact_ids) * k)
+
+
+def evaluate_index(embeddings, queries, index_type: str, params: dict = None, k: int = 10,
+                   exact_ids: np.ndarray = None) -> dict:
+    """
+    Builds an index and reports build time, search latency, size and recall@k against
+    exact (flat inner-product) search. ivf_pq re-ranks against `embeddings`, which are
+    not counted in the index size (they stay on disk).
+    """
+    if exact_ids is None:
+        exact = build_index(embeddings, "flat_ip")
+        _, exact_ids = search_index(exact, queries, k, "flat_ip")
+
+    start = time.perf_counter()
+    index = build_index(embeddings, index_type, params)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, ids = search_index(index, queries, k, index_type, params, vectors=embeddings)
+    search_s = time.perf_counter() - start
+
+    return {
+        "index_type": index_type,
+        "build_s": build_s,
+        "search_ms_per_query": search_s / len(queries) * 1000,
+        "size_mb": len(faiss.serialize_index(index)) / 1e6,
+        f"recall@{k}": recall_at_k(ids, exact_ids, k),
+    }
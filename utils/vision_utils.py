@@ -1,44 +1,79 @@
 #utils/ vision_utils.py
-import google.generativeai as genai
+import io
+import asyncio
 from PIL import Image
 from config.settings import settings
+from utils.lazy import lazy_resource
+from utils.llm_client import llm_client
 
-def analyze_image(image_path):
+# Preferred vision models, first available wins
+VISION_MODEL_CANDIDATES = ["gemini-1.5-flash", "gemini-1.5-pro"]
+MAX_IMAGE_SIDE = 1024      # longest side (px) sent to the model
+JPEG_QUALITY = 85
+
+EMOTION_PROMPT = (
+    "Analyze this image purely based on its emotional context. "
+    "Focus only on the emotions it conveys. Do not suggest improvements, feedback, or modifications. "
+    "Just describe the emotional atmosphere you perceive."
+)
+
+@lazy_resource
+def get_vision_model():
     """
-    Analyzes an image using a supported Gemini model and returns only the emotional context.
+    Configures the SDK and resolves the vision model once per process.
     """
-    try:
-        # Ensure correct API key is set
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
+    import google.generativeai as genai
+    genai.configure(api_key=settings.GOOGLE_API_KEY)
 
-        # List available models to confirm the right one is being used
-        available_models = list(genai.list_models())  # Convert generator to list for inspection
-        print("Available models:", available_models)
+    model_name = VISION_MODEL_CANDIDATES[0]
+    try:
+        available = {
+            m.name.split("/")[-1] for m in genai.list_models()
+            if "generateContent" in getattr(m, "supported_generation_methods", [])
+        }
+        model_name = next((name for name in VISION_MODEL_CANDIDATES if name in available), model_name)
+    except Exception as e:
+        print(f"Could not list Gemini models, using {model_name}: {e}")
 
-        # Find the correct model name for image analysis
-        model_name = "gemini-1.5-flash"  # Switch to the supported model
+    return genai.GenerativeModel(model_name)
 
-        # Use the identified model for image analysis
-        model = genai.GenerativeModel(model_name)
-        
-        # Open and process the image
-        image = Image.open(image_path)
+def prepare_image(image_path, max_side=MAX_IMAGE_SIDE) -> dict:
+    """
+    Downscales an image to at most `max_side` pixels on its longest side and re-encodes
+    it as JPEG, returning an inline blob ready to upload.
+    """
+    with Image.open(image_path) as image:
         image = image.convert("RGB")  # Ensure the image is in RGB format
-        
-        # Perform image analysis with the emotional context prompt
-        response = model.generate_content([
-            "Analyze this image purely based on its emotional context. "
-            "Focus only on the emotions it conveys. Do not suggest improvements, feedback, or modifications. "
-            "Just describe the emotional atmosphere you perceive.",
-            image
-        ])
-        
-        if response and hasattr(response, 'text'):
-            return response.text
-        else:
-            return "Failed to retrieve a valid response."
+        image.thumbnail((max_side, max_side))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
 
+def _response_text(response):
+    if response and hasattr(response, 'text'):
+        return response.text
+    return "Failed to retrieve a valid response."
+
+async def _analyze_image_async(image_path):
+    try:
+        blob = await asyncio.to_thread(prepare_image, image_path)
+        response = await llm_client.agenerate_content(get_vision_model(), [EMOTION_PROMPT, blob])
+        return _response_text(response)
     except Exception as e:
         print(f"Error occurred: {e}")
         return f"Unable to analyze the image due to an error: {e}"
 
+def analyze_images(image_paths):
+    """
+    Analyzes several images concurrently and returns their emotional context, in order.
+    """
+    if not image_paths:
+        return []
+    get_vision_model()  # resolve the model once, before fanning out
+    return llm_client.gather([_analyze_image_async(path) for path in image_paths])
+
+def analyze_image(image_path):
+    """
+    Analyzes an image using a supported Gemini model and returns only the emotional context.
+    """
+    return analyze_images([image_path])[0]
@@ -3,6 +3,7 @@
 import os
 import json
 import datetime
+from utils.memory_index import enqueue_message
 
 # Path where voice messages will be saved
 BASE_PATH = "data/voice_sessions/"  # Updated folder name to voice_sessions
@@ -61,6 +62,9 @@ def save_voice_message(username, role, audio_bytes=None, text_message=None):
         with open(session_file_path, "w") as session_file:
             json.dump(voice_history, session_file, indent=2)  # pretty print
 
+        if text_message:
+            enqueue_message(username, role, text_message, source="voice", timestamp=message_entry["timestamp"])
+
         print(f"Saved {role} message for {username}.")
         return True
     
@@ -70,9 +74,10 @@ def save_voice_message(username, role, audio_bytes=None, text_message=None):
 
 
 # Function to load previous voice messages
-def load_voice_messages(username):
+def load_voice_messages(username, date_str=None):
     """
-    Load voice messages (text and audio) for a specific user from today's session.
+    Load voice messages (text and audio) for a specific user from one day's session
+    (date_str as 'YYYY-MM-DD', today by default).
     Returns a list of messages (text or audio) for the user.
     """
     try:
@@ -80,8 +85,8 @@ def load_voice_messages(username):
         if not os.path.exists(user_dir):
             return []
 
-        # Find the session for today's date
-        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+        # Find the session for the requested date
+        date_str = date_str or datetime.datetime.now().strftime("%Y-%m-%d")
         session_file_path = os.path.join(user_dir, f"{date_str}_session.json")
 
         if os.path.exists(session_file_path):
@@ -0,0 +1,182 @@
+# utils/voice_pipeline.py
+
+import io
+import re
+import time
+import wave
+import queue
+import threading
+
+from utils.metrics import record_timing
+
+# Sentence boundary in streamed text: terminal punctuation (plus closing quotes/brackets) and whitespace
+SENTENCE_BREAK = re.compile(r"(?<=[.!?…])[\"')\]]*\s+")
+MIN_SENTENCE_CHARS = 25  # shorter sentences are merged with the next one, so TTS isn't choppy
+
+_DONE = object()
+
+
+class SentenceSplitter:
+    """
+    Turns a stream of text chunks into complete sentences as soon as they end.
+    """
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        sentences, start = [], 0
+        for match in SENTENCE_BREAK.finditer(self.buffer):
+            if match.end() - start >= self.min_chars:
+                sentences.append(self.buffer[start:match.end()].strip())
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> list:
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def concat_wavs(paths: list) -> bytes:
+    """
+    Joins WAV files with the same format into one WAV (bytes).
+    """
+    output = io.BytesIO()
+    writer = None
+    for path in paths:
+        with wave.open(path, "rb") as reader:
+            if writer is None:
+                writer = wave.open(output, "wb")
+                writer.setparams(reader.getparams())
+            writer.writeframes(reader.readframes(reader.getnframes()))
+    if writer is not None:
+        writer.close()
+    return output.getvalue()
+
+
+class VoicePipeline:
+    """
+    One voice turn as concurrent stages connected by queues:
+
+        STT (audio -> text) -> LLM (streamed reply -> sentences) -> TTS (sentence -> WAV) -> playback
+
+    Each stage runs on its own worker thread, so the first sentence is synthesized (and
+    played) while the LLM is still writing the rest of the reply and TTS works on the
+    following sentences. The engines are plain callables, so the microphone, Gemini and
+    pyttsx3 can be swapped for WAV fixtures and stubs:
+
+        stt_fn(audio) -> str
+        reply_fn(text) -> iterable of text chunks
+        tts_fn(sentence) -> path of a WAV file
+        play_fn(path) -> None (optional; blocks while the sentence plays on this machine,
+                               so only for local use like the CLI and benchmarks; the web UI
+                               leaves it out and sends the audio to the browser)
+
+    run() yields events for the UI as they happen:
+        ("transcript", text), ("sentence", index, text), ("audio", index, path),
+        ("error", stage, message), ("done", timings)
+    Per-stage timings are also recorded in utils/metrics under "voice.*".
+    """
+
+    def __init__(self, stt_fn, reply_fn, tts_fn, play_fn=None):
+        self.stt_fn = stt_fn
+        self.reply_fn = reply_fn
+        self.tts_fn = tts_fn
+        self.play_fn = play_fn
+
+    def run(self, audio):
+        events = queue.Queue()
+        transcripts = queue.Queue()
+        sentences = queue.Queue()
+        playback = queue.Queue()
+        timings = {}
+        started = time.perf_counter()
+
+        def mark(name, since=None):
+            seconds = time.perf_counter() - (started if since is None else since)
+            timings[name] = seconds
+            record_timing(f"voice.{name}", seconds)
+
+        def stt_stage():
+            text = None
+            try:
+                stage_start = time.perf_counter()
+                text = self.stt_fn(audio)
+                mark("stt", stage_start)
+                events.put(("transcript", text))
+            except Exception as e:
+                events.put(("error", "stt", str(e)))
+            finally:
+                transcripts.put(text)
+
+        def llm_stage():
+            try:
+                text = transcripts.get()
+                if not text:
+                    return
+                stage_start = time.perf_counter()
+                splitter, index = SentenceSplitter(), 0
+
+                def emit(sentence):
+                    nonlocal index
+                    if index == 0:
+                        mark("llm_first_sentence", stage_start)
+                    events.put(("sentence", index, sentence))
+                    sentences.put((index, sentence))
+                    index += 1
+
+                for chunk in self.reply_fn(text):
+                    for sentence in splitter.feed(chunk):
+                        emit(sentence)
+                for sentence in splitter.flush():
+                    emit(sentence)
+                mark("llm", stage_start)
+            except Exception as e:
+                events.put(("error", "llm", str(e)))
+            finally:
+                sentences.put(_DONE)
+
+        def tts_stage():
+            synth_s = 0.0
+            try:
+                while (item := sentences.get()) is not _DONE:
+                    index, sentence = item
+                    stage_start = time.perf_counter()
+                    try:
+                        path = self.tts_fn(sentence)
+                    except Exception as e:
+                        events.put(("error", "tts", str(e)))
+                        continue
+                    synth_s += time.perf_counter() - stage_start
+                    record_timing("voice.tts_sentence", time.perf_counter() - stage_start)
+                    if "first_audio" not in timings:
+                        mark("first_audio")
+                    events.put(("audio", index, path))
+                    playback.put(path)
+            finally:
+                timings["tts"] = synth_s
+                record_timing("voice.tts", synth_s)
+                playback.put(_DONE)
+
+        def playback_stage():
+            try:
+                while (path := playback.get()) is not _DONE:
+                    if self.play_fn is not None:
+                        try:
+                            self.play_fn(path)
+                        except Exception as e:
+                            events.put(("error", "playback", str(e)))
+            finally:
+                mark("total")
+                events.put(_DONE)
+
+        for target, name in ((stt_stage, "voice-stt"), (llm_stage, "voice-llm"),
+                             (tts_stage, "voice-tts"), (playback_stage, "voice-playback")):
+            threading.Thread(target=target, name=name, daemon=True).start()
+
+        while (event := events.get()) is not _DONE:
+            yield event
+        yield ("done", dict(timings))
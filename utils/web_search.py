@@ -1,24 +1,16 @@
 # utils/web_search.py
-import json
-import requests
 import streamlit as st
-from config.settings import settings
 from utils.llm import get_gemini_response
+from utils.search_client import search_client
+from utils.snippet_rerank import rerank_results, result_text
 
 def live_search(query):
     """
     Performs a live web search via Serper.dev and returns a list of organic results.
+    Repeated queries are served from the search client's cache.
     """
-    url = "https://google.serper.dev/search"
-    payload = json.dumps({"q": query})
-    headers = {
-        "X-API-KEY": settings.SERPER_API_KEY,
-        "Content-Type": "application/json"
-    }
     try:
-        response = requests.post(url, headers=headers, data=payload)
-        response.raise_for_status()
-        return response.json().get("organic", [])
+        return search_client.search(query)
     except Exception as e:
         st.error(f"Search error: {str(e)}")
         return []
@@ -32,14 +24,18 @@ def generate_hybrid_answer(query):
         if not search_results:
             return "Couldn't find anything useful right now.", []
 
-        # Extract top 3 contents for context
+        # Most relevant, de-duplicated results that fit the context budget
+        try:
+            selected = rerank_results(query, search_results)
+        except Exception as e:
+            # Embedding model unavailable: the top results as Serper ranked them
+            print(f"Reranking failed, using the top results: {e}")
+            selected = search_results[:3]
         context_text = ""
         references = []
-        for result in search_results[:3]:
-            snippet = result.get("snippet", "")
+        for result in selected:
+            context_text += f"- {result_text(result)}\n"
             link = result.get("link", "")
-            if snippet:
-                context_text += f"- {snippet}\n"
             if link:
                 references.append(link)
 
@@ -53,7 +49,7 @@ def generate_hybrid_answer(query):
             "Answer:"
         )
 
-        answer = get_gemini_response(hybrid_prompt)
+        answer = get_gemini_response(hybrid_prompt, prompt_type="hybrid_answer", cache_text=query)
         return answer, references
     except Exception as e:
         return "⚠️ Oops, something went wrong while generating the answer.", []